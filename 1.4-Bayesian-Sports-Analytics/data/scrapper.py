@@ -1,76 +1,183 @@
 import pandas as pd
+import argparse
+import io
+import json
 import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
-def telecharger_donnees_championnat(championnat_code, championnat_nom, saisons):
+DATA_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(DATA_DIR.parent / "scripts"))
+from match_store import STORE_DIR, append_matches, load_matches
+
+# URL de base des CSV (football-data.co.uk par défaut), remplaçable par
+# FOOTBALL_DATA_URL ou --base-url (miroir, serveur local de test)
+BASE_URL = os.environ.get("FOOTBALL_DATA_URL", "https://www.football-data.co.uk/mmz4281")
+CACHE_DIR = DATA_DIR / "http_cache"
+
+# Championnats à télécharger
+CHAMPIONNATS = {
+    'F1': 'Ligue 1',
+    'E0': 'Premier League',
+    'SP1': 'La Liga',
+    'I1': 'Serie A',
+    'D1': 'Bundesliga',
+}
+
+# Saisons (format: code_url: nom_lisible)
+SAISONS = {
+    '2526': '2025-26',
+    '2425': '2024-25',
+    '2324': '2023-24',
+    '2223': '2022-23',
+    '2122': '2021-22',
+    '2021': '2020-21',
+    '1920': '2019-20',
+}
+
+
+def telecharger_csv(url, cache_file):
+    """
+    Télécharge un CSV avec une requête conditionnelle (ETag / Last-Modified)
+
+    La réponse et ses en-têtes de validation sont conservés dans cache_file
+    (+ .json) : si le serveur répond 304 Not Modified, le contenu est relu
+    depuis le cache au lieu d'être re-téléchargé.
+
+    Returns:
+        (contenu brut, statut) avec statut "nouveau", "modifié" ou "inchangé"
+    """
+    cache_file = Path(cache_file)
+    meta_file = cache_file.with_suffix(".json")
+    headers = {}
+    if cache_file.exists() and meta_file.exists():
+        meta = json.loads(meta_file.read_text())
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with urlopen(Request(url, headers=headers), timeout=60) as response:
+            contenu = response.read()
+            validation = {"etag": response.headers.get("ETag"),
+                          "last_modified": response.headers.get("Last-Modified")}
+    except HTTPError as e:
+        if e.code == 304:
+            return cache_file.read_bytes(), "inchangé"
+        raise
+
+    statut = "modifié" if cache_file.exists() else "nouveau"
+    if statut == "modifié" and cache_file.read_bytes() == contenu:
+        statut = "inchangé"  # serveur sans validation : contenu identique
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(contenu)
+    meta_file.write_text(json.dumps(validation, indent=2))
+    return contenu, statut
+
+
+def nettoyer_saison(df, championnat_code, championnat_nom, saison_nom):
+    """Ne garde que les colonnes importantes pour l'analyse bayésienne"""
+    # Colonnes essentielles pour notre analyse bayésienne
+    colonnes_importantes = {
+        'Date': 'Date',
+        'HomeTeam': 'HomeTeam',
+        'AwayTeam': 'AwayTeam',
+        'FTHG': 'HomeGoals',      # Full Time Home Goals
+        'FTAG': 'AwayGoals',      # Full Time Away Goals
+        'FTR': 'Result',          # Full Time Result (H/D/A)
+        'HS': 'HomeShots',        # Home Shots
+        'AS': 'AwayShots',        # Away Shots
+        'HST': 'HomeShotsTarget', # Home Shots on Target
+        'AST': 'AwayShotsTarget', # Away Shots on Target
+    }
+
+    # Optionnel: cotes des bookmakers si disponibles
+    colonnes_cotes = {
+        'B365H': 'OddsHome',      # Bet365 Home odds
+        'B365D': 'OddsDraw',      # Bet365 Draw odds
+        'B365A': 'OddsAway',      # Bet365 Away odds
+    }
+
+    # Sélectionner les colonnes disponibles
+    colonnes_a_garder = {}
+    for old_col, new_col in colonnes_importantes.items():
+        if old_col in df.columns:
+            colonnes_a_garder[old_col] = new_col
+
+    # Ajouter les cotes si disponibles
+    for old_col, new_col in colonnes_cotes.items():
+        if old_col in df.columns:
+            colonnes_a_garder[old_col] = new_col
+
+    # Renommer les colonnes
+    df_clean = df[list(colonnes_a_garder.keys())].copy()
+    df_clean.rename(columns=colonnes_a_garder, inplace=True)
+
+    # Ajouter des métadonnées
+    df_clean['Season'] = saison_nom
+    df_clean['League'] = championnat_nom
+    df_clean['LeagueCode'] = championnat_code
+
+    # Supprimer les lignes avec données manquantes essentielles
+    return df_clean.dropna(subset=['Date', 'HomeTeam', 'AwayTeam', 'HomeGoals', 'AwayGoals'])
+
+
+def telecharger_saisons(championnats, saisons, base_url=BASE_URL, cache_dir=CACHE_DIR, workers=8):
+    """
+    Télécharge toutes les saisons de tous les championnats en parallèle
+    (au plus `workers` requêtes simultanées)
+
+    Returns:
+        Dictionnaire {(code championnat, code saison): (DataFrame nettoyé, statut)} ;
+        les saisons en erreur (404 d'une saison pas encore publiée...) sont absentes
+    """
+    taches = [(code, nom, saison_code, saison_nom)
+              for code, nom in championnats.items() for saison_code, saison_nom in saisons.items()]
+
+    def telecharger(tache):
+        code, nom, saison_code, saison_nom = tache
+        url = f"{base_url.rstrip('/')}/{saison_code}/{code}.csv"
+        contenu, statut = telecharger_csv(url, Path(cache_dir) / f"{saison_code}_{code}.csv")
+        df = pd.read_csv(io.BytesIO(contenu), encoding='latin1')
+        return nettoyer_saison(df, code, nom, saison_nom), statut
+
+    resultats = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {tache: pool.submit(telecharger, tache) for tache in taches}
+        for (code, nom, saison_code, saison_nom), future in futures.items():
+            try:
+                df_clean, statut = future.result()
+            except Exception as e:
+                print(f"  {nom:16s} {saison_nom}  Erreur: {e}")
+                continue
+            resultats[code, saison_code] = (df_clean, statut)
+            print(f"  {nom:16s} {saison_nom}  {len(df_clean):4d} matchs ({statut})")
+    return resultats
+
+
+def telecharger_donnees_championnat(championnat_code, championnat_nom, saisons,
+                                    base_url=BASE_URL, cache_dir=CACHE_DIR, workers=8):
     """
     Télécharge les données d'un championnat sur plusieurs saisons
     Ne garde que les colonnes importantes pour l'analyse bayésienne
     """
-    all_data = []
-    
     print(f"\n{'='*60}")
     print(f"📥 Téléchargement: {championnat_nom}")
     print(f"{'='*60}")
-    
-    for saison_code, saison_nom in saisons.items():
-        url = f"https://www.football-data.co.uk/mmz4281/{saison_code}/{championnat_code}.csv"
-        
-        try:
-            print(f"\n  Saison {saison_nom}...", end=" ")
-            df = pd.read_csv(url, encoding='latin1')
-            
-            # Colonnes essentielles pour notre analyse bayésienne
-            colonnes_importantes = {
-                'Date': 'Date',
-                'HomeTeam': 'HomeTeam', 
-                'AwayTeam': 'AwayTeam',
-                'FTHG': 'HomeGoals',      # Full Time Home Goals
-                'FTAG': 'AwayGoals',      # Full Time Away Goals
-                'FTR': 'Result',          # Full Time Result (H/D/A)
-                'HS': 'HomeShots',        # Home Shots
-                'AS': 'AwayShots',        # Away Shots
-                'HST': 'HomeShotsTarget', # Home Shots on Target
-                'AST': 'AwayShotsTarget', # Away Shots on Target
-            }
-            
-            # Optionnel: cotes des bookmakers si disponibles
-            colonnes_cotes = {
-                'B365H': 'OddsHome',      # Bet365 Home odds
-                'B365D': 'OddsDraw',      # Bet365 Draw odds
-                'B365A': 'OddsAway',      # Bet365 Away odds
-            }
-            
-            # Sélectionner les colonnes disponibles
-            colonnes_a_garder = {}
-            for old_col, new_col in colonnes_importantes.items():
-                if old_col in df.columns:
-                    colonnes_a_garder[old_col] = new_col
-            
-            # Ajouter les cotes si disponibles
-            for old_col, new_col in colonnes_cotes.items():
-                if old_col in df.columns:
-                    colonnes_a_garder[old_col] = new_col
-            
-            # Renommer les colonnes
-            df_clean = df[list(colonnes_a_garder.keys())].copy()
-            df_clean.rename(columns=colonnes_a_garder, inplace=True)
-            
-            # Ajouter des métadonnées
-            df_clean['Season'] = saison_nom
-            df_clean['League'] = championnat_nom
-            df_clean['LeagueCode'] = championnat_code
-            
-            # Supprimer les lignes avec données manquantes essentielles
-            df_clean = df_clean.dropna(subset=['Date', 'HomeTeam', 'AwayTeam', 'HomeGoals', 'AwayGoals'])
-            
-            all_data.append(df_clean)
-            print(f"{len(df_clean)} matchs")
-            
-        except Exception as e:
-            print(f"Erreur: {e}")
-            continue
-    
+
+    resultats = telecharger_saisons({championnat_code: championnat_nom}, saisons,
+                                    base_url, cache_dir, workers)
+    all_data = [df for df, _ in resultats.values()]
+
     if all_data:
         df_final = pd.concat(all_data, ignore_index=True)
         print(f"\n  Total: {len(df_final)} matchs sur {len(all_data)} saisons")
@@ -80,83 +187,172 @@ def telecharger_donnees_championnat(championnat_code, championnat_nom, saisons):
         return None
 
 
-def main():
-    """Script principal de téléchargement"""
-    
-    # Définir les championnats à télécharger
-    championnats = {
-        'F1': 'Ligue 1',
-        'E0': 'Premier League',
-        'SP1': 'La Liga',
-        'I1': 'Serie A',
-        'D1': 'Bundesliga',
-    }
-    
-    # Définir les saisons (format: code_url: nom_lisible)
-    saisons = {
-        '2526': '2025-26',
-        '2425': '2024-25',
-        '2324': '2023-24',
-        '2223': '2022-23',
-        '2122': '2021-22',
-        '2021': '2020-21',
-        '1920': '2019-20',
-    }
-    
+def main(base_url=BASE_URL, cache_dir=CACHE_DIR, workers=8,
+         championnats=CHAMPIONNATS, saisons=SAISONS, data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """
+    Script principal de téléchargement
+
+    Les CSV sont écrits dans data_dir et les nouveaux matchs ajoutés au
+    stockage Parquet store_dir (data/ et data/matches/ par défaut).
+    """
+
     print("=" * 60)
     print("TÉLÉCHARGEMENT DES DONNÉES FOOTBALL")
     print("=" * 60)
     print(f"Championnats: {len(championnats)}")
     print(f"Saisons: {len(saisons)}")
+    print(f"Source: {base_url} ({workers} téléchargements simultanés)")
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    
-    # Télécharger chaque championnat
+
+    # Télécharger toutes les saisons (requêtes conditionnelles : seules les
+    # saisons modifiées depuis le dernier lancement sont re-téléchargées)
+    resultats = telecharger_saisons(championnats, saisons, base_url, cache_dir, workers)
+
     datasets = {}
     for code, nom in championnats.items():
-        df = telecharger_donnees_championnat(code, nom, saisons)
-        if df is not None:
+        saisons_ok = [resultats[code, s][0] for s in saisons if (code, s) in resultats]
+        if saisons_ok:
+            df = pd.concat(saisons_ok, ignore_index=True)
             datasets[code] = df
             # Sauvegarder individuellement
-            filename = f'{code}_{nom.replace(" ", "_")}.csv'
+            filename = Path(data_dir) / f'{code}_{nom.replace(" ", "_")}.csv'
             df.to_csv(filename, index=False)
-            print(f"  Sauvegardé: {filename}")
-    
+            print(f"  Sauvegardé: {filename.name}")
+
     # Combiner tous les championnats
     if datasets:
         print(f"\n{'='*60}")
         print("Création du dataset combiné...")
         print(f"{'='*60}")
-        
+
         df_all = pd.concat(datasets.values(), ignore_index=True)
-        
+
         # Sauvegarder le dataset complet
-        filename_all = 'football_all_leagues.csv'
+        filename_all = Path(data_dir) / 'football_all_leagues.csv'
         df_all.to_csv(filename_all, index=False)
-        
+
+        # Stockage Parquet : n'ajouter que les matchs des saisons modifiées
+        # (tout le dataset si le stockage n'existe pas encore)
+        modifies = [df for df, statut in resultats.values() if statut != "inchangé"]
+        if not (Path(store_dir) / "_teams.json").exists():
+            modifies = [df_all]
+        ajoutes = (append_matches(pd.concat(modifies, ignore_index=True), store_dir)
+                   if modifies else 0)
+
         print(f"\nTERMINÉ!")
         print(f"  Total matchs: {len(df_all)}")
+        print(f"  Nouveaux matchs dans {store_dir}: {ajoutes}")
         print(f"  Championnats: {df_all['League'].nunique()}")
         print(f"  Équipes uniques: {pd.concat([df_all['HomeTeam'], df_all['AwayTeam']]).nunique()}")
-        print(f"  Fichier principal: {filename_all}")
-        
+        print(f"  Fichier principal: {filename_all.name}")
+
         # Statistiques rapides
         print(f"\nRépartition par championnat:")
         for league in df_all['League'].unique():
             count = len(df_all[df_all['League'] == league])
             print(f"  {league:20s}: {count:4d} matchs")
-        
+
         return df_all
     else:
         print("\nAucune donnée téléchargée")
         return None
 
 
+class _ServeurFixtures(SimpleHTTPRequestHandler):
+    """Sert les CSV de test et note le code de chaque réponse (200, 304...)"""
+    codes = []
+
+    def log_request(self, code="-", size="-"):
+        self.codes.append(int(code))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def ecrire_fixtures(df, directory):
+    """Réécrit des matchs nettoyés au format football-data.co.uk (<saison>/<championnat>.csv)"""
+    colonnes = {'HomeGoals': 'FTHG', 'AwayGoals': 'FTAG', 'Result': 'FTR',
+                'HomeShots': 'HS', 'AwayShots': 'AS', 'HomeShotsTarget': 'HST',
+                'AwayShotsTarget': 'AST', 'OddsHome': 'B365H', 'OddsDraw': 'B365D',
+                'OddsAway': 'B365A'}
+    for (code, saison), groupe in df.groupby(['LeagueCode', 'Season']):
+        fichier = Path(directory) / (saison[2:4] + saison[5:7]) / f"{code}.csv"
+        fichier.parent.mkdir(parents=True, exist_ok=True)
+        groupe.drop(columns=['Season', 'League', 'LeagueCode']).rename(columns=colonnes) \
+              .to_csv(fichier, index=False)
+
+
+def verifier_serveur_local(workers=8):
+    """
+    Vérifie le téléchargement incrémental contre un serveur HTTP local qui sert
+    football_all_leagues.csv découpé en CSV de test, dans un dossier temporaire :
+    1. premier lancement : tout est téléchargé et ajouté au stockage
+    2. relance sans changement : que des 304, aucun match ajouté
+    3. une saison modifiée : elle seule est re-téléchargée, ses nouveaux matchs ajoutés
+    """
+    source = pd.read_csv(DATA_DIR / 'football_all_leagues.csv')
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        ecrire_fixtures(source, tmp / "serveur")
+        handler = partial(_ServeurFixtures, directory=str(tmp / "serveur"))
+        serveur = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{serveur.server_port}"
+        n_fichiers = source.groupby(['LeagueCode', 'Season']).ngroups
+
+        def lancer():
+            _ServeurFixtures.codes = []
+            df = main(url, tmp / "cache", workers, data_dir=tmp, store_dir=tmp / "matches")
+            return df, sorted(_ServeurFixtures.codes), len(load_matches(directory=tmp / "matches",
+                                                                     source=None))
+
+        try:
+            df, codes, stockes = lancer()
+            assert codes.count(200) == n_fichiers, codes
+            assert len(df) == stockes == len(source), (len(df), stockes, len(source))
+
+            df, codes, stockes = lancer()
+            assert codes == [304] * n_fichiers, codes
+            assert stockes == len(source), stockes
+
+            # Un match de plus dans la saison en cours de Premier League
+            fichier = tmp / "serveur" / "2526" / "E0.csv"
+            saison = pd.read_csv(fichier)
+            nouveau = saison.iloc[[-1]].assign(Date="31/05/2026")
+            pd.concat([saison, nouveau]).to_csv(fichier, index=False)
+            mtime = fichier.stat().st_mtime + 10  # Last-Modified est à la seconde près
+            os.utime(fichier, (mtime, mtime))
+            df, codes, stockes = lancer()
+            assert codes.count(200) == 1 and codes.count(304) == n_fichiers - 1, codes
+            assert len(df) == stockes == len(source) + 1, (len(df), stockes)
+        finally:
+            serveur.shutdown()
+            serveur.server_close()
+
+    print(f"\nVérification OK: {n_fichiers} fichiers téléchargés, relance en 304, "
+          f"1 saison modifiée re-téléchargée")
+
+
 if __name__ == "__main__":
-    df = main()
-    
+    parser = argparse.ArgumentParser(description="Téléchargement incrémental des données football")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="URL de base des CSV (<base>/<saison>/<championnat>.csv)")
+    parser.add_argument("--workers", type=int, default=8, help="Téléchargements simultanés")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR), help="Cache HTTP sur disque")
+    parser.add_argument("--self-test", action="store_true",
+                        help="Vérifier le téléchargement incrémental contre un serveur local "
+                             "(dossier temporaire, data/ n'est pas modifié)")
+    args = parser.parse_args()
+
+    if args.self_test:
+        verifier_serveur_local(args.workers)
+        sys.exit(0)
+
+    df = main(args.base_url, args.cache_dir, args.workers)
+
     if df is not None:
         print(f"\n{'='*60}")
         print("APERÇU DES DONNÉES")
         print(f"{'='*60}")
         print(df.head(10))
-        print(f"\nColonnes: {list(df.columns)}")
\ No newline at end of file
+        print(f"\nColonnes: {list(df.columns)}")
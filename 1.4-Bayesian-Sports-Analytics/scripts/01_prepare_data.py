@@ -1,26 +1,28 @@
-import pandas as pd
+import argparse
 import json
+from match_store import load_matches
+from stan_models import compress_matches, prepare_league
 
-# Chargement
-df = pd.read_csv("data/football_all_leagues.csv")
+parser = argparse.ArgumentParser(description="Préparation des données d'un championnat")
+parser.add_argument("--league", default="Premier League")
+parser.add_argument("--seasons", nargs="+", default=["2019-20", "2020-21", "2021-22"])
+args = parser.parse_args()
 
-df = df[
-    (df["League"] == "Premier League") &
-    (df["Season"].isin(["2019-20", "2020-21", "2021-22"]))
-].copy()
+# Chargement (seules les partitions du championnat et des saisons sont lues)
+df = load_matches(args.league, args.seasons)
 
 #mapping équipes → ID
-teams = pd.unique(pd.concat([df["HomeTeam"], df["AwayTeam"]]))
-team2id = {team: i + 1 for i, team in enumerate(teams)}
-id2team = {i + 1: team for team, i in team2id.items()}
-
-df["home_id"] = df["HomeTeam"].map(team2id)
-df["away_id"] = df["AwayTeam"].map(team2id)
+df, team2id = prepare_league(df, args.league, args.seasons)
 
 # Sauvegarde
 df.to_csv("data/premier_league_ready.csv", index=False)
 
+# Données compressées pour Stan : une ligne par affiche (statistiques suffisantes)
+compressed = compress_matches(df)
+compressed.to_csv("data/premier_league_compressed.csv", index=False)
+
 with open("data/team_mapping.json", "w") as f:
     json.dump(team2id, f, indent=2)
 
-print(f"{len(df)} matchs | {len(teams)} équipes")
+print(f"{len(df)} matchs | {len(team2id)} équipes")
+print(f"{len(compressed)} lignes après compression ({len(df) / len(compressed):.1f}x moins)")
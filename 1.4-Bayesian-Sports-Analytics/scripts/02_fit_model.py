@@ -1,31 +1,86 @@
+import argparse
+import json
+import time
+from pathlib import Path
 import pandas as pd
-from cmdstanpy import CmdStanModel
-import pickle
-
-df = pd.read_csv("data/premier_league_ready.csv")
-
-stan_data = {
-    "N": len(df),
-    "T": max(df["home_id"].max(), df["away_id"].max()),
-    "home_team": df["home_id"].values,
-    "away_team": df["away_id"].values,
-    "home_goals": df["HomeGoals"].values.astype(int),
-    "away_goals": df["AwayGoals"].values.astype(int),
-}
+from posterior_store import compare_posteriors, save_posterior, warm_start_arguments
+from stan_models import METHODS, fit_diagnostics, fit_model, sample_model
+
+parser = argparse.ArgumentParser(description="Entraînement du modèle Stan")
+parser.add_argument("--threads", type=int, default=1,
+                    help="Threads par chaîne (> 1 : vraisemblance parallélisée par reduce_sum)")
+parser.add_argument("--no-compress", action="store_true",
+                    help="Échantillonner sur les matchs individuels plutôt que sur les affiches compressées")
+parser.add_argument("--method", choices=list(METHODS), default="sample",
+                    help="Inférence : NUTS complet (sample) ou approximation rapide (laplace, pathfinder, variational)")
+parser.add_argument("--incremental", action="store_true",
+                    help="Ré-ajustement à chaud depuis data/posterior (inits, pas et métrique adaptés)")
+parser.add_argument("--warmup", type=int, default=None,
+                    help="Itérations de warmup (1000, ou 200 en mode incrémental)")
+parser.add_argument("--sampling", type=int, default=None,
+                    help="Itérations de sampling (2000, ou 1000 en mode incrémental)")
+parser.add_argument("--check", action="store_true",
+                    help="Avec --incremental : lancer aussi un ajustement à froid et comparer")
+args = parser.parse_args()
+if args.threads > 1 and not args.no_compress:
+    parser.error("--threads > 1 nécessite --no-compress (pas de reduce_sum pour les affiches compressées)")
+
+if args.no_compress:
+    df = pd.read_csv("data/premier_league_ready.csv")
+else:
+    df = pd.read_csv("data/premier_league_compressed.csv")
+
+with open("data/team_mapping.json") as f:
+    team2id = json.load(f)
 
-model = CmdStanModel(stan_file="stan/football_model.stan")
+if args.method != "sample":
+    # Exploration rapide : même artefact, marqué comme approximation dans meta.json
+    start = time.perf_counter()
+    fit = fit_model(df, method=args.method)
+    save_posterior(fit, "data/posterior", team2id, method=args.method)
+    print(f"{METHODS[args.method]} : {time.perf_counter() - start:.1f} s "
+          "(approximation du postérieur, réserver NUTS aux analyses finales)")
+    raise SystemExit
 
-fit = model.sample(
-    data=stan_data,
-    chains=4,
-    iter_warmup=1000,
-    iter_sampling=2000,
-    adapt_delta=0.95
-)
+sampler = {
+    "threads": args.threads,
+    "chains": 4,
+    "iter_warmup": args.warmup or (200 if args.incremental else 1000),
+    "iter_sampling": args.sampling or (1000 if args.incremental else 2000),
+    "adapt_delta": 0.95,
+}
+if args.incremental:
+    if not Path("data/posterior/warm_start.json").exists():
+        raise SystemExit("--incremental : aucun postérieur NUTS dans data/posterior "
+                         "(lancer d'abord un ajustement complet)")
+    # Partir du postérieur précédent : la phase initiale d'adaptation est raccourcie
+    sampler.update(warm_start_arguments("data/posterior", team2id),
+                   adapt_init_phase=25, adapt_metric_window=75, adapt_step_size=50)
+
+start = time.perf_counter()
+fit = sample_model(df, **sampler)
+elapsed = time.perf_counter() - start
 
-with open("data/fit.pkl", "wb") as f:
-    pickle.dump(fit, f)
+save_posterior(fit, "data/posterior", team2id, details={"warm_start": args.incremental})
 
 summary = fit.summary()
-cols = [c for c in summary.columns if "R_hat" in c or "Eff" in c]
-print(summary[cols])
\ No newline at end of file
+cols = [c for c in summary.columns if "R_hat" in c or "Eff" in c or "ESS" in c]
+print(summary[cols])
+
+diagnostics = fit_diagnostics(fit)
+print(f"\n{'Incrémental' if args.incremental else 'À froid'} : {elapsed:.1f} s "
+      f"(warmup {diagnostics['warmup_seconds']:.1f} s, sampling {diagnostics['sampling_seconds']:.1f} s)")
+print(f"R_hat max {diagnostics['max_r_hat']:.4f} | ESS min {diagnostics['min_ess']:.0f} | "
+      f"divergences {diagnostics['divergences']}")
+
+if args.incremental and args.check:
+    # Référence : ajustement à froid sur les mêmes données
+    start = time.perf_counter()
+    cold = sample_model(df, threads=args.threads, chains=4, iter_warmup=1000,
+                        iter_sampling=2000, adapt_delta=0.95)
+    cold_elapsed = time.perf_counter() - start
+    save_posterior(cold, "data/posterior_cold", team2id)
+    print(f"\nÀ froid : {cold_elapsed:.1f} s, soit {elapsed / cold_elapsed:.0%} du temps pour l'incrémental")
+    print("Écart maximal des moyennes (en écarts-types du postérieur à froid) :")
+    for name, gap in compare_posteriors("data/posterior", "data/posterior_cold").items():
+        print(f"  {name:10s} {gap:.3f}")
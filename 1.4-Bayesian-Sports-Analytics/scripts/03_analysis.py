@@ -1,26 +1,15 @@
-import pickle
 import pandas as pd
-import json
 import numpy as np
+from posterior_store import load_posterior, load_teams
 
-with open("data/fit.pkl", "rb") as f:
-    fit = pickle.load(f)
+posterior = load_posterior("data/posterior", ["home_adv", "attack", "defense"])
+teams = load_teams("data/posterior")
 
-with open("data/team_mapping.json") as f:
-    team2id = json.load(f)
-
-id2team = {v: k for k, v in team2id.items()}
-
-posterior = fit.draws_pd()
-
-attack_cols = [c for c in posterior.columns if "attack[" in c]
-defense_cols = [c for c in posterior.columns if "defense[" in c]
-
-attack_mean = posterior[attack_cols].mean().values
-defense_mean = posterior[defense_cols].mean().values
+attack_mean = posterior["attack"].mean(axis=0)
+defense_mean = posterior["defense"].mean(axis=0)
 
 ranking = pd.DataFrame({
-    "Team": [id2team[i + 1] for i in range(len(attack_mean))],
+    "Team": teams,
     "Attack": attack_mean,
     "Defense": defense_mean
 })
@@ -44,7 +33,7 @@ print("="*60)
 home_adv = posterior["home_adv"]
 
 print(f"Mean  : {home_adv.mean():.4f}")
-print(f"Std   : {home_adv.std():.4f}")
+print(f"Std   : {home_adv.std(ddof=1):.4f}")
 print(f"95% CI: [{np.percentile(home_adv, 2.5):.4f}, {np.percentile(home_adv, 97.5):.4f}]")
 print(f"exp(mean) = {np.exp(home_adv.mean()):.4f} → ~{(np.exp(home_adv.mean())-1)*100:.1f}% more goals at home")
 print()
@@ -1,36 +1,9 @@
-import numpy as np
-import pickle
-import json
+from match_predictor import FixturePredictions, top_scores
 
-with open("data/fit.pkl", "rb") as f:
-    fit = pickle.load(f)
+# Toutes les affiches du championnat, calculées une fois puis lues dans le cache
+fixtures = FixturePredictions("data/posterior")
+fixtures.outcome_table().to_csv("data/fixture_predictions.csv", index=False)
 
-with open("data/team_mapping.json") as f:
-    team2id = json.load(f)
-
-posterior = fit.draws_pd()
-
-attack = posterior.filter(like="attack[").mean().values
-defense = posterior.filter(like="defense[").mean().values
-home_adv = posterior["home_adv"].mean()
-
-def simulate_match(home, away, n=10000):
-    h = team2id[home] - 1
-    a = team2id[away] - 1
-
-    lam_home = np.exp(home_adv + attack[h] - defense[a])
-    lam_away = np.exp(attack[a] - defense[h])
-
-    gh = np.random.poisson(lam_home, n)
-    ga = np.random.poisson(lam_away, n)
-
-    return {
-        "home_win": (gh > ga).mean(),
-        "Odds_home_win": 1/(gh > ga).mean(),
-        "draw": (gh == ga).mean(),
-        "Odds_draw": 1/(gh == ga).mean(),
-        "away_win": (gh < ga).mean()
-        ,"Odds_away_win": 1/(gh < ga).mean(),
-    }
-
-print(simulate_match("Man United", "Chelsea"))
+prediction = fixtures.predict("Man United", "Chelsea")
+print({k: round(float(v), 4) for k, v in prediction.items() if k != "score_matrix"})
+print(top_scores(prediction["score_matrix"], 5))
@@ -1,37 +1,11 @@
 import pandas as pd
-import numpy as np
-import pickle
-import json
+from match_predictor import FixturePredictions
 
-# Charger le modèle (comme dans script 04)
-with open("data/fit.pkl", "rb") as f:
-    fit = pickle.load(f)
-
-with open("data/team_mapping.json") as f:
-    team2id = json.load(f)
-
-posterior = fit.draws_pd()
-attack = posterior.filter(like="attack[").mean().values
-defense = posterior.filter(like="defense[").mean().values
-home_adv = posterior["home_adv"].mean()
-
-
-def simulate_match(home, away, n=10000):
-    """Fonction de prédiction (identique au script 04)"""
-    h = team2id[home] - 1
-    a = team2id[away] - 1
-
-    lam_home = np.exp(home_adv + attack[h] - defense[a])
-    lam_away = np.exp(attack[a] - defense[h])
-
-    gh = np.random.poisson(lam_home, n)
-    ga = np.random.poisson(lam_away, n)
-
-    return {
-        "home_win": (gh > ga).mean(),
-        "draw": (gh == ga).mean(),
-        "away_win": (gh < ga).mean(),
-    }
+# Prédictions de toutes les affiches (comme dans script 04, cache partagé)
+fixtures = FixturePredictions("data/posterior")
+team2id = fixtures.team2id
+# Historique des cotes, lu une seule fois pour toutes les comparaisons
+history = pd.read_csv("data/premier_league_ready.csv")
 
 
 def compare_match(home_team, away_team):
@@ -44,13 +18,10 @@ def compare_match(home_team, away_team):
         return
     
     # Prédiction du modèle
-    pred = simulate_match(home_team, away_team)
-    
-    # Charger les données avec cotes bookmakers
-    df = pd.read_csv("data/premier_league_ready.csv")
+    pred = fixtures.predict(home_team, away_team)
     
     # Chercher les matchs historiques entre ces équipes
-    matches = df[(df["HomeTeam"] == home_team) & (df["AwayTeam"] == away_team)].copy()
+    matches = history[(history["HomeTeam"] == home_team) & (history["AwayTeam"] == away_team)].copy()
     
     print(f"\n{'='*60}")
     print(f"{home_team} vs {away_team}")
@@ -0,0 +1,52 @@
+import argparse
+import time
+import pandas as pd
+from match_store import load_matches
+from posterior_store import load_posterior, load_teams
+from season_simulator import (PARAMETERS, TIE_BREAKS, current_standings, season_table,
+                              simulate_season, split_season)
+
+parser = argparse.ArgumentParser(description="Simulation de la fin de saison")
+parser.add_argument("--league", default="Premier League")
+parser.add_argument("--season", default=None, help="Saison (ex: 2025-26), la plus récente par défaut")
+parser.add_argument("--as-of", default=None,
+                    help="Date (AAAA-MM-JJ) : les matchs postérieurs sont re-simulés")
+parser.add_argument("--simulations", type=int, default=100_000)
+parser.add_argument("--seed", type=int, default=None)
+args = parser.parse_args()
+
+df = load_matches(args.league)
+season = args.season or df["Season"].max()
+teams, played, remaining = split_season(df[df["Season"] == season], as_of=args.as_of)
+
+posterior = load_posterior("data/posterior", PARAMETERS)
+
+start = time.perf_counter()
+result = simulate_season(
+    posterior,
+    load_teams("data/posterior"),
+    teams,
+    played,
+    remaining,
+    n_simulations=args.simulations,
+    tie_break=TIE_BREAKS.get(args.league, "goal_difference"),
+    seed=args.seed
+)
+elapsed = time.perf_counter() - start
+
+print("="*60)
+print(f"{args.league} {season} : {len(played)} matchs joués, {len(remaining)} restants")
+print(f"{args.simulations:,} saisons simulées en {elapsed:.1f} s")
+print("="*60)
+if result["unknown_teams"]:
+    print("Équipes absentes du postérieur (forces tirées de la loi hiérarchique) :")
+    print("  " + ", ".join(result["unknown_teams"]))
+    print()
+
+table = season_table(result, current_standings(teams, played))
+print(table.to_string(index=False, float_format="%.3f"))
+
+positions = pd.DataFrame(result["positions"], index=teams,
+                         columns=range(1, len(teams) + 1)).loc[table["Team"]]
+positions.to_csv("data/season_positions.csv", index_label="Team")
+print("\nDistribution des positions : data/season_positions.csv")
@@ -0,0 +1,235 @@
+"""
+Backtest walk-forward contre les cotes des bookmakers
+
+La période de test est découpée en journées (fenêtres de --step-days jours).
+Pour chaque journée, le modèle est ré-entraîné sur les matchs antérieurs
+(--train-days jours d'historique), puis prédit les matchs de la journée :
+aucune prédiction n'utilise de données postérieures au coup d'envoi.
+
+Métriques, pour le modèle et pour les probabilités implicites des
+bookmakers (cotes normalisées, marge retirée) :
+- log-loss : -log P(résultat observé)
+- Brier    : somme des carrés des écarts sur les 3 issues
+ROI des paris sur l'issue de plus grand avantage (p × cote - 1 > --min-edge) :
+- flat  : mise d'une unité
+- kelly : mise de --kelly-fraction × fraction de Kelly d'une bankroll
+          unitaire, sans capitalisation d'un match à l'autre
+
+Les ajustements des journées sont indépendants : ils tournent en parallèle
+(--workers processus), et chaque postérieur est mis en cache dans
+--cache-dir sous la clé des données d'entraînement, du modèle et de la
+configuration de l'échantillonneur. Relancer un backtest ne ré-entraîne que
+les journées nouvelles ou modifiées.
+
+Usage : python scripts/backtest.py --league "Premier League" --season 2024-25 --workers 4
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from match_predictor import match_markets, score_matrix
+from match_store import load_matches
+from posterior_store import load_posterior, load_teams, save_posterior
+from season_simulator import PARAMETERS, team_strengths
+from stan_models import PROJECT_DIR, compress_matches, fit_key, load_model, sample_model, select_variant
+
+OUTCOMES = ("H", "D", "A")
+ODDS_COLUMNS = ("OddsHome", "OddsDraw", "OddsAway")
+
+
+def make_rounds(df, season, step_days=7):
+    """Découpe la saison de test en fenêtres de step_days jours : liste de (début, fin)"""
+    dates = df.loc[df["Season"] == season, "Date"]
+    edges = pd.date_range(dates.min(), dates.max() + pd.Timedelta(days=step_days),
+                          freq=f"{step_days}D")
+    return [(start, end) for start, end in zip(edges[:-1], edges[1:])
+            if ((dates >= start) & (dates < end)).any()]
+
+
+def training_data(df, start, train_days):
+    """Matchs des train_days jours précédant start, avec identifiants d'équipes"""
+    train = df[(df["Date"] < start) & (df["Date"] >= start - pd.Timedelta(days=train_days))].copy()
+    teams = sorted(set(train["HomeTeam"]) | set(train["AwayTeam"]))
+    team2id = {team: i + 1 for i, team in enumerate(teams)}
+    train["home_id"] = train["HomeTeam"].map(team2id).astype(int)
+    train["away_id"] = train["AwayTeam"].map(team2id).astype(int)
+    return train, team2id
+
+
+def fit_round(train, team2id, cache_dir, sampler):
+    """
+    Ajuste le modèle sur les données d'une journée, ou relit le postérieur en cache
+
+    Returns:
+        (dossier du postérieur, True si relu dans le cache)
+    """
+    compressed = compress_matches(train)
+    directory = Path(cache_dir) / fit_key(compressed, **sampler)[:16]
+    if (directory / "meta.json").exists():
+        return directory, True
+    fit = sample_model(compressed, show_progress=False, **sampler)
+    save_posterior(fit, directory, team2id)
+    return directory, False
+
+
+def predict_round(directory, test, seed=None):
+    """Probabilités (matchs, 3) des issues H / D / A des matchs de test"""
+    posterior = load_posterior(directory, PARAMETERS)
+    teams = sorted(set(test["HomeTeam"]) | set(test["AwayTeam"]))
+    attack, defense, _ = team_strengths(posterior, load_teams(directory), teams,
+                                        np.random.default_rng(seed))
+    strengths = {"mu": posterior["mu"], "home_adv": posterior["home_adv"],
+                 "attack": attack, "defense": defense}
+    index = {team: i for i, team in enumerate(teams)}
+    probabilities = []
+    for home, away in zip(test["HomeTeam"], test["AwayTeam"]):
+        markets = match_markets(score_matrix(strengths, index[home], index[away]))
+        total = markets["home_win"] + markets["draw"] + markets["away_win"]
+        probabilities.append([markets["home_win"] / total, markets["draw"] / total,
+                              markets["away_win"] / total])
+    return np.array(probabilities)
+
+
+def run_round(df, start, end, train_days, cache_dir, sampler):
+    """Une journée : ajustement (ou cache) puis prédictions, exécuté dans un worker"""
+    train, team2id = training_data(df, start, train_days)
+    test = df[(df["Date"] >= start) & (df["Date"] < end)].copy()
+    directory, cached = fit_round(train, team2id, cache_dir, sampler)
+    probabilities = predict_round(directory, test, seed=sampler.get("seed"))
+    for k, outcome in enumerate(OUTCOMES):
+        test[f"p_{outcome}"] = probabilities[:, k]
+    test["cached"] = cached
+    return test
+
+
+def bookmaker_probabilities(predictions):
+    """Probabilités implicites des cotes, normalisées (marge retirée)"""
+    implied = 1 / predictions[list(ODDS_COLUMNS)].values
+    return implied / implied.sum(axis=1, keepdims=True)
+
+
+def scoring(probabilities, outcomes):
+    """Log-loss et score de Brier moyens"""
+    observed = (outcomes[:, None] == np.array(OUTCOMES)[None, :]).astype(float)
+    p_observed = (probabilities * observed).sum(axis=1)
+    return {
+        "log_loss": float(-np.log(np.clip(p_observed, 1e-15, None)).mean()),
+        "brier": float(((probabilities - observed) ** 2).sum(axis=1).mean()),
+    }
+
+
+def betting(probabilities, odds, outcomes, min_edge=0.0, kelly_fraction=0.25):
+    """
+    ROI des paris flat et Kelly sur l'issue de plus grand avantage de chaque match
+
+    Returns:
+        Dictionnaire avec bets, flat_roi, kelly_roi, kelly_staked
+    """
+    edges = probabilities * odds - 1
+    best = edges.argmax(axis=1)
+    rows = np.arange(len(best))
+    edge, price = edges[rows, best], odds[rows, best]
+    won = np.array(OUTCOMES)[best] == outcomes
+    bet = edge > min_edge
+
+    returns = np.where(won, price - 1, -1.0)
+    kelly_stakes = np.where(bet, kelly_fraction * edge / (price - 1), 0.0)
+    flat_staked = bet.sum()
+    kelly_staked = kelly_stakes.sum()
+    return {
+        "bets": int(flat_staked),
+        "flat_roi": float(returns[bet].sum() / flat_staked) if flat_staked else float("nan"),
+        "kelly_roi": float((kelly_stakes * returns).sum() / kelly_staked) if kelly_staked else float("nan"),
+        "kelly_staked": float(kelly_staked),
+    }
+
+
+def summarize(predictions, min_edge=0.0, kelly_fraction=0.25):
+    """Métriques du modèle et des bookmakers sur les matchs avec cotes"""
+    predictions = predictions.dropna(subset=list(ODDS_COLUMNS))
+    outcomes = predictions["Result"].to_numpy(dtype=object)
+    model = predictions[[f"p_{outcome}" for outcome in OUTCOMES]].values
+    bookmaker = bookmaker_probabilities(predictions)
+    return {
+        "matches": len(predictions),
+        "model": scoring(model, outcomes),
+        "bookmaker": scoring(bookmaker, outcomes),
+        "betting": betting(model, predictions[list(ODDS_COLUMNS)].values, outcomes,
+                           min_edge, kelly_fraction),
+    }
+
+
+def run_backtest(df, season, train_days=3 * 365, step_days=7, workers=1,
+                 cache_dir=PROJECT_DIR / "data" / "backtest_cache", sampler=None):
+    """
+    Backtest walk-forward d'une saison : une journée par tâche, en parallèle
+
+    Returns:
+        DataFrame des matchs de test avec les probabilités p_H, p_D, p_A
+    """
+    sampler = sampler or {}
+    df = df.copy()
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True)
+    rounds = make_rounds(df, season, step_days)
+    # Ne tester que la saison demandée (les fenêtres peuvent déborder sur la suivante)
+    season_df = df[(df["Season"] == season) | (df["Date"] < rounds[0][0])]
+
+    # Compilation dans le processus parent : les workers trouvent ensuite un exécutable
+    # à jour, au lieu de lancer make en même temps sur le même modèle
+    train, _ = training_data(season_df, rounds[0][0], train_days)
+    load_model(select_variant(compress_matches(train), sampler.get("threads", 1)))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_round, season_df, start, end, train_days, cache_dir, sampler)
+                   for start, end in rounds]
+        results = [future.result() for future in futures]
+    return pd.concat(results, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest walk-forward contre les bookmakers")
+    parser.add_argument("--league", default="Premier League")
+    parser.add_argument("--season", default="2024-25", help="Saison de test")
+    parser.add_argument("--train-days", type=int, default=3 * 365,
+                        help="Historique d'entraînement avant chaque journée (jours)")
+    parser.add_argument("--step-days", type=int, default=7, help="Longueur d'une journée (jours)")
+    parser.add_argument("--workers", type=int, default=4, help="Ajustements en parallèle")
+    parser.add_argument("--chains", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--sampling", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--min-edge", type=float, default=0.0)
+    parser.add_argument("--kelly-fraction", type=float, default=0.25)
+    parser.add_argument("--cache-dir", default=str(PROJECT_DIR / "data" / "backtest_cache"))
+    parser.add_argument("--output", default=str(PROJECT_DIR / "data" / "backtest_predictions.csv"))
+    args = parser.parse_args()
+
+    df = load_matches(args.league)
+    sampler = {"chains": args.chains, "iter_warmup": args.warmup,
+               "iter_sampling": args.sampling, "seed": args.seed}
+
+    start = time.perf_counter()
+    predictions = run_backtest(df, args.season, args.train_days, args.step_days,
+                               args.workers, args.cache_dir, sampler)
+    elapsed = time.perf_counter() - start
+    predictions.to_csv(args.output, index=False)
+
+    summary = summarize(predictions, args.min_edge, args.kelly_fraction)
+    print("=" * 60)
+    print(f"{args.league} {args.season} : {summary['matches']} matchs, "
+          f"{predictions['cached'].sum()} prédits depuis le cache, {elapsed:.0f} s")
+    print("=" * 60)
+    print(f"{'':12s}{'Log-loss':>12s}{'Brier':>10s}")
+    for name in ("model", "bookmaker"):
+        print(f"{name:12s}{summary[name]['log_loss']:>12.4f}{summary[name]['brier']:>10.4f}")
+    bets = summary["betting"]
+    print(f"\nParis : {bets['bets']} | ROI flat {bets['flat_roi']:+.2%} | "
+          f"ROI Kelly {bets['kelly_roi']:+.2%} ({bets['kelly_staked']:.2f} unités misées)")
+    with open(Path(args.output).with_suffix(".json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\nPrédictions : {args.output} (résumé : {Path(args.output).with_suffix('.json').name})")
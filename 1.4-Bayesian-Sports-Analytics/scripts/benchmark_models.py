@@ -0,0 +1,69 @@
+"""
+Compare les variantes du modèle Stan sur l'ensemble des championnats
+(football_all_leagues.csv) : boucle, vectorisée, reduce_sum multi-thread et
+données compressées par affiche
+
+Pour chaque variante : temps total d'échantillonnage (warmup compris) et
+évaluations du gradient par seconde (pas leapfrog / temps), le second
+indicateur étant indépendant du nombre d'itérations retenu.
+
+Usage : python scripts/benchmark_models.py [--threads 4] [--chains 1]
+"""
+
+import argparse
+import time
+import pandas as pd
+from match_store import load_matches
+from stan_models import compress_matches, gradient_evaluations, load_model, sample_model
+
+parser = argparse.ArgumentParser(description="Benchmark des variantes du modèle Stan")
+parser.add_argument("--threads", type=int, default=4, help="Threads par chaîne de la variante reduce_sum")
+parser.add_argument("--chains", type=int, default=1)
+parser.add_argument("--warmup", type=int, default=500)
+parser.add_argument("--sampling", type=int, default=500)
+parser.add_argument("--seed", type=int, default=1234)
+args = parser.parse_args()
+
+# Tous les championnats et toutes les saisons : équipes identifiées par (League, Team)
+df = load_matches()
+df = df.dropna(subset=["HomeGoals", "AwayGoals"])
+teams = sorted(set(zip(df["League"], df["HomeTeam"])) | set(zip(df["League"], df["AwayTeam"])))
+team_to_id = {team: i + 1 for i, team in enumerate(teams)}
+df["home_id"] = [team_to_id[t] for t in zip(df["League"], df["HomeTeam"])]
+df["away_id"] = [team_to_id[t] for t in zip(df["League"], df["AwayTeam"])]
+compressed = compress_matches(df)
+print(f"{len(df)} matchs | {len(teams)} équipes | {len(compressed)} affiches\n")
+
+variants = [("loop", 1), ("vectorized", 1), ("threaded", args.threads), ("compressed", 1)]
+# Compilation hors chronométrage
+for variant, _ in variants:
+    load_model(variant)
+
+results = []
+for variant, threads in variants:
+    start = time.perf_counter()
+    fit = sample_model(
+        compressed if variant == "compressed" else df,
+        threads=threads,
+        variant=variant,
+        chains=args.chains,
+        iter_warmup=args.warmup,
+        iter_sampling=args.sampling,
+        seed=args.seed,
+        save_warmup=True,
+        show_progress=False
+    )
+    seconds = time.perf_counter() - start
+    gradients = gradient_evaluations(fit)
+    results.append({
+        "Variante": variant,
+        "Threads": threads,
+        "Temps (s)": seconds,
+        "Gradients": gradients,
+        "Gradients/s": gradients / seconds,
+        "home_adv": fit.stan_variable("home_adv").mean(),
+    })
+
+results = pd.DataFrame(results)
+results["Accélération"] = results["Gradients/s"] / results.loc[0, "Gradients/s"]
+print(results.to_string(index=False, float_format="%.3f"))
@@ -0,0 +1,194 @@
+"""
+Prédiction exacte d'un match à partir du postérieur
+
+Pour chaque tirage, les buts à domicile et à l'extérieur sont des Poisson
+indépendantes de paramètres
+    λ_home = exp(mu + home_adv + attack[home] - defense[away])
+    λ_away = exp(mu + attack[away] - defense[home])
+La matrice des scores P(home = i, away = j) est la moyenne, sur tous les
+tirages, du produit des deux PMF (tronquées à max_goals buts). Issues, scores
+exacts et over/under s'en déduisent sans simulation : le résultat est
+déterministe et intègre l'incertitude du postérieur.
+
+FixturePredictions calcule d'un coup les matrices de toutes les affiches
+(T × T) et les met en cache sur disque, sous une clé dérivée de l'empreinte
+du postérieur : une prédiction devient une simple lecture.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+from posterior_store import load_posterior, load_teams, posterior_hash
+
+MAX_GOALS = 10
+TOTAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+PARAMETERS = ("mu", "home_adv", "attack", "defense")
+
+
+def expected_goals(posterior, home_idx, away_idx):
+    """λ_home et λ_away de chaque tirage (indices d'équipes à partir de 0)"""
+    mu = posterior["mu"]
+    attack = posterior["attack"]
+    defense = posterior["defense"]
+    lam_home = np.exp(mu + posterior["home_adv"] + attack[:, home_idx] - defense[:, away_idx])
+    lam_away = np.exp(mu + attack[:, away_idx] - defense[:, home_idx])
+    return lam_home, lam_away
+
+
+def poisson_pmf(goals, lam):
+    """PMF de Poisson (draws, goals) en échelle log, pour tous les tirages à la fois"""
+    return np.exp(goals[None, :] * np.log(lam)[:, None] - lam[:, None] - gammaln(goals + 1)[None, :])
+
+
+def score_matrix(posterior, home_idx, away_idx, max_goals=MAX_GOALS):
+    """
+    Matrice (max_goals + 1, max_goals + 1) des probabilités de score,
+    ligne = buts à domicile, colonne = buts à l'extérieur
+    """
+    lam_home, lam_away = expected_goals(posterior, home_idx, away_idx)
+    goals = np.arange(max_goals + 1)
+    pmf_home = poisson_pmf(goals, lam_home)  # (draws, goals)
+    pmf_away = poisson_pmf(goals, lam_away)
+    # Moyenne sur les tirages de draws × goals × goals, sans matérialiser le tenseur
+    return np.einsum("di,dj->ij", pmf_home, pmf_away) / len(lam_home)
+
+
+def match_markets(matrix, lines=TOTAL_LINES):
+    """
+    Marchés déduits d'une matrice de scores
+
+    Returns:
+        Dictionnaire avec home_win, draw, away_win, les cotes équitables
+        Odds_*, over_<ligne> / under_<ligne> pour chaque ligne de total de buts,
+        et truncated_mass (masse au-delà de max_goals, non attribuée)
+    """
+    home_win = np.tril(matrix, -1).sum()
+    draw = np.trace(matrix)
+    away_win = np.triu(matrix, 1).sum()
+    markets = {
+        "home_win": home_win,
+        "Odds_home_win": 1 / home_win,
+        "draw": draw,
+        "Odds_draw": 1 / draw,
+        "away_win": away_win,
+        "Odds_away_win": 1 / away_win,
+    }
+
+    size = matrix.shape[0]
+    totals = np.bincount(np.add.outer(np.arange(size), np.arange(size)).ravel(),
+                         weights=matrix.ravel())
+    for line in lines:
+        under = totals[:int(np.floor(line)) + 1].sum()
+        markets[f"under_{line}"] = under
+        markets[f"over_{line}"] = matrix.sum() - under
+
+    markets["truncated_mass"] = 1 - matrix.sum()
+    return markets
+
+
+def top_scores(matrix, n=10):
+    """Les n scores les plus probables : liste de ("h-a", probabilité)"""
+    order = np.argsort(matrix, axis=None)[::-1][:n]
+    return [(f"{i}-{j}", float(matrix[i, j])) for i, j in zip(*np.unravel_index(order, matrix.shape))]
+
+
+def predict_match(posterior, team2id, home, away, max_goals=MAX_GOALS, lines=TOTAL_LINES):
+    """
+    Prédiction complète d'un match entre deux équipes (noms)
+
+    Returns:
+        match_markets(...) complété par 'score_matrix'
+    """
+    matrix = score_matrix(posterior, team2id[home] - 1, team2id[away] - 1, max_goals)
+    prediction = match_markets(matrix, lines)
+    prediction["score_matrix"] = matrix
+    return prediction
+
+
+def all_pairs_score_matrices(posterior, max_goals=MAX_GOALS, chunk_size=500):
+    """
+    Matrices de scores de toutes les affiches ordonnées, tableau
+    (T, T, max_goals + 1, max_goals + 1) indexé par [domicile, extérieur]
+
+    Les tirages sont traités par blocs de chunk_size pour borner la mémoire
+    (chunk_size × T × T × (max_goals + 1) par PMF).
+    """
+    mu = posterior["mu"]
+    draws, teams = posterior["attack"].shape
+    goals = np.arange(max_goals + 1)
+    log_factorial = gammaln(goals + 1)
+    matrices = np.zeros((teams, teams, max_goals + 1, max_goals + 1))
+
+    for start in range(0, draws, chunk_size):
+        block = slice(start, start + chunk_size)
+        attack = np.asarray(posterior["attack"][block])
+        defense = np.asarray(posterior["defense"][block])
+        base = np.asarray(mu[block])[:, None, None]
+        # log λ de chaque tirage et affiche (draws, domicile, extérieur)
+        log_home = base + np.asarray(posterior["home_adv"][block])[:, None, None] \
+            + attack[:, :, None] - defense[:, None, :]
+        log_away = base + attack[:, None, :] - defense[:, :, None]
+        pmf_home = np.exp(goals * log_home[..., None] - np.exp(log_home)[..., None] - log_factorial)
+        pmf_away = np.exp(goals * log_away[..., None] - np.exp(log_away)[..., None] - log_factorial)
+        # Somme sur les tirages des produits extérieurs : un produit matriciel par affiche
+        matrices += np.matmul(pmf_home.transpose(1, 2, 3, 0), pmf_away.transpose(1, 2, 0, 3))
+
+    return matrices / draws
+
+
+class FixturePredictions:
+    """
+    Prédictions de toutes les affiches d'un postérieur
+
+    Les matrices de scores sont calculées une fois puis mises en cache dans
+    <dossier parent du postérieur>/cache/, sous l'empreinte du postérieur :
+    un postérieur ré-entraîné invalide naturellement le cache.
+    """
+
+    _memory_cache = {}
+
+    def __init__(self, directory, max_goals=MAX_GOALS):
+        directory = Path(directory)
+        self.teams = load_teams(directory)
+        self.team2id = {team: i + 1 for i, team in enumerate(self.teams)}
+        self.key = f"{posterior_hash(directory)[:16]}_{max_goals}"
+
+        cache_file = directory.parent / "cache" / f"fixtures_{self.key}.npy"
+        if self.key in self._memory_cache:
+            self.matrices = self._memory_cache[self.key]
+        elif cache_file.exists():
+            self.matrices = np.load(cache_file)
+        else:
+            self.matrices = all_pairs_score_matrices(load_posterior(directory, PARAMETERS), max_goals)
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            np.save(cache_file, self.matrices)
+        self._memory_cache[self.key] = self.matrices
+
+    def score_matrix(self, home, away):
+        return self.matrices[self.team2id[home] - 1, self.team2id[away] - 1]
+
+    def predict(self, home, away, lines=TOTAL_LINES):
+        """Même résultat que predict_match, lu dans la table"""
+        matrix = self.score_matrix(home, away)
+        prediction = match_markets(matrix, lines)
+        prediction["score_matrix"] = matrix
+        return prediction
+
+    def outcome_table(self):
+        """Tableau des T × (T - 1) affiches : probabilités 1X2 et cotes équitables"""
+        home_win = np.tril(self.matrices, -1).sum(axis=(2, 3))
+        draw = np.trace(self.matrices, axis1=2, axis2=3)
+        away_win = np.triu(self.matrices, 1).sum(axis=(2, 3))
+        home_idx, away_idx = np.nonzero(~np.eye(len(self.teams), dtype=bool))
+        table = pd.DataFrame({
+            "HomeTeam": np.array(self.teams)[home_idx],
+            "AwayTeam": np.array(self.teams)[away_idx],
+            "home_win": home_win[home_idx, away_idx],
+            "draw": draw[home_idx, away_idx],
+            "away_win": away_win[home_idx, away_idx],
+        })
+        for outcome in ("home_win", "draw", "away_win"):
+            table[f"Odds_{outcome}"] = 1 / table[outcome]
+        return table
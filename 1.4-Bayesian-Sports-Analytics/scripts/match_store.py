@@ -0,0 +1,243 @@
+"""
+Stockage des matchs en Parquet, partitionné par championnat
+
+football_all_leagues.csv est converti une fois en un jeu de données Parquet
+(data/matches/League=<championnat>/*.parquet, lignes triées par saison) :
+- Date : date parsée (datetime64), plus de chaînes jj/mm/aaaa à convertir
+- HomeTeam / AwayTeam / Season : chaînes encodées par dictionnaire dans Parquet
+- HomeTeamId / AwayTeamId : identifiants entiers denses (int32) des équipes,
+  tous championnats confondus (indices dans _teams.json)
+- Buts, tirs et cotes typés à la lecture du CSV
+
+Un fichier par championnat plutôt que par (championnat, saison) : le coût
+d'une lecture est dominé par l'ouverture des fichiers, et 35 petits fichiers
+rendaient la lecture complète plus lente que le CSV.
+
+load_matches ne lit que les championnats demandés (filtre appliqué sur les
+chemins, sans ouvrir les autres fichiers), filtre les saisons pendant la
+lecture et ne lit que les colonnes demandées. Championnats, saisons et équipes
+sont renvoyés en Categorical (codes des équipes = HomeTeamId / AwayTeamId).
+Le stockage est (re)construit automatiquement lorsqu'il est absent, d'un
+ancien format ou plus ancien que le CSV source. append_matches y ajoute les
+nouveaux matchs (téléchargement incrémental de data/scrapper.py) sans
+réécrire l'existant.
+
+Usage : python scripts/match_store.py   (reconstruit data/matches/ et mesure les lectures)
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from stan_models import PROJECT_DIR
+
+SOURCE_CSV = PROJECT_DIR / "data" / "football_all_leagues.csv"
+STORE_DIR = PROJECT_DIR / "data" / "matches"
+# Version du format, écrite dans _format : un stockage d'un autre format est reconstruit
+STORE_FORMAT = "2"
+PARTITIONS = ("League",)
+# Colonnes dans l'ordre du CSV source
+COLUMNS = ("Date", "HomeTeam", "AwayTeam", "HomeGoals", "AwayGoals", "Result",
+           "HomeShots", "AwayShots", "HomeShotsTarget", "AwayShotsTarget",
+           "OddsHome", "OddsDraw", "OddsAway", "Season", "League", "LeagueCode")
+ID_COLUMNS = ("HomeTeamId", "AwayTeamId")
+DTYPES = {
+    "HomeGoals": "float64", "AwayGoals": "float64",
+    "HomeShots": "float64", "AwayShots": "float64",
+    "HomeShotsTarget": "float64", "AwayShotsTarget": "float64",
+    "OddsHome": "float64", "OddsDraw": "float64", "OddsAway": "float64",
+}
+SCHEMA = pa.schema(
+    [("Date", pa.timestamp("us"))]
+    + [(name, pa.float64() if name in DTYPES else pa.string())
+       for name in COLUMNS if name != "Date"]
+    + [(name, pa.int32()) for name in ID_COLUMNS]
+)
+TEAM_IDS = {"HomeTeam": "HomeTeamId", "AwayTeam": "AwayTeamId"}
+
+
+KEY = ("Date", "HomeTeam", "AwayTeam")
+
+
+def read_source(path=SOURCE_CSV):
+    """Lit un CSV de matchs (format scrapper.py) avec dates parsées et colonnes typées"""
+    return normalize_matches(pd.read_csv(path, dtype=DTYPES))
+
+
+def normalize_matches(df):
+    """Dates jj/mm/aaaa parsées et colonnes numériques en float64"""
+    df = df.astype({name: dtype for name, dtype in DTYPES.items() if name in df})
+    if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], dayfirst=True)
+    return df
+
+
+def _write(df, directory, **options):
+    """Écrit des matchs (avec identifiants) dans les partitions par championnat, triés par saison"""
+    df = df.sort_values("Season", kind="stable")
+    table = pa.Table.from_pandas(df[list(COLUMNS + ID_COLUMNS)], schema=SCHEMA, preserve_index=False)
+    ds.write_dataset(table, directory, format="parquet",
+                     partitioning=list(PARTITIONS), partitioning_flavor="hive", **options)
+
+
+def build_store(df=None, directory=STORE_DIR):
+    """
+    Écrit les matchs dans le jeu de données Parquet partitionné (remplace l'existant)
+
+    Returns:
+        Liste des équipes (index = identifiant entier)
+    """
+    df = read_source() if df is None else df.copy()
+    directory = Path(directory)
+    teams = sorted(set(df["HomeTeam"]) | set(df["AwayTeam"]))
+    codes = pd.CategoricalDtype(teams)
+    for name, ids in TEAM_IDS.items():
+        df[ids] = df[name].astype(codes).cat.codes.astype("int32")
+
+    shutil.rmtree(directory, ignore_errors=True)
+    _write(df, directory)
+    with open(directory / "_teams.json", "w") as f:
+        json.dump(teams, f, indent=2)
+    (directory / "_format").write_text(STORE_FORMAT)
+    return teams
+
+
+def append_matches(df, directory=STORE_DIR):
+    """
+    Ajoute au stockage les matchs absents (clé Date, HomeTeam, AwayTeam) dans
+    de nouveaux fichiers des partitions concernées ; les fichiers existants ne
+    sont pas réécrits. Les nouvelles équipes prennent les identifiants suivants.
+
+    Returns:
+        Nombre de matchs ajoutés
+    """
+    if df.empty:
+        return 0
+    directory = Path(directory)
+    df = normalize_matches(df)
+    if not (directory / "_teams.json").exists():
+        build_store(df, directory)
+        return len(df)
+
+    existing = load_matches(sorted(df["League"].unique()), sorted(df["Season"].unique()),
+                            columns=list(KEY), categorical=False, directory=directory, source=None)
+    new = df[~pd.MultiIndex.from_frame(df[list(KEY)]).isin(pd.MultiIndex.from_frame(existing))].copy()
+
+    teams = load_teams(directory)
+    teams += sorted((set(new["HomeTeam"]) | set(new["AwayTeam"])) - set(teams))
+    team_ids = {team: i for i, team in enumerate(teams)}
+    new["HomeTeamId"] = new["HomeTeam"].map(team_ids).astype("int32")
+    new["AwayTeamId"] = new["AwayTeam"].map(team_ids).astype("int32")
+
+    if len(new):
+        _write(new, directory, basename_template=f"part-{time.time_ns()}-{{i}}.parquet",
+               existing_data_behavior="overwrite_or_ignore")
+    # Réécrit toujours l'index des équipes : le stockage est à jour par rapport au CSV source
+    with open(directory / "_teams.json", "w") as f:
+        json.dump(teams, f, indent=2)
+    return len(new)
+
+
+def _is_stale(directory, source):
+    teams_file = Path(directory) / "_teams.json"
+    format_file = Path(directory) / "_format"
+    return not teams_file.exists() or not format_file.exists() \
+        or format_file.read_text() != STORE_FORMAT or (
+            Path(source).exists() and Path(source).stat().st_mtime > teams_file.stat().st_mtime
+        )
+
+
+def load_teams(directory=STORE_DIR):
+    """Équipes du stockage : teams[id] = nom"""
+    with open(Path(directory) / "_teams.json") as f:
+        return json.load(f)
+
+
+def load_matches(league=None, seasons=None, columns=None, categorical=True,
+                 directory=STORE_DIR, source=SOURCE_CSV):
+    """
+    Matchs d'un championnat (ou de tous) sur les saisons demandées (ou toutes)
+
+    Args:
+        league: nom du championnat, ou liste de noms
+        seasons: saison ("2024-25") ou liste de saisons
+        columns: colonnes à lire (toutes par défaut)
+        categorical: League, Season (ordonnée), HomeTeam et AwayTeam en
+            Categorical (équipes : catégories = toutes les équipes du stockage,
+            codes = HomeTeamId / AwayTeamId) ; chaînes si False
+
+    Returns:
+        DataFrame trié comme le stockage (championnat, saison, ordre du CSV ;
+        les matchs ajoutés par append_matches suivent ceux de leur championnat)
+    """
+    if source is not None and _is_stale(directory, source):
+        build_store(read_source(source), directory)
+
+    wanted = list(columns or COLUMNS + ID_COLUMNS)
+    read = list(wanted)
+    if categorical:
+        # Les équipes sont reconstruites à partir des identifiants : pas de chaînes à lire
+        read = [name for name in read if name not in TEAM_IDS]
+        read += [ids for name, ids in TEAM_IDS.items() if name in wanted and ids not in read]
+
+    dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+    predicate = None
+    for name, values in (("League", league), ("Season", seasons)):
+        if values is None:
+            continue
+        values = [values] if isinstance(values, str) else list(values)
+        condition = ds.field(name).isin(pa.array(values, pa.string()))
+        predicate = condition if predicate is None else predicate & condition
+
+    table = dataset.to_table(columns=read, filter=predicate)
+    if not categorical:
+        return table.to_pandas()
+
+    # Encodage par dictionnaire côté Arrow : moins coûteux que pd.Categorical sur des chaînes
+    for name in ("League", "Season"):
+        if name in table.column_names:
+            index = table.schema.get_field_index(name)
+            table = table.set_column(index, name, pc.dictionary_encode(table.column(name)))
+    df = table.to_pandas()
+    if "Season" in df:
+        df["Season"] = df["Season"].cat.reorder_categories(
+            sorted(df["Season"].cat.categories), ordered=True)
+    teams = load_teams(directory)
+    for name, ids in TEAM_IDS.items():
+        if name in wanted:
+            df[name] = pd.Categorical.from_codes(df[ids], teams)
+    return df[wanted]
+
+
+if __name__ == "__main__":
+    def best_of(function, repeats=10):
+        """Meilleur temps de `repeats` appels (ms) et résultat du dernier"""
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000, result
+
+    csv_time, df = best_of(read_source)
+    csv_raw_time, _ = best_of(lambda: pd.read_csv(SOURCE_CSV))
+    teams = build_store(df)
+
+    # Lecture complète : chemin de load_all_matches() dans l'app
+    parquet_time, stored = best_of(lambda: load_matches(source=None))
+    strings_time, _ = best_of(lambda: load_matches(source=None, categorical=False))
+    filtered_time, league = best_of(lambda: load_matches("Premier League", ["2023-24", "2024-25"],
+                                                         source=None))
+
+    print(f"{len(stored)} matchs | {len(teams)} équipes | "
+          f"{stored['League'].nunique()} championnats dans {STORE_DIR}")
+    print(f"  CSV (lecture seule)                  : {csv_raw_time:6.1f} ms")
+    print(f"  CSV (lecture + dates)                : {csv_time:6.1f} ms")
+    print(f"  Parquet (tout, Categorical)          : {parquet_time:6.1f} ms")
+    print(f"  Parquet (tout, chaînes)              : {strings_time:6.1f} ms")
+    print(f"  Parquet (1 championnat, 2 saisons)   : {filtered_time:6.1f} ms ({len(league)} matchs)")
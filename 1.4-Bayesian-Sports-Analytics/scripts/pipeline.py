@@ -0,0 +1,131 @@
+"""
+Pipeline multi-championnats : préparation et ajustement de toutes les
+fenêtres (championnat, saisons consécutives) de football_all_leagues.csv
+
+- Une fenêtre = --window saisons consécutives d'un championnat
+  (toutes les fenêtres glissantes, ou la plus récente avec --latest)
+- Les fenêtres sont ajustées en parallèle dans un pool de processus dont la
+  taille tient compte des cœurs disponibles et des chaînes de chaque
+  ajustement (un processus CmdStan par chaîne)
+- Chaque postérieur est enregistré dans data/leagues/<championnat>/<saisons>/
+  avec, dans meta.json, la clé de l'ajustement (empreintes des données et du
+  code Stan, réglages). Une fenêtre dont la clé n'a pas changé n'est pas
+  ré-ajustée : seules les fenêtres avec de nouvelles données le sont.
+
+Usage : python scripts/pipeline.py [--window 3] [--latest] [--method pathfinder]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from match_store import load_matches
+from posterior_store import load_metadata, save_posterior
+from stan_models import (METHODS, PROJECT_DIR, compress_matches, fit_key, fit_model, load_model,
+                         prepare_league, select_variant)
+
+ARTIFACTS_DIR = PROJECT_DIR / "data" / "leagues"
+
+
+def league_windows(df, window=3, latest=False):
+    """Fenêtres (championnat, saisons) de `window` saisons consécutives"""
+    windows = []
+    for league in sorted(df["League"].unique()):
+        seasons = sorted(df.loc[df["League"] == league, "Season"].unique())
+        starts = range(len(seasons) - window, len(seasons) - window + 1) if latest \
+            else range(len(seasons) - window + 1)
+        windows += [(league, seasons[i:i + window]) for i in starts if i >= 0]
+    return windows
+
+
+def artifact_dir(league, seasons):
+    slug = league.lower().replace(" ", "_")
+    return ARTIFACTS_DIR / slug / f"{seasons[0]}_{seasons[-1]}"
+
+
+def default_workers(chains):
+    """Nombre d'ajustements simultanés : un cœur par chaîne"""
+    return max(1, (os.cpu_count() or 1) // chains)
+
+
+def fit_window(df, league, seasons, method="sample", sampler=None):
+    """
+    Prépare et ajuste une fenêtre, sauf si son postérieur est déjà à jour
+
+    Returns:
+        Dictionnaire de synthèse (championnat, saisons, matchs, statut, durée)
+    """
+    sampler = sampler or {}
+    matches, team2id = prepare_league(df, league, seasons)
+    compressed = compress_matches(matches)
+    key = fit_key(compressed, method=method, **sampler)
+    directory = artifact_dir(league, seasons)
+
+    result = {"league": league, "seasons": seasons, "matches": len(matches),
+              "teams": len(team2id), "directory": str(directory)}
+    if (directory / "meta.json").exists() and load_metadata(directory).get("fit_key") == key:
+        return dict(result, status="cache", seconds=0.0)
+
+    start = time.perf_counter()
+    quiet = {"show_progress": False} if method == "sample" else {}
+    fit = fit_model(compressed, method=method, **quiet, **sampler)
+    save_posterior(fit, directory, team2id, method=method,
+                   details={"fit_key": key, "league": league, "seasons": seasons})
+    return dict(result, status="ajusté", seconds=time.perf_counter() - start)
+
+
+def run_pipeline(df, windows, method="sample", sampler=None, workers=1):
+    """Ajuste toutes les fenêtres en parallèle ; liste des synthèses dans l'ordre d'achèvement"""
+    results = []
+    if windows:
+        # Compilation dans le processus parent : les workers trouvent ensuite un exécutable
+        # à jour, au lieu de lancer make en même temps sur le même modèle
+        matches, _ = prepare_league(df, *windows[0])
+        load_model(select_variant(compress_matches(matches), (sampler or {}).get("threads", 1)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fit_window, df, league, seasons, method, sampler): (league, seasons)
+                   for league, seasons in windows}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  {result['league']:<16s}{result['seasons'][0]} → {result['seasons'][-1]}"
+                  f"  {result['status']:<8s}{result['seconds']:>8.1f} s", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajustement de tous les championnats en parallèle")
+    parser.add_argument("--window", type=int, default=3, help="Saisons consécutives par ajustement")
+    parser.add_argument("--latest", action="store_true", help="Seulement la fenêtre la plus récente")
+    parser.add_argument("--leagues", nargs="+", default=None, help="Restreindre à ces championnats")
+    parser.add_argument("--method", choices=list(METHODS), default="sample")
+    parser.add_argument("--chains", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument("--sampling", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Ajustements simultanés (par défaut : cœurs / chaînes)")
+    args = parser.parse_args()
+
+    df = load_matches(args.leagues)
+
+    if args.method == "sample":
+        sampler = {"chains": args.chains, "iter_warmup": args.warmup,
+                   "iter_sampling": args.sampling, "adapt_delta": 0.95, "seed": args.seed}
+        workers = args.workers or default_workers(args.chains)
+    else:
+        sampler = {"seed": args.seed}
+        workers = args.workers or default_workers(1)
+
+    windows = league_windows(df, args.window, args.latest)
+    print(f"{len(windows)} fenêtres, {workers} ajustements simultanés ({METHODS[args.method]})")
+    start = time.perf_counter()
+    results = run_pipeline(df, windows, args.method, sampler, workers)
+
+    fitted = sum(result["status"] != "cache" for result in results)
+    print(f"\n{fitted} ajustés, {len(results) - fitted} à jour, {time.perf_counter() - start:.0f} s")
+    ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(ARTIFACTS_DIR / "index.json", "w") as f:
+        json.dump(sorted(results, key=lambda r: (r["league"], r["seasons"])), f, indent=2)
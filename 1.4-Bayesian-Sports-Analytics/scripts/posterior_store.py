@@ -0,0 +1,163 @@
+"""
+Stockage compact du postérieur (remplace le pickle de CmdStanMCMC)
+
+Un postérieur est un dossier :
+- <paramètre>.npy : tirages du paramètre (draws,) ou (draws, équipes), float64
+- teams.json      : noms des équipes dans l'ordre des colonnes (colonne i = id i + 1)
+- meta.json       : méthode d'inférence, nombre de tirages, paramètres et formes
+- warm_start.json : (échantillonnage NUTS diag_e uniquement, supprimé sinon) moyennes des
+                    paramètres non transformés, pas et métrique adaptés, pour ré-ajuster
+                    à chaud (warm_start_arguments)
+
+Les .npy sont ouverts en memory-map : charger le postérieur ne lit que les
+en-têtes, et seules les pages des paramètres réellement utilisés sont lues.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+PARAMETERS = ("mu", "home_adv", "attack", "defense", "sigma_attack", "sigma_defense")
+# Paramètres du bloc parameters, dans l'ordre de l'espace non contraint (métrique)
+RAW_PARAMETERS = ("home_adv", "mu", "attack_raw", "defense_raw", "sigma_attack", "sigma_defense")
+TEAM_PARAMETERS = ("attack_raw", "defense_raw")
+
+
+def save_posterior(fit, directory, team2id, method="sample", details=None):
+    """
+    Écrit les tirages de `fit` (tout objet cmdstanpy exposant stan_variable)
+    et l'index des équipes dans `directory` ; details est ajouté à meta.json
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    shapes = {}
+    for name in PARAMETERS:
+        draws = np.ascontiguousarray(fit.stan_variable(name), dtype=np.float64)
+        np.save(directory / f"{name}.npy", draws)
+        shapes[name] = list(draws.shape)
+
+    teams = sorted(team2id, key=team2id.get)
+    with open(directory / "teams.json", "w") as f:
+        json.dump(teams, f, indent=2)
+
+    meta = {
+        "method": method,
+        "draws": shapes["mu"][0],
+        "parameters": shapes,
+        **(details or {}),
+    }
+    with open(directory / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if getattr(fit, "metric_type", None) == "diag_e":
+        _save_warm_start(fit, directory, len(teams))
+    else:
+        # Un ancien warm_start.json ne correspondrait plus à teams.json
+        (directory / "warm_start.json").unlink(missing_ok=True)
+    return meta
+
+
+def _save_warm_start(fit, directory, n_teams):
+    """Moyennes a posteriori, pas et métrique diagonale (moyennés sur les chaînes)"""
+    inits = {name: np.asarray(fit.stan_variable(name)).mean(axis=0).tolist() for name in RAW_PARAMETERS}
+    inv_metric = np.asarray(fit.inv_metric).mean(axis=0)
+    metric, offset = {}, 0
+    for name in RAW_PARAMETERS:
+        size = n_teams if name in TEAM_PARAMETERS else 1
+        block = inv_metric[offset:offset + size].tolist()
+        metric[name] = block if name in TEAM_PARAMETERS else block[0]
+        offset += size
+    with open(directory / "warm_start.json", "w") as f:
+        json.dump({"inits": inits, "inv_metric": metric,
+                   "step_size": float(np.mean(fit.step_size))}, f, indent=2)
+
+
+def warm_start_arguments(directory, team2id):
+    """
+    Arguments de CmdStanModel.sample (inits, step_size, inv_metric) pour
+    ré-ajuster à chaud à partir du postérieur de `directory`
+
+    Les équipes sont appariées par nom : une équipe nouvelle part de 0 avec la
+    métrique moyenne des autres équipes.
+    """
+    with open(Path(directory) / "warm_start.json") as f:
+        previous = json.load(f)
+    columns = {team: i for i, team in enumerate(load_teams(directory))}
+    teams = sorted(team2id, key=team2id.get)
+
+    def by_team(values, default):
+        return [values[columns[team]] if team in columns else default for team in teams]
+
+    inits, inv_metric = {}, []
+    for name in RAW_PARAMETERS:
+        init, metric = previous["inits"][name], previous["inv_metric"][name]
+        if name in TEAM_PARAMETERS:
+            inits[name] = by_team(init, 0.0)
+            inv_metric.extend(by_team(metric, float(np.mean(metric))))
+        else:
+            inits[name] = init
+            inv_metric.append(metric)
+    return {
+        "inits": inits,
+        "step_size": previous["step_size"],
+        "inv_metric": np.array(inv_metric),
+    }
+
+
+def load_posterior(directory, parameters=PARAMETERS, mmap=True):
+    """
+    Charge les paramètres demandés : dictionnaire {nom: tableau (draws, ...)}
+    (memory-maps en lecture seule par défaut)
+    """
+    directory = Path(directory)
+    mmap_mode = "r" if mmap else None
+    return {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in parameters}
+
+
+def load_teams(directory):
+    """Noms des équipes dans l'ordre des colonnes de attack / defense"""
+    with open(Path(directory) / "teams.json") as f:
+        return json.load(f)
+
+
+def posterior_hash(directory):
+    """Empreinte SHA-256 du postérieur (tirages et index des équipes), clé des caches dérivés"""
+    directory = Path(directory)
+    digest = hashlib.sha256()
+    for path in sorted(directory.glob("*.npy")) + [directory / "teams.json"]:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compare_posteriors(directory, reference, parameters=("mu", "home_adv", "attack", "defense")):
+    """
+    Écart maximal des moyennes a posteriori entre deux postérieurs, en écarts-types
+    du postérieur de référence (équipes appariées par nom)
+
+    Returns:
+        Dictionnaire {paramètre: écart standardisé maximal}
+    """
+    teams, reference_teams = load_teams(directory), load_teams(reference)
+    common = [team for team in teams if team in reference_teams]
+    columns = [teams.index(team) for team in common]
+    reference_columns = [reference_teams.index(team) for team in common]
+    posterior = load_posterior(directory, parameters)
+    baseline = load_posterior(reference, parameters)
+
+    gaps = {}
+    for name in parameters:
+        values, expected = posterior[name], baseline[name]
+        if values.ndim == 2:
+            values, expected = values[:, columns], expected[:, reference_columns]
+        gap = np.abs(values.mean(axis=0) - expected.mean(axis=0)) / expected.std(axis=0)
+        gaps[name] = float(np.max(gap))
+    return gaps
+
+
+def load_metadata(directory):
+    with open(Path(directory) / "meta.json") as f:
+        return json.load(f)
@@ -0,0 +1,216 @@
+"""
+Simulation Monte Carlo de la fin d'une saison
+
+À partir des matchs déjà joués (classement courant) et des affiches restantes,
+chaque saison simulée tire un tirage du postérieur puis les scores de toutes
+les affiches restantes, en NumPy vectorisé (simulations × affiches), par
+blocs de simulations pour borner la mémoire.
+
+Départage des équipes à égalité de points (TIE_BREAKS) :
+- "goal_difference" (Premier League, Bundesliga, Ligue 1) : différence de
+  buts, buts marqués
+- "head_to_head" (La Liga, Serie A) : points puis différence de buts dans les
+  confrontations directes entre équipes à égalité (mini-classement), puis
+  différence de buts, buts marqués
+Les égalités restantes sont départagées par tirage au sort.
+
+Une équipe absente du postérieur (promue après l'entraînement) reçoit des
+forces tirées de la loi hiérarchique du modèle : attack ~ Normal(0, sigma_attack),
+defense ~ Normal(0, sigma_defense), pour chaque tirage.
+"""
+
+import numpy as np
+import pandas as pd
+
+TIE_BREAKS = {
+    "Premier League": "goal_difference",
+    "Bundesliga": "goal_difference",
+    "Ligue 1": "goal_difference",
+    "La Liga": "head_to_head",
+    "Serie A": "head_to_head",
+}
+PARAMETERS = ("mu", "home_adv", "attack", "defense", "sigma_attack", "sigma_defense")
+
+
+def split_season(df, as_of=None):
+    """
+    Sépare une saison (matchs d'un championnat) en matchs joués et affiches restantes
+
+    Les matchs datés après as_of sont considérés comme restants ; les affiches
+    aller-retour jamais jouées (saison en cours) le sont aussi.
+
+    Returns:
+        (teams, played, remaining) : équipes triées, DataFrame des matchs joués,
+        DataFrame des affiches restantes (HomeTeam, AwayTeam)
+    """
+    df = df.copy()
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True)
+    teams = sorted(set(df["HomeTeam"]) | set(df["AwayTeam"]))
+    if as_of is not None:
+        played = df[df["Date"] <= pd.to_datetime(as_of)]
+    else:
+        played = df
+
+    all_fixtures = pd.DataFrame(
+        [(home, away) for home in teams for away in teams if home != away],
+        columns=["HomeTeam", "AwayTeam"]
+    )
+    remaining = (
+        all_fixtures.merge(played[["HomeTeam", "AwayTeam"]], how="left", indicator=True)
+        .query("_merge == 'left_only'")
+        .drop(columns="_merge")
+        .reset_index(drop=True)
+    )
+    return teams, played.reset_index(drop=True), remaining
+
+
+def current_standings(teams, played):
+    """Classement des matchs joués : points, buts marqués / encaissés par équipe"""
+    index = {team: i for i, team in enumerate(teams)}
+    home = played["HomeTeam"].map(index).values.astype(int)
+    away = played["AwayTeam"].map(index).values.astype(int)
+    home_goals = played["HomeGoals"].values
+    away_goals = played["AwayGoals"].values
+    home_points, away_points = match_points(home_goals, away_goals)
+
+    n = len(teams)
+    return {
+        "played": np.bincount(home, minlength=n) + np.bincount(away, minlength=n),
+        "points": np.bincount(home, home_points, n) + np.bincount(away, away_points, n),
+        "goals_for": np.bincount(home, home_goals, n) + np.bincount(away, away_goals, n),
+        "goals_against": np.bincount(home, away_goals, n) + np.bincount(away, home_goals, n),
+        # Confrontations directes : [i, j] = points / différence de buts de i contre j
+        "h2h_points": _pair_matrix(n, home, away, home_points, away_points),
+        "h2h_goal_diff": _pair_matrix(n, home, away, home_goals - away_goals, away_goals - home_goals),
+    }
+
+
+def match_points(home_goals, away_goals):
+    """Points (3 / 1 / 0) à domicile et à l'extérieur, tableaux de même forme que les scores"""
+    home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    away_points = np.where(home_goals < away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    return home_points, away_points
+
+
+def _pair_matrix(n, home, away, home_values, away_values):
+    matrix = np.zeros((n, n))
+    np.add.at(matrix, (home, away), home_values)
+    np.add.at(matrix, (away, home), away_values)
+    return matrix
+
+
+def team_strengths(posterior, posterior_teams, teams, rng):
+    """
+    Forces (draws, équipes de la saison) ; les équipes inconnues du postérieur
+    sont tirées de la loi hiérarchique
+
+    Returns:
+        (attack, defense, unknown) avec unknown la liste des équipes tirées a priori
+    """
+    draws = len(posterior["mu"])
+    columns = {team: i for i, team in enumerate(posterior_teams)}
+    attack = np.empty((draws, len(teams)))
+    defense = np.empty((draws, len(teams)))
+    unknown = []
+    for k, team in enumerate(teams):
+        if team in columns:
+            attack[:, k] = posterior["attack"][:, columns[team]]
+            defense[:, k] = posterior["defense"][:, columns[team]]
+        else:
+            unknown.append(team)
+            attack[:, k] = rng.normal(0, 1, draws) * posterior["sigma_attack"]
+            defense[:, k] = rng.normal(0, 1, draws) * posterior["sigma_defense"]
+    return attack, defense, unknown
+
+
+def simulate_season(posterior, posterior_teams, teams, played, remaining,
+                    n_simulations=100_000, tie_break="goal_difference", seed=None,
+                    chunk_size=10_000):
+    """
+    Simule n_simulations fins de saison
+
+    Returns:
+        Dictionnaire avec 'teams', 'positions' (équipes × positions, probabilités),
+        'expected_points' et 'unknown_teams'
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(teams)
+    index = {team: i for i, team in enumerate(teams)}
+    home = remaining["HomeTeam"].map(index).values.astype(int)
+    away = remaining["AwayTeam"].map(index).values.astype(int)
+
+    base = current_standings(teams, played)
+    attack, defense, unknown = team_strengths(posterior, posterior_teams, teams, rng)
+    mu = np.asarray(posterior["mu"])
+    home_adv = np.asarray(posterior["home_adv"])
+
+    # Matrices d'incidence (affiches × équipes) : cumul des points et des buts par produit matriciel
+    home_incidence = np.zeros((len(remaining), n_teams))
+    home_incidence[np.arange(len(remaining)), home] = 1
+    away_incidence = np.zeros((len(remaining), n_teams))
+    away_incidence[np.arange(len(remaining)), away] = 1
+
+    position_counts = np.zeros((n_teams, n_teams))
+    points_total = np.zeros(n_teams)
+
+    for start in range(0, n_simulations, chunk_size):
+        size = min(chunk_size, n_simulations - start)
+        draw = rng.integers(len(mu), size=size)  # un tirage du postérieur par saison simulée
+
+        lam_home = np.exp(mu[draw, None] + home_adv[draw, None]
+                          + attack[draw][:, home] - defense[draw][:, away])
+        lam_away = np.exp(mu[draw, None] + attack[draw][:, away] - defense[draw][:, home])
+        home_goals = rng.poisson(lam_home)  # (simulations, affiches)
+        away_goals = rng.poisson(lam_away)
+        home_points, away_points = match_points(home_goals, away_goals)
+
+        points = base["points"] + home_points @ home_incidence + away_points @ away_incidence
+        goals_for = base["goals_for"] + home_goals @ home_incidence + away_goals @ away_incidence
+        goals_against = base["goals_against"] + away_goals @ home_incidence + home_goals @ away_incidence
+        goal_diff = goals_for - goals_against
+
+        # Clés de tri, de la moins à la plus prioritaire (np.lexsort)
+        keys = [rng.random((size, n_teams)), -goals_for, -goal_diff]
+        if tie_break == "head_to_head":
+            h2h_points = np.broadcast_to(base["h2h_points"], (size, n_teams, n_teams)).copy()
+            h2h_goal_diff = np.broadcast_to(base["h2h_goal_diff"], (size, n_teams, n_teams)).copy()
+            # Chaque affiche ordonnée est unique : affectation directe sans collision
+            h2h_points[:, home, away] += home_points
+            h2h_points[:, away, home] += away_points
+            h2h_goal_diff[:, home, away] += home_goals - away_goals
+            h2h_goal_diff[:, away, home] += away_goals - home_goals
+            # Mini-classement limité aux équipes à égalité de points
+            tied = points[:, :, None] == points[:, None, :]
+            keys += [-(h2h_goal_diff * tied).sum(axis=2), -(h2h_points * tied).sum(axis=2)]
+        elif tie_break != "goal_difference":
+            raise ValueError(f"Règle de départage inconnue : {tie_break}")
+        keys.append(-points)
+
+        order = np.lexsort(keys, axis=-1)  # order[s, k] = équipe classée k-ième
+        for position in range(n_teams):
+            position_counts[:, position] += np.bincount(order[:, position], minlength=n_teams)
+        points_total += points.sum(axis=0)
+
+    return {
+        "teams": teams,
+        "positions": position_counts / n_simulations,
+        "expected_points": points_total / n_simulations,
+        "unknown_teams": unknown,
+    }
+
+
+def season_table(result, standings, top=4, relegated=3):
+    """Tableau récapitulatif : points actuels et attendus, titre, top, relégation, position moyenne"""
+    positions = result["positions"]
+    n_teams = len(result["teams"])
+    table = pd.DataFrame({
+        "Team": result["teams"],
+        "Played": standings["played"].astype(int),
+        "Points": standings["points"].astype(int),
+        "xPoints": result["expected_points"],
+        "Title": positions[:, 0],
+        f"Top{top}": positions[:, :top].sum(axis=1),
+        "Relegation": positions[:, n_teams - relegated:].sum(axis=1),
+        "AvgPosition": positions @ np.arange(1, n_teams + 1),
+    })
+    return table.sort_values("AvgPosition").reset_index(drop=True)
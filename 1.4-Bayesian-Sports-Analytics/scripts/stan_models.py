@@ -0,0 +1,240 @@
+"""
+Variantes du modèle Stan et préparation des données communes aux scripts et à l'app
+
+Variantes disponibles (dossier stan/) :
+- "vectorized" : football_model.stan, vraisemblance vectorisée (par défaut)
+- "threaded"   : football_model_threaded.stan, vraisemblance découpée par reduce_sum
+                 et évaluée sur plusieurs threads au sein de chaque chaîne
+- "compressed" : football_model_compressed.stan, une ligne par affiche
+                 (domicile, extérieur) pondérée par le nombre de matchs
+- "loop"       : football_model_loop.stan, boucle match par match (référence)
+"""
+
+import hashlib
+import json
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from cmdstanpy import CmdStanModel
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+STAN_DIR = PROJECT_DIR / "stan"
+
+MODEL_FILES = {
+    "vectorized": "football_model.stan",
+    "threaded": "football_model_threaded.stan",
+    "compressed": "football_model_compressed.stan",
+    "loop": "football_model_loop.stan",
+}
+
+
+def prepare_league(df, league, seasons):
+    """
+    Matchs d'un championnat sur quelques saisons, avec identifiants d'équipes
+
+    Returns:
+        (matchs avec home_id / away_id, mapping équipe → id à partir de 1)
+    """
+    df = df[(df["League"] == league) & (df["Season"].isin(seasons))].copy()
+    teams = pd.unique(pd.concat([df["HomeTeam"], df["AwayTeam"]]))
+    team2id = {team: i + 1 for i, team in enumerate(teams)}
+    # Équipes en Categorical (load_matches) : map renvoie des flottants, d'où astype(int)
+    df["home_id"] = df["HomeTeam"].map(team2id).astype(int)
+    df["away_id"] = df["AwayTeam"].map(team2id).astype(int)
+    return df, team2id
+
+
+def compress_matches(df):
+    """
+    Regroupe les matchs par affiche (home_id, away_id)
+
+    La vraisemblance de Poisson ne dépend des matchs d'une même affiche que par
+    leur nombre et leurs totaux de buts (statistiques suffisantes) : les lignes
+    identiques, et plus généralement toutes celles d'une même affiche, sont
+    fusionnées en une ligne avec n_matches, home_goals_sum et away_goals_sum.
+    """
+    return (
+        df.groupby(["home_id", "away_id"], as_index=False)
+        .agg(
+            n_matches=("HomeGoals", "size"),
+            home_goals_sum=("HomeGoals", "sum"),
+            away_goals_sum=("AwayGoals", "sum"),
+        )
+    )
+
+
+def is_compressed(df):
+    return "n_matches" in df.columns
+
+
+def build_stan_data(df, grainsize=None):
+    """
+    Dictionnaire de données Stan à partir d'un DataFrame préparé (home_id / away_id),
+    match par match ou compressé par compress_matches
+    """
+    if is_compressed(df):
+        return {
+            "N": len(df),
+            "T": int(max(df["home_id"].max(), df["away_id"].max())),
+            "home_team": df["home_id"].values.astype(int),
+            "away_team": df["away_id"].values.astype(int),
+            "n_matches": df["n_matches"].values.astype(int),
+            "home_goals_sum": df["home_goals_sum"].values.astype(int),
+            "away_goals_sum": df["away_goals_sum"].values.astype(int),
+        }
+
+    data = {
+        "N": len(df),
+        "T": int(max(df["home_id"].max(), df["away_id"].max())),
+        "home_team": df["home_id"].values.astype(int),
+        "away_team": df["away_id"].values.astype(int),
+        "home_goals": df["HomeGoals"].values.astype(int),
+        "away_goals": df["AwayGoals"].values.astype(int),
+    }
+    if grainsize is not None:
+        data["grainsize"] = int(grainsize)
+    return data
+
+
+def select_variant(df, threads=1, variant=None):
+    """Variante utilisée par sample_model pour ces données (si variant n'est pas imposée)"""
+    if variant is not None:
+        return variant
+    if is_compressed(df):
+        return "compressed"
+    return "threaded" if threads > 1 else "vectorized"
+
+
+def model_hash(variant):
+    """Empreinte SHA-256 du code Stan d'une variante"""
+    return hashlib.sha256((STAN_DIR / MODEL_FILES[variant]).read_bytes()).hexdigest()
+
+
+def data_hash(stan_data):
+    """Empreinte SHA-256 d'un dictionnaire de données Stan (build_stan_data)"""
+    canonical = {key: np.asarray(value).tolist() for key, value in sorted(stan_data.items())}
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+def fit_key(df, variant=None, threads=1, **config):
+    """
+    Clé de cache d'un ajustement : données, code du modèle et configuration
+    de l'échantillonneur (mêmes arguments que sample_model)
+    """
+    variant = select_variant(df, threads, variant)
+    digest = hashlib.sha256()
+    digest.update(data_hash(build_stan_data(df)).encode())
+    digest.update(model_hash(variant).encode())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def load_model(variant="vectorized"):
+    """
+    Compile (si nécessaire) et retourne le modèle Stan d'une variante ; l'exécutable
+    existant est réutilisé, et le modèle n'est chargé qu'une fois par processus
+    """
+    if variant not in MODEL_FILES:
+        raise ValueError(f"Variante inconnue : {variant} (choix : {', '.join(MODEL_FILES)})")
+    cpp_options = {"STAN_THREADS": True} if variant == "threaded" else None
+    return CmdStanModel(stan_file=str(STAN_DIR / MODEL_FILES[variant]), cpp_options=cpp_options)
+
+
+def sample_model(df, threads=1, chains=4, iter_warmup=1000, iter_sampling=2000,
+                 adapt_delta=0.95, variant=None, **kwargs):
+    """
+    Lance l'échantillonnage NUTS
+
+    Des données compressées (compress_matches) utilisent la variante "compressed".
+    Sinon, threads > 1 sélectionne la variante "threaded" (reduce_sum) avec
+    `threads` threads par chaîne, et la variante vectorisée est utilisée par défaut.
+    La variante "compressed" n'a pas de version reduce_sum : threads > 1 y est
+    sans effet et déclenche un avertissement.
+    Les autres arguments sont transmis à CmdStanModel.sample.
+    """
+    variant = select_variant(df, threads, variant)
+    if threads > 1 and variant != "threaded":
+        warnings.warn(f"threads={threads} ignoré : la variante {variant!r} n'est pas parallélisée "
+                      "(reduce_sum n'existe que pour les matchs individuels non compressés)",
+                      stacklevel=2)
+    grainsize = None
+    if variant == "threaded":
+        # Une tranche par thread et par côté de la vraisemblance, au minimum
+        grainsize = max(1, len(df) // (2 * threads))
+        kwargs["threads_per_chain"] = threads
+
+    model = load_model(variant)
+    return model.sample(
+        data=build_stan_data(df, grainsize),
+        chains=chains,
+        iter_warmup=iter_warmup,
+        iter_sampling=iter_sampling,
+        adapt_delta=adapt_delta,
+        **kwargs
+    )
+
+
+METHODS = {
+    "sample": "NUTS (MCMC complet)",
+    "laplace": "Optimisation + approximation de Laplace",
+    "pathfinder": "Pathfinder",
+    "variational": "ADVI (variationnel)",
+}
+
+
+class _VariationalDraws:
+    """Expose les tirages (et non la moyenne) d'un CmdStanVB via stan_variable"""
+
+    def __init__(self, fit):
+        self.fit = fit
+
+    def stan_variable(self, name):
+        return self.fit.stan_variable(name, mean=False)
+
+
+def fit_model(df, method="sample", threads=1, draws=1000, seed=None, **kwargs):
+    """
+    Ajuste le modèle par NUTS ou par une méthode approchée rapide de CmdStan
+
+    method : "sample" (sample_model, kwargs transmis), "laplace" (mode + Laplace),
+    "pathfinder" ou "variational" (ADVI). Les méthodes approchées renvoient
+    `draws` tirages ; tous les résultats exposent stan_variable et peuvent être
+    enregistrés par posterior_store.save_posterior.
+    """
+    if method == "sample":
+        return sample_model(df, threads=threads, seed=seed, **kwargs)
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (choix : {', '.join(METHODS)})")
+
+    # Les méthodes approchées n'utilisent pas la variante reduce_sum
+    model = load_model(select_variant(df))
+    data = build_stan_data(df)
+    if method == "laplace":
+        return model.laplace_sample(data=data, draws=draws, seed=seed, **kwargs)
+    if method == "pathfinder":
+        return model.pathfinder(data=data, draws=draws, seed=seed, **kwargs)
+    return _VariationalDraws(model.variational(data=data, draws=draws, seed=seed, **kwargs))
+
+
+def gradient_evaluations(fit):
+    """Nombre total d'évaluations du gradient (somme des pas leapfrog, warmup compris si sauvegardé)"""
+    leapfrogs = fit.draws(inc_warmup=True, concat_chains=True)[:, fit.column_names.index("n_leapfrog__")]
+    return int(np.sum(leapfrogs))
+
+
+def fit_diagnostics(fit):
+    """R_hat maximal, ESS bulk minimal, divergences et temps (s) de warmup / sampling, max sur les chaînes"""
+    summary = fit.summary()
+    r_hat = [c for c in summary.columns if "R_hat" in c]
+    ess = [c for c in summary.columns if "ESS_bulk" in c or "N_Eff" in c]
+    return {
+        "max_r_hat": float(summary[r_hat[0]].max()) if r_hat else float("nan"),
+        "min_ess": float(summary[ess[0]].min()) if ess else float("nan"),
+        "divergences": int(np.sum(fit.divergences)),
+        "warmup_seconds": max(chain["warmup"] for chain in fit.time),
+        "sampling_seconds": max(chain["sampling"] for chain in fit.time),
+    }
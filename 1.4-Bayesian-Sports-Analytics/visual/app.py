@@ -1,14 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
 import json
 import os
 import shutil
 from pathlib import Path
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
-from cmdstanpy import CmdStanModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from match_predictor import FixturePredictions, top_scores
+from match_store import load_matches
+from posterior_store import load_metadata, load_posterior, load_teams, save_posterior
+from stan_models import METHODS, compress_matches, fit_model
 
 # Configuration de la page
 st.set_page_config(
@@ -21,6 +26,18 @@ st.set_page_config(
 TMP_DIR = Path("tmp")
 TMP_DIR.mkdir(parents=True, exist_ok=True)
 
+# Matchs de tous les championnats, mis en cache par Streamlit (pas relus à chaque rerun)
+@st.cache_data
+def load_all_matches():
+    return load_matches()
+
+# Bandeau des postérieurs approchés (étapes 4 et 5)
+def approximation_banner(posterior_dir):
+    method = load_metadata(posterior_dir)["method"]
+    if method != "sample":
+        st.warning(f"Résultats approchés : postérieur obtenu par {METHODS[method]}, et non par NUTS.")
+
+
 # Fonction pour nettoyer le dossier tmp
 def clean_tmp():
     if TMP_DIR.exists():
@@ -73,7 +90,7 @@ if st.session_state.step == 1:
     st.header("Étape 1: Sélection des Données")
     
     # Charger les données complètes
-    df_all = pd.read_csv("../data/football_all_leagues.csv")
+    df_all = load_all_matches()
     
     col1, col2 = st.columns(2)
     
@@ -147,14 +164,19 @@ elif st.session_state.step == 2:
     team2id = {team: i + 1 for i, team in enumerate(sorted(teams))}
     id2team = {i + 1: team for team, i in team2id.items()}
     
-    df["home_id"] = df["HomeTeam"].map(team2id)
-    df["away_id"] = df["AwayTeam"].map(team2id)
+    df["home_id"] = df["HomeTeam"].map(team2id).astype(int)
+    df["away_id"] = df["AwayTeam"].map(team2id).astype(int)
+    
+    # Compression : une ligne par affiche (statistiques suffisantes de la vraisemblance)
+    compressed_df = compress_matches(df)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.metric("Nombre de matchs", len(df))
         st.metric("Nombre d'équipes", len(teams))
+        st.metric("Lignes Stan après compression", len(compressed_df),
+                  delta=f"{len(df) / len(compressed_df):.1f}x moins", delta_color="off")
     
     with col2:
         st.metric("Championnat", st.session_state.league_selected)
@@ -168,9 +190,11 @@ elif st.session_state.step == 2:
     
     # Sauvegarder
     tmp_data_file = TMP_DIR / "prepared_data.csv"
+    tmp_compressed_file = TMP_DIR / "prepared_data_compressed.csv"
     tmp_mapping_file = TMP_DIR / "team_mapping.json"
     
     df.to_csv(tmp_data_file, index=False)
+    compressed_df.to_csv(tmp_compressed_file, index=False)
     with open(tmp_mapping_file, "w") as f:
         json.dump(team2id, f, indent=2)
     
@@ -179,6 +203,7 @@ elif st.session_state.step == 2:
     if st.button("Passer à l'entraînement du modèle", type="primary"):
         st.session_state.data_prepared = True
         st.session_state.df = df
+        st.session_state.compressed_df = compressed_df
         st.session_state.team2id = team2id
         st.session_state.id2team = id2team
         st.session_state.step = 3
@@ -197,9 +222,22 @@ elif st.session_state.step == 3:
     
     df = st.session_state.df
     
+    # Méthode d'inférence
+    method = st.radio(
+        "Méthode d'inférence",
+        list(METHODS),
+        format_func=METHODS.get,
+        horizontal=True,
+        help="Les méthodes approchées donnent un postérieur en quelques secondes pour explorer ; "
+             "réserver NUTS aux analyses finales"
+    )
+    if method != "sample":
+        st.info(f"**{METHODS[method]}** : approximation rapide du postérieur. "
+                "Les résultats seront signalés comme approchés dans les étapes suivantes.")
+    
     # Paramètres MCMC
     st.subheader("Paramètres MCMC")
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         chains = st.number_input("Nombre de chaînes", 1, 8, 4)
@@ -207,82 +245,83 @@ elif st.session_state.step == 3:
         warmup = st.number_input("Warmup iterations", 100, 2000, 1000)
     with col3:
         sampling = st.number_input("Sampling iterations", 100, 3000, 2000)
+    with col4:
+        threads = st.number_input("Threads par chaîne", 1, 16, 1,
+                                  help="Au-delà de 1, la vraisemblance est parallélisée (reduce_sum)")
+    
+    compress = st.checkbox(
+        "Compresser les données (une ligne par affiche)", value=True,
+        help="Même postérieur, moins de lignes à traiter ; les threads ne s'appliquent qu'aux données non compressées"
+    )
+    if compress and threads > 1:
+        st.warning(f"{threads} threads par chaîne sans effet sur les données compressées : "
+                   "décochez la compression pour paralléliser la vraisemblance (reduce_sum).")
     
     if st.button("Lancer l'entraînement", type="primary"):
         with st.spinner("Entraînement en cours... Cela peut prendre quelques minutes"):
             
-            # Préparer les données pour Stan
-            stan_data = {
-                "N": len(df),
-                "T": max(df["home_id"].max(), df["away_id"].max()),
-                "home_team": df["home_id"].values,
-                "away_team": df["away_id"].values,
-                "home_goals": df["HomeGoals"].values.astype(int),
-                "away_goals": df["AwayGoals"].values.astype(int),
-            }
-            
             # Compiler et entraîner
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            status_text.text("Compilation du modèle Stan...")
+            status_text.text(f"Compilation du modèle Stan et inférence ({METHODS[method]})...")
             progress_bar.progress(10)
             
-            model = CmdStanModel(stan_file="../stan/football_model.stan")
-            
-            status_text.text("Échantillonnage MCMC...")
-            progress_bar.progress(30)
-            
-            fit = model.sample(
-                data=stan_data,
-                chains=chains,
-                iter_warmup=warmup,
-                iter_sampling=sampling,
-                adapt_delta=0.95,
-                show_console=False
-            )
+            data = st.session_state.compressed_df if compress else df
+            if method == "sample":
+                fit = fit_model(
+                    data,
+                    threads=threads,
+                    chains=chains,
+                    iter_warmup=warmup,
+                    iter_sampling=sampling,
+                    adapt_delta=0.95,
+                    show_console=False
+                )
+            else:
+                fit = fit_model(data, method=method)
             
             progress_bar.progress(90)
             status_text.text("Sauvegarde du modèle...")
             
-            # Sauvegarder
-            tmp_fit_file = TMP_DIR / "fit.pkl"
-            with open(tmp_fit_file, "wb") as f:
-                pickle.dump(fit, f)
+            # Sauvegarder le postérieur (tirages par paramètre + index des équipes)
+            posterior_dir = TMP_DIR / "posterior"
+            save_posterior(fit, posterior_dir, st.session_state.team2id, method=method)
             
             progress_bar.progress(100)
             status_text.text("Entraînement terminé!")
             
-            st.session_state.fit = fit
+            st.session_state.posterior_dir = posterior_dir
             st.session_state.model_fitted = True
             
         st.success("Modèle entraîné avec succès!")
         
-        # Diagnostics
-        st.subheader("Diagnostics de convergence")
-        summary = fit.summary()
-        
-        # Afficher R_hat
-        r_hat_cols = [c for c in summary.columns if "R_hat" in c]
-        if r_hat_cols:
-            r_hat_col = r_hat_cols[0]
-            max_r_hat = summary[r_hat_col].max()
+        if method != "sample":
+            st.warning(f"Postérieur approché ({METHODS[method]}) : pas de diagnostics MCMC. "
+                       "Relancer avec NUTS pour les résultats définitifs.")
+        else:
+            # Diagnostics
+            st.subheader("Diagnostics de convergence")
+            summary = fit.summary()
             
-            if max_r_hat < 1.01:
-                st.success(f"Excellente convergence (R_hat max = {max_r_hat:.4f})")
-            elif max_r_hat < 1.05:
-                st.info(f"Convergence acceptable (R_hat max = {max_r_hat:.4f})")
-            else:
-                st.warning(f"Convergence douteuse (R_hat max = {max_r_hat:.4f})")
-        
-        with st.expander("Voir le résumé complet"):
-            st.dataframe(summary)
+            # Afficher R_hat
+            r_hat_cols = [c for c in summary.columns if "R_hat" in c]
+            if r_hat_cols:
+                r_hat_col = r_hat_cols[0]
+                max_r_hat = summary[r_hat_col].max()
+                
+                if max_r_hat < 1.01:
+                    st.success(f"Excellente convergence (R_hat max = {max_r_hat:.4f})")
+                elif max_r_hat < 1.05:
+                    st.info(f"Convergence acceptable (R_hat max = {max_r_hat:.4f})")
+                else:
+                    st.warning(f"Convergence douteuse (R_hat max = {max_r_hat:.4f})")
+            
+            with st.expander("Voir le résumé complet"):
+                st.dataframe(summary)
         
         # Sauvegarder l'état
         st.session_state.step = 4
-        st.session_state.attack = None
-        st.session_state.defense = None
-        st.session_state.home_adv_mean = None
         
         if st.button("Analyser les résultats", type="primary"):
             st.rerun()
@@ -298,32 +337,19 @@ elif st.session_state.step == 4:
         st.warning("Veuillez d'abord entraîner le modèle")
         st.stop()
     
-    fit = st.session_state.fit
-    team2id = st.session_state.team2id
-    id2team = st.session_state.id2team
-    
-    # Extraire les paramètres
-    posterior = fit.draws_pd()
+    approximation_banner(st.session_state.posterior_dir)
     
-    attack_cols = [c for c in posterior.columns if "attack[" in c]
-    defense_cols = [c for c in posterior.columns if "defense[" in c]
+    # Charger uniquement les paramètres utiles
+    posterior = load_posterior(st.session_state.posterior_dir, ["home_adv", "attack", "defense"])
+    teams = load_teams(st.session_state.posterior_dir)
     
-    attack_mean = posterior[attack_cols].mean().values
-    defense_mean = posterior[defense_cols].mean().values
+    attack_mean = posterior["attack"].mean(axis=0)
+    defense_mean = posterior["defense"].mean(axis=0)
     home_adv = posterior["home_adv"]
     
-    # Créer mapping des équipes disponibles (certaines peuvent être absentes)
-    n_teams = len(attack_mean)
-    id2team_sorted = {}
-    team_counter = 0
-    for team_id in sorted(id2team.keys()):
-        if team_counter < n_teams:
-            id2team_sorted[team_counter + 1] = id2team[team_id]
-            team_counter += 1
-    
     # Créer DataFrame de ranking
     ranking = pd.DataFrame({
-        "Team": [id2team_sorted.get(i + 1, f"Team {i+1}") for i in range(len(attack_mean))],
+        "Team": teams,
         "Attack": attack_mean,
         "Defense": defense_mean
     })
@@ -405,7 +431,7 @@ elif st.session_state.step == 4:
         
         with col1:
             st.metric("Moyenne (log)", f"{home_adv.mean():.4f}")
-            st.metric("Écart-type", f"{home_adv.std():.4f}")
+            st.metric("Écart-type", f"{home_adv.std(ddof=1):.4f}")
             st.metric("exp(moyenne)", f"{np.exp(home_adv.mean()):.4f}")
             st.metric("% buts supplémentaires", f"{(np.exp(home_adv.mean())-1)*100:.1f}%")
         
@@ -462,11 +488,6 @@ elif st.session_state.step == 4:
         - En bas à droite: Bonnes attaques ET bonnes défenses (équipes complètes)
         """)
     
-    # Sauvegarder les paramètres
-    st.session_state.attack = attack_mean
-    st.session_state.defense = defense_mean
-    st.session_state.home_adv_mean = home_adv.mean()
-    
     if st.button("Faire des prédictions", type="primary"):
         st.session_state.step = 5
         st.rerun()
@@ -483,11 +504,22 @@ elif st.session_state.step == 5:
         st.stop()
     
     team2id = st.session_state.team2id
-    attack = st.session_state.attack
-    defense = st.session_state.defense
-    home_adv = st.session_state.home_adv_mean
+    approximation_banner(st.session_state.posterior_dir)
+    
+    # Toutes les affiches, en cache sous l'empreinte du postérieur
+    fixtures = FixturePredictions(st.session_state.posterior_dir)
     df = st.session_state.df
     
+    with st.expander("Toutes les affiches du championnat"):
+        outcome_table = fixtures.outcome_table()
+        st.dataframe(outcome_table, use_container_width=True)
+        st.download_button(
+            "Exporter en CSV",
+            outcome_table.to_csv(index=False).encode("utf-8"),
+            file_name="fixture_predictions.csv",
+            mime="text/csv"
+        )
+    
     # Sélection des équipes
     teams = sorted(team2id.keys())
     
@@ -503,28 +535,9 @@ elif st.session_state.step == 5:
         st.warning("Veuillez sélectionner deux équipes différentes")
         st.stop()
     
-    # Fonction de simulation
-    def simulate_match(home, away, n=10000):
-        h = team2id[home] - 1
-        a = team2id[away] - 1
-        
-        lam_home = np.exp(home_adv + attack[h] - defense[a])
-        lam_away = np.exp(attack[a] - defense[h])
-        
-        gh = np.random.poisson(lam_home, n)
-        ga = np.random.poisson(lam_away, n)
-        
-        return {
-            "home_win": (gh > ga).mean(),
-            "draw": (gh == ga).mean(),
-            "away_win": (gh < ga).mean(),
-            "goals_home": gh,
-            "goals_away": ga
-        }
-    
     if st.button("Prédire le match", type="primary"):
-        with st.spinner("Simulation en cours..."):
-            pred = simulate_match(home_team, away_team)
+        # Matrice des scores exacte, intégrée sur tous les tirages du postérieur
+        pred = fixtures.predict(home_team, away_team)
         
         st.markdown("---")
         st.subheader("Résultats de la prédiction")
@@ -577,16 +590,10 @@ elif st.session_state.step == 5:
             # Distribution des scores
             fig, ax = plt.subplots(figsize=(8, 5))
             
-            # Compter les scores
-            scores = {}
-            for gh, ga in zip(pred['goals_home'], pred['goals_away']):
-                key = f"{gh}-{ga}"
-                scores[key] = scores.get(key, 0) + 1
-            
             # Top 10 scores
-            top_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:10]
-            score_labels = [s[0] for s in top_scores]
-            score_counts = [s[1]/100 for s in top_scores]
+            best_scores = top_scores(pred['score_matrix'], 10)
+            score_labels = [s[0] for s in best_scores]
+            score_counts = [s[1] * 100 for s in best_scores]
             
             ax.barh(score_labels, score_counts, color='purple', alpha=0.7)
             ax.set_xlabel("Probabilité (%)")
@@ -595,6 +602,17 @@ elif st.session_state.step == 5:
             plt.tight_layout()
             st.pyplot(fig)
         
+        # Over / Under
+        st.subheader("Total de buts (Over / Under)")
+        lines = sorted({float(k.split("_")[1]) for k in pred if k.startswith("over_")})
+        st.dataframe(pd.DataFrame({
+            "Ligne": lines,
+            "Over (%)": [f"{pred[f'over_{line}']:.1%}" for line in lines],
+            "Cote Over": [f"{1 / pred[f'over_{line}']:.2f}" for line in lines],
+            "Under (%)": [f"{pred[f'under_{line}']:.1%}" for line in lines],
+            "Cote Under": [f"{1 / pred[f'under_{line}']:.2f}" for line in lines],
+        }), use_container_width=True)
+        
         # Comparaison avec bookmakers
         st.markdown("---")
         st.subheader("Comparaison avec les Bookmakers")
@@ -0,0 +1,133 @@
+"""
+Point d'entrée non interactif (tâches batch, mesures de performance)
+Remplace les menus input() de main.py et visualizations.py par des options
+en ligne de commande et écrit un résumé JSON (débit, exploitabilité, game
+value, stratégie finale) sur la sortie standard et dans le dossier de sortie.
+Les journaux d'entraînement sont redirigés vers la sortie d'erreur pour que
+la sortie standard reste du JSON valide.
+
+Exemples:
+    python batch.py --iterations 50000 --seed 0 --checkpoint-every 5000
+    python batch.py --algorithm cfr cfr+ fictitious-play --seed 0 1 2 --workers 4
+"""
+
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+from cfr_academic import compute_exploitability_batch, compute_payoff_matrix
+from game_tree import GameTree
+from main import run_training_experiment, visualize_convergence
+from solvers import SOLVERS, make_solver, run_solver
+
+
+def run_job(algorithm: str, iterations: int, seed: int, checkpoint_every: int = None,
+            output_dir: str = ".") -> Dict:
+    """
+    Entraîne un moteur et résume le résultat
+
+    'cfr-sampled' (le CFRTrainer de main.py) passe par visualize_convergence si
+    checkpoint_every est fourni (le temps mesuré inclut alors l'évaluation des
+    checkpoints), sinon par run_training_experiment. Les autres moteurs passent
+    par solvers.run_solver (temps d'évaluation exclu).
+
+    Returns:
+        Dictionnaire sérialisable en JSON
+    """
+    tree = GameTree()
+    summary = {'algorithm': algorithm, 'seed': seed, 'iterations': iterations,
+               'checkpoint_every': checkpoint_every}
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if algorithm == 'cfr-sampled':
+            start = time.perf_counter()
+            if checkpoint_every:
+                figure = os.path.join(output_dir, f"convergence_{algorithm}_seed{seed}.png")
+                trainer, history = visualize_convergence(
+                    max_iterations=iterations, checkpoints=max(1, iterations // checkpoint_every),
+                    spacing='linear', output_path=figure, seed=seed, return_history=True)
+                summary['convergence'] = {'iterations': history['iterations'],
+                                          'exploitability_mbb': history['exploitabilities']}
+                summary['figure'] = figure
+            else:
+                trainer = run_training_experiment(iterations=iterations, seed=seed)
+            seconds = time.perf_counter() - start
+            tensor = tree.profile_to_tensor(trainer.get_strategy_profile())
+        else:
+            random.seed(seed)
+            np.random.seed(seed)
+            solver = make_solver(algorithm, tree.game)
+            result = run_solver(solver, max_iterations=iterations,
+                                eval_every=checkpoint_every or iterations)
+            seconds = result['solve_seconds']
+            tensor = solver.average_tensor()
+            summary['convergence'] = {'iterations': result['history_iterations'],
+                                      'exploitability_mbb': result['history_exploitability']}
+
+    summary['seconds'] = seconds
+    summary['iterations_per_second'] = iterations / seconds if seconds > 0 else None
+    summary['exploitability_mbb'] = float(compute_exploitability_batch(tree, tensor[None])[0])
+    summary['game_value'] = float(compute_payoff_matrix(tree, tensor[None], tensor[None])[0, 0])
+    summary['strategy'] = {key: tensor[i].tolist() for i, key in enumerate(tree.infoset_keys)}
+    return summary
+
+
+def _run_job(job: Dict) -> Dict:
+    return run_job(**job)
+
+
+def run_batch(algorithms: List[str], iterations: int, seeds: List[int],
+              checkpoint_every: int = None, output_dir: str = ".", workers: int = 1) -> List[Dict]:
+    """
+    Exécute toutes les combinaisons (moteur, graine), en parallèle si workers > 1
+
+    Returns:
+        Liste des résumés, dans l'ordre (moteur, graine)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [{'algorithm': algorithm, 'iterations': iterations, 'seed': seed,
+             'checkpoint_every': checkpoint_every, 'output_dir': output_dir}
+            for algorithm, seed in itertools.product(algorithms, seeds)]
+
+    if workers == 1 or len(jobs) == 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run_job, jobs))
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Entraînement CFR non interactif (résumé JSON)")
+    parser.add_argument("--algorithm", nargs="+", default=["cfr-sampled"], choices=list(SOLVERS),
+                        help="Moteur(s) de résolution (défaut: cfr-sampled, le CFRTrainer de main.py)")
+    parser.add_argument("--iterations", type=int, default=10000, help="Nombre d'itérations")
+    parser.add_argument("--seed", type=int, nargs="+", default=[0], help="Graine(s) aléatoire(s)")
+    parser.add_argument("--checkpoint-every", type=int, default=None,
+                        help="Intervalle entre deux mesures d'exploitabilité (défaut: aucune)")
+    parser.add_argument("--output-dir", default="batch_output", help="Dossier des résultats")
+    parser.add_argument("--workers", type=int, default=1, help="Nombre de processus")
+    args = parser.parse_args()
+
+    summaries = run_batch(args.algorithm, args.iterations, args.seed,
+                          checkpoint_every=args.checkpoint_every,
+                          output_dir=args.output_dir, workers=args.workers)
+
+    path = os.path.join(args.output_dir, "summary.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2)
+    json.dump(summaries, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Croyances publiques (public belief states)
+Pour un profil de stratégie, calcule en une seule passe vectorisée sur l'arbre
+compilé la distribution a posteriori des cartes privées à chaque historique
+public, sans parcourir l'arbre carte par carte:
+- public_beliefs: postérieurs des deux joueurs (et des donnes) par historique
+- infoset_beliefs: postérieur de la carte adverse à chaque information set
+
+Destiné à la re-résolution de sous-jeux, à la modélisation de l'adversaire et
+aux analyses. Un historique jamais atteint par le profil reçoit l'a priori
+(distribution uniforme des donnes).
+"""
+
+import numpy as np
+from typing import Dict
+from game_tree import GameTree
+
+
+def joint_reach(tree: GameTree, tensors: np.ndarray) -> np.ndarray:
+    """
+    Probabilité d'atteindre chaque nœud (hasard x reach des deux joueurs)
+
+    Returns:
+        Tableau (K, D, H)
+    """
+    return tree.deal_prob * tree.reach(tensors, 0) * tree.reach(tensors, 1)
+
+
+def _card_one_hot(tree: GameTree) -> np.ndarray:
+    """Indicatrices (2, D, C): la carte du joueur p dans la donne d vaut c"""
+    cards = np.array(tree.game.cards)
+    return (tree.deal_cards.T[:, :, None] == cards[None, None, :]).astype(np.float64)
+
+
+def _normalize(weights: np.ndarray, prior: np.ndarray) -> np.ndarray:
+    """Normalise sur le dernier axe; a priori là où la masse est nulle"""
+    totals = weights.sum(axis=-1, keepdims=True)
+    return np.where(totals > 0, weights / np.where(totals > 0, totals, 1.0), prior)
+
+
+def public_beliefs(tree: GameTree, tensors: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Croyances a posteriori sur les cartes privées à chaque historique public
+
+    Args:
+        tree: Arbre de jeu compilé
+        tensors: Profils de stratégie (K, I, A)
+
+    Returns:
+        Dictionnaire avec:
+        - 'history_prob' (K, H): probabilité d'atteindre chaque historique
+        - 'deals' (K, H, D): postérieur joint des donnes
+        - 'cards' (K, 2, H, C): postérieur de la carte de chaque joueur
+          (vu par un observateur qui ne connaît aucune carte)
+    """
+    reach = joint_reach(tree, tensors).transpose(0, 2, 1)  # (K, H, D)
+    deals = _normalize(reach, np.full(tree.num_deals, tree.deal_prob))
+    cards = np.einsum('khd,pdc->kphc', deals, _card_one_hot(tree))
+    return {
+        'history_prob': reach.sum(axis=-1),
+        'deals': deals,
+        'cards': cards,
+    }
+
+
+def infoset_beliefs(tree: GameTree, tensors: np.ndarray) -> np.ndarray:
+    """
+    Postérieur de la carte adverse à chaque information set
+    (ce que le joueur qui agit croit, connaissant sa propre carte)
+
+    Returns:
+        Tableau (K, I, C)
+    """
+    one_hot = _card_one_hot(tree)
+    reach = joint_reach(tree, tensors)[:, :, tree.infoset_node_history]  # (K, D, I)
+    players = tree.infoset_player
+    # Donnes compatibles avec la carte du joueur qui agit
+    own = one_hot[players, :, tree.infoset_card].T  # (D, I)
+    opponent = one_hot[1 - players]                  # (I, D, C)
+    weights = np.einsum('kdi,di,idc->kic', reach, own, opponent)
+
+    # A priori: carte adverse uniforme parmi les cartes restantes
+    prior = np.einsum('di,idc->ic', own, opponent)
+    prior = prior / prior.sum(axis=-1, keepdims=True)
+    return _normalize(weights, prior[None])
+
+
+def display_beliefs(tree: GameTree, tensor: np.ndarray):
+    """Affiche les postérieurs de chaque joueur à chaque historique de décision"""
+    beliefs = public_beliefs(tree, tensor[None])
+    names = [tree.game.get_card_name(card) for card in tree.game.cards]
+
+    print("\n" + "="*70)
+    print("CROYANCES PUBLIQUES (postérieur des cartes privées)")
+    print("="*70)
+    header = "".join(f"{name:>8s}" for name in names)
+    print(f"{'Historique':<12s}{'P(hist)':>9s}  Joueur 0: {header}  Joueur 1: {header}")
+    for history in tree.decision_histories:
+        h = tree.history_index[history]
+        p0 = "".join(f"{p:>8.3f}" for p in beliefs['cards'][0, 0, h])
+        p1 = "".join(f"{p:>8.3f}" for p in beliefs['cards'][0, 1, h])
+        print(f"{history or '(racine)':<12s}{beliefs['history_prob'][0, h]:>9.3f}  "
+              f"Joueur 0: {p0}  Joueur 1: {p1}")
+
+
+if __name__ == "__main__":
+    from nash_family import ALPHA_MAX, equilibrium_profile
+
+    tree = GameTree()
+    display_beliefs(tree, tree.profile_to_tensor(equilibrium_profile(ALPHA_MAX)))
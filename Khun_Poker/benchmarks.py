@@ -0,0 +1,125 @@
+"""
+Micro-benchmarks du moteur CFR
+- benchmark_precision: compare les modes de stockage des regrets (mémoire,
+  temps, exploitabilité atteinte, borne d'erreur d'accumulation)
+- benchmark_game_caches: coût par nœud des fonctions de KuhnPoker avec et
+  sans tables précalculées, et effet sur un entraînement complet
+"""
+
+import random
+import time
+import timeit
+from typing import Dict, List
+from cfr_academic import compute_exploitability_batch
+from cfr_algorithm import CFRTrainer, PRECISIONS
+from game_tree import GameTree
+from kuhn_poker import KuhnPoker
+
+
+def benchmark_precision(iterations: int = 20000, seed: int = 0, game: KuhnPoker = None,
+                        precisions: List[str] = None) -> List[Dict]:
+    """
+    Entraîne un CFRTrainer par mode de stockage (même graine) et compare les résultats
+
+    Returns:
+        Liste de dictionnaires: 'precision', 'seconds', 'exploitability_mbb'
+        et les champs de CFRTrainer.memory_report()
+    """
+    game = game if game is not None else KuhnPoker()
+    tree = GameTree(game)
+    results = []
+
+    print("\n" + "="*98)
+    print(f"PRÉCISION DU STOCKAGE DES REGRETS ({iterations:,} itérations)")
+    print("="*98)
+    print(f"{'Précision':<12s}{'Infosets':>10s}{'Octets/infoset':>16s}{'dont tableaux':>15s}"
+          f"{'Temps (s)':>11s}{'Exploit (mbb)':>15s}{'Err. regrets':>14s}{'Err. stratég.':>15s}")
+    print("-" * 98)
+
+    for precision in precisions or PRECISIONS:
+        random.seed(seed)
+        trainer = CFRTrainer(game, precision=precision)
+        start = time.perf_counter()
+        trainer.train(iterations, verbose=False)
+        seconds = time.perf_counter() - start
+
+        tensor = tree.profile_to_tensor(trainer.get_strategy_profile())[None]
+        result = dict(trainer.memory_report(), precision=precision, seconds=seconds,
+                      exploitability_mbb=float(compute_exploitability_batch(tree, tensor)[0]))
+        results.append(result)
+        print(f"{precision:<12s}{result['num_infosets']:>10d}{result['bytes_per_infoset']:>16.1f}"
+              f"{result['array_bytes_per_infoset']:>15d}{seconds:>11.3f}"
+              f"{result['exploitability_mbb']:>15.3f}{result['regret_error_bound']:>14.2e}"
+              f"{result['strategy_sum_error_bound']:>15.2e}")
+
+    return results
+
+
+def benchmark_game_caches(repeats: int = 200, iterations: int = 20000, seed: int = 0,
+                          game: KuhnPoker = None) -> Dict:
+    """
+    Mesure le coût par nœud de is_terminal, get_payoff et get_information_set
+    (calcul direct vs tables précalculées) sur tous les nœuds (donne, historique)
+    de l'arbre, puis le temps d'un entraînement CFRTrainer avec et sans tables
+
+    Returns:
+        Dictionnaire avec 'per_node_ns' ({fonction: (direct, tables)}),
+        'training_seconds' ((direct, tables)) et 'cache_info' (compteurs d'un
+        entraînement avec count_calls=True)
+    """
+    game = game if game is not None else KuhnPoker()
+    params = dict(num_cards=len(game.cards), ante=game.ante, bet_size=game.bet_size,
+                  payoff_scale=game.payoff_scale)
+    uncached = KuhnPoker(**params, precompute=False)
+    tree = GameTree(game)
+    nodes = [(list(deal), history) for deal in tree.deals for history in tree.histories]
+    terminal_nodes = [(cards, history) for cards, history in nodes if game.is_terminal(history)]
+
+    functions = {
+        'is_terminal': (lambda: [game.compute_is_terminal(h) for _, h in nodes],
+                        lambda: [game.is_terminal(h) for _, h in nodes], len(nodes)),
+        'get_payoff': (lambda: [game.compute_payoff(h, c) for c, h in terminal_nodes],
+                       lambda: [game.get_payoff(h, c) for c, h in terminal_nodes], len(terminal_nodes)),
+        'get_information_set': (lambda: [game.compute_information_set(c[0], h) for c, h in nodes],
+                                lambda: [game.get_information_set(c[0], h) for c, h in nodes], len(nodes)),
+    }
+
+    print("\n" + "="*70)
+    print("TABLES PRÉCALCULÉES DU JEU")
+    print("="*70)
+    print(f"{'Fonction':<24s}{'Direct (ns/nœud)':>18s}{'Table (ns/nœud)':>18s}{'Gain':>10s}")
+    print("-" * 70)
+    per_node = {}
+    for name, (direct, cached, count) in functions.items():
+        direct_ns = timeit.timeit(direct, number=repeats) / (repeats * count) * 1e9
+        cached_ns = timeit.timeit(cached, number=repeats) / (repeats * count) * 1e9
+        per_node[name] = (direct_ns, cached_ns)
+        print(f"{name:<24s}{direct_ns:>18.1f}{cached_ns:>18.1f}{direct_ns / cached_ns:>9.2f}x")
+
+    training = []
+    for candidate in (uncached, game):
+        random.seed(seed)
+        trainer = CFRTrainer(candidate)
+        start = time.perf_counter()
+        trainer.train(iterations, verbose=False)
+        training.append(time.perf_counter() - start)
+
+    print(f"\nEntraînement ({iterations:,} itérations): sans tables {training[0]:.3f} s, "
+          f"avec tables {training[1]:.3f} s")
+
+    # Compteurs sur un entraînement séparé (count_calls ralentit chaque appel)
+    counted = KuhnPoker(**params, count_calls=True)
+    random.seed(seed)
+    CFRTrainer(counted).train(iterations, verbose=False)
+    info = counted.cache_info()
+    for name, stats in info.items():
+        print(f"  {name:<18s} taux de succès {stats['hit_rate'] * 100:6.2f}%  "
+              f"({stats['hits']:,} hits, {stats['misses']:,} misses, {stats['size']} entrées)")
+
+    return {'per_node_ns': per_node, 'training_seconds': tuple(training), 'cache_info': info}
+
+
+if __name__ == "__main__":
+    benchmark_game_caches()
+    benchmark_precision()
+    benchmark_precision(iterations=20000, game=KuhnPoker(num_cards=13))
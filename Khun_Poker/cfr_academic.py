@@ -10,8 +10,9 @@ de l'adversaire.
 """
 
 import numpy as np
-from typing import Dict
+from typing import Dict, Tuple
 from kuhn_poker import KuhnPoker
+from game_tree import GameTree
 
 
 def compute_exploitability(game: KuhnPoker, strategy_profile: Dict[str, np.ndarray]) -> float:
@@ -47,69 +48,81 @@ def compute_best_response_value(game: KuhnPoker, strategy_profile: Dict[str, np.
     Le joueur BR ne connaît pas la carte de l'adversaire!
     
     Algorithme:
-    1. Pour chaque information set du br_player, calculer l'EV de chaque action
-       en moyennant sur toutes les cartes possibles de l'adversaire
-    2. Choisir l'action avec le meilleur EV pour chaque infoset
-    3. Calculer la valeur totale du jeu avec cette stratégie BR
+    1. Énumérer les noeuds du br_player avec la probabilité d'atteinte de
+       l'adversaire et du hasard
+    2. Des historiques les plus longs vers la racine: pour chaque information
+       set, calculer l'EV de chaque action en moyennant sur toutes les cartes
+       possibles de l'adversaire, les décisions BR ultérieures étant déjà fixées
+    3. Choisir l'action avec le meilleur EV pour chaque infoset
+    4. Calculer la valeur totale du jeu avec cette stratégie BR
     
     Returns:
         Valeur du jeu du point de vue du joueur 0
     """
     num_actions = 2
     
-    # Étape 1: Calculer l'EV de chaque action dans chaque infoset du BR player
-    infoset_action_ev = {}
+    # Étape 1: Noeuds du BR player (cartes, historique, reach adverse x hasard)
+    br_nodes = []
     
-    def collect_action_values(cards, history, prob_reach):
-        """Collecte les valeurs EV pour chaque action de chaque infoset."""
+    def collect_nodes(cards, history, prob_reach):
         if game.is_terminal(history):
-            payoff = game.get_payoff(history, cards)
-            if br_player == 1:
-                payoff = -payoff
-            return payoff
+            return
         
         plays = len(history)
         current_player = plays % 2
         infoset = game.get_information_set(cards[current_player], history)
         
         if current_player == br_player:
-            if infoset not in infoset_action_ev:
-                infoset_action_ev[infoset] = {a: [0.0, 0.0] for a in range(num_actions)}
-            
+            br_nodes.append((cards, history, infoset, prob_reach))
             for action in range(num_actions):
                 action_char = 'p' if action == 0 else 'b'
-                value = collect_action_values(cards, history + action_char, prob_reach)
-                infoset_action_ev[infoset][action][0] += prob_reach * value
-                infoset_action_ev[infoset][action][1] += prob_reach
-            
-            return 0.0
+                collect_nodes(cards, history + action_char, prob_reach)
         else:
             strategy = strategy_profile.get(infoset, np.ones(num_actions) / num_actions)
-            total = 0.0
             for action in range(num_actions):
                 action_char = 'p' if action == 0 else 'b'
                 new_prob = prob_reach * strategy[action]
                 if new_prob > 0:
-                    total += strategy[action] * collect_action_values(cards, history + action_char, new_prob)
-            return total
+                    collect_nodes(cards, history + action_char, new_prob)
     
-    for c0 in range(3):
-        for c1 in range(3):
+    num_deals = len(game.cards) * (len(game.cards) - 1)
+    for c0 in game.cards:
+        for c1 in game.cards:
             if c0 != c1:
-                collect_action_values([c0, c1], "", 1.0 / 6)
+                collect_nodes([c0, c1], "", 1.0 / num_deals)
     
-    # Étape 2: Construire la stratégie BR optimale
     br_strategy = {}
-    for infoset, action_data in infoset_action_ev.items():
-        ev = {}
-        for action in range(num_actions):
-            if action_data[action][1] > 0:
-                ev[action] = action_data[action][0] / action_data[action][1]
-            else:
-                ev[action] = 0.0
+    
+    def br_value(cards, history):
+        """Valeur pour br_player, les décisions BR plus profondes étant déjà choisies."""
+        if game.is_terminal(history):
+            payoff = game.get_payoff(history, cards)
+            return -payoff if br_player == 1 else payoff
         
-        best_action = max(ev.keys(), key=lambda a: ev[a])
-        br_strategy[infoset] = np.array([1.0 if a == best_action else 0.0 for a in range(num_actions)])
+        plays = len(history)
+        current_player = plays % 2
+        infoset = game.get_information_set(cards[current_player], history)
+        if current_player == br_player:
+            strategy = br_strategy[infoset]
+        else:
+            strategy = strategy_profile.get(infoset, np.ones(num_actions) / num_actions)
+        return sum(strategy[a] * br_value(cards, history + ('p' if a == 0 else 'b'))
+                   for a in range(num_actions) if strategy[a] > 0)
+    
+    # Étapes 2-3: EV des actions par infoset, des feuilles vers la racine
+    for length in sorted({len(node[1]) for node in br_nodes}, reverse=True):
+        infoset_action_ev = {}
+        for cards, history, infoset, prob_reach in br_nodes:
+            if len(history) != length:
+                continue
+            ev = infoset_action_ev.setdefault(infoset, np.zeros(num_actions))
+            for action in range(num_actions):
+                action_char = 'p' if action == 0 else 'b'
+                ev[action] += prob_reach * br_value(cards, history + action_char)
+        
+        for infoset, ev in infoset_action_ev.items():
+            best_action = int(np.argmax(ev))
+            br_strategy[infoset] = np.array([1.0 if a == best_action else 0.0 for a in range(num_actions)])
     
     # Étape 3: Calculer la valeur du jeu avec la stratégie BR
     def compute_value(cards, history):
@@ -131,8 +144,8 @@ def compute_best_response_value(game: KuhnPoker, strategy_profile: Dict[str, np.
             total += strategy[action] * compute_value(cards, history + action_char)
         return total
     
-    total_value = sum(compute_value([c0, c1], "") for c0 in range(3) for c1 in range(3) if c0 != c1)
-    return total_value / 6
+    total_value = sum(compute_value([c0, c1], "") for c0 in game.cards for c1 in game.cards if c0 != c1)
+    return total_value / num_deals
 
 
 def compute_game_value(game: KuhnPoker, strategy_profile: Dict[str, np.ndarray]) -> float:
@@ -152,13 +165,13 @@ def compute_game_value(game: KuhnPoker, strategy_profile: Dict[str, np.ndarray])
                    for a in range(num_actions))
     
     # Calculer la valeur espérée sur toutes les distributions de cartes possibles
-    # Il y a 3! = 6 permutations, mais seules les 2 premières cartes comptent
-    # Donc 3 * 2 = 6 paires ordonnées possibles, chacune avec probabilité 1/6
+    # Seules les 2 premières cartes comptent: avec 3 cartes, 3 * 2 = 6 paires
+    # ordonnées possibles, chacune avec probabilité 1/6
     total_value = 0
     num_deals = 0
     
-    for c0 in range(3):
-        for c1 in range(3):
+    for c0 in game.cards:
+        for c1 in game.cards:
             if c0 != c1:
                 value = recursive_value([c0, c1], "")
                 total_value += value
@@ -167,14 +180,154 @@ def compute_game_value(game: KuhnPoker, strategy_profile: Dict[str, np.ndarray])
     return total_value / num_deals
 
 
+def nash_game_value(game: KuhnPoker) -> float:
+    """
+    Valeur de Nash du joueur 0 dans les unités du jeu: -1/18 en gains naturels
+    (ante = bet = 1), mise à l'échelle par l'ante et payoff_scale (-1/90 par défaut)
+    """
+    return -game.ante / 18 / game.payoff_scale
+
+
 def verify_nash_value(game: KuhnPoker, strategy_profile: Dict[str, np.ndarray], 
                      num_games: int = 10000) -> tuple:
     """
-    Vérifie si la stratégie atteint la valeur Nash théorique de -1/18.
+    Vérifie si la stratégie atteint la valeur Nash théorique (nash_game_value).
     
     Returns:
         (valeur_exacte, valeur_théorique)
     """
     exact_value = compute_game_value(game, strategy_profile)
-    nash_value = -1/18
+    nash_value = nash_game_value(game)
     return exact_value, nash_value
+
+
+def compute_payoff_matrix(tree: GameTree, tensors_p0: np.ndarray, tensors_p1: np.ndarray) -> np.ndarray:
+    """
+    Valeurs du jeu (point de vue P0) pour toutes les paires de profils, en un seul calcul.
+    
+    Args:
+        tree: Arbre de jeu compilé
+        tensors_p0: Profils joués par P0, tenseur (K0, I, A)
+        tensors_p1: Profils joués par P1, tenseur (K1, I, A)
+        
+    Returns:
+        Matrice (K0, K1): M[i, j] = valeur pour P0 quand P0 joue i et P1 joue j
+    """
+    reach_p0 = tree.reach(tensors_p0, 0)
+    reach_p1 = tree.reach(tensors_p1, 1)
+    weighted_payoffs = tree.payoffs * tree.deal_prob
+    return np.einsum('dh,idh,jdh->ij', weighted_payoffs, reach_p0, reach_p1)
+
+
+def compute_best_response_batch(tree: GameTree, tensors: np.ndarray,
+                                br_player: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best Response de br_player contre K profils à la fois (vectorisé sur K).
+    
+    Comme compute_best_response_value, le BR choisit une action par INFORMATION SET:
+    la valeur de chaque action est sommée sur toutes les donnes compatibles avec
+    la carte du joueur BR. Les nœuds sont traités des feuilles vers la racine, de
+    sorte que la valeur d'une action inclut les décisions BR ultérieures.
+    
+    Args:
+        tree: Arbre de jeu compilé
+        tensors: Profils de l'adversaire, tenseur (K, I, A)
+        br_player: Joueur qui joue son Best Response
+        
+    Returns:
+        (valeurs, profils_br):
+        - valeurs (K,): valeur du jeu du point de vue du joueur 0
+        - profils_br (K, I, A): profils où br_player joue son BR (stratégie pure)
+          et l'adversaire conserve sa stratégie
+    """
+    num_profiles = tensors.shape[0]
+    sign = 1.0 if br_player == 0 else -1.0
+    
+    # Valeurs contrefactuelles aux feuilles: gain BR x reach adverse x probabilité de la donne
+    opponent_reach = tree.reach(tensors, 1 - br_player)
+    values = sign * tree.payoffs[None, :, :] * opponent_reach * tree.deal_prob
+    
+    br_tensors = np.array(tensors, dtype=np.float64, copy=True)
+    br_cards = tree.deal_cards[:, br_player]
+    
+    # Parcours des feuilles vers la racine (les historiques sont en largeur d'abord)
+    for h in range(tree.num_histories - 1, -1, -1):
+        if tree.is_terminal[h]:
+            continue
+        history = tree.histories[h]
+        children = [tree.history_index[history + c] for c in 'pb'[:tree.num_actions]]
+        child_values = values[:, :, children]  # (K, D, A)
+        
+        if tree.player[h] != br_player:
+            # La reach adverse est déjà intégrée aux feuilles
+            values[:, :, h] = child_values.sum(axis=2)
+            continue
+        
+        for card in np.unique(br_cards):
+            deals = np.nonzero(br_cards == card)[0]
+            action_values = child_values[:, deals, :].sum(axis=1)  # (K, A)
+            best_actions = np.argmax(action_values, axis=1)
+            values[:, deals, h] = np.take_along_axis(
+                child_values[:, deals, :], best_actions[:, None, None], axis=2)[:, :, 0]
+            
+            infoset = tree.node_infoset[deals[0], h]
+            br_tensors[:, infoset, :] = 0.0
+            br_tensors[np.arange(num_profiles), infoset, best_actions] = 1.0
+    
+    root_values = values[:, :, tree.history_index[""]].sum(axis=1)
+    return sign * root_values, br_tensors
+
+
+def compute_exploitability_batch(tree: GameTree, tensors: np.ndarray) -> np.ndarray:
+    """
+    Exploitabilité de K profils à la fois, même convention que compute_exploitability.
+    
+    Returns:
+        Tableau (K,) d'exploitabilités en milli-big-blinds (mbb)
+    """
+    br_value_p0, _ = compute_best_response_batch(tree, tensors, 0)
+    br_value_p1, _ = compute_best_response_batch(tree, tensors, 1)
+    return (br_value_p0 - br_value_p1) / 2 * 1000
+
+
+def compute_counterfactual_values(tree: GameTree, tensors: np.ndarray, player: int,
+                                  terminals: np.ndarray = None) -> np.ndarray:
+    """
+    Valeurs contrefactuelles de chaque action à chaque information set de player.
+    
+    v(I, a) = somme sur les feuilles z passant par (I, a) de
+              gain(z) x reach adverse x probabilité de la donne x reach propre après (I, a)
+    
+    Args:
+        tree: Arbre de jeu compilé
+        tensors: Profils de stratégie, tenseur (K, I, A)
+        player: Joueur dont on calcule les valeurs
+        terminals: Indices des feuilles à sommer (None = toutes). Restreindre aux
+                   feuilles d'un sous-jeu donne les valeurs exactes de ses information sets.
+        
+    Returns:
+        Tenseur (K, I, A); nul pour les information sets de l'adversaire
+    """
+    num_profiles = tensors.shape[0]
+    sign = 1.0 if player == 0 else -1.0
+    if terminals is None:
+        terminals = np.nonzero(tree.is_terminal)[0]
+    
+    opponent_reach = tree.reach(tensors, 1 - player)[:, :, terminals]
+    leaf_values = sign * tree.payoffs[None, :, terminals] * opponent_reach * tree.deal_prob
+    
+    # Probabilités propres le long du chemin, puis produit des étapes suivantes
+    path_infosets = tree.path_infosets[player][:, terminals, :]  # (D, Z, L)
+    path_actions = np.broadcast_to(tree.path_actions[player][terminals, :], path_infosets.shape)
+    padded = np.concatenate([tensors, np.ones((num_profiles, 1, tree.num_actions))], axis=1)
+    steps = padded[:, path_infosets, path_actions]  # (K, D, Z, L)
+    suffix = np.ones_like(steps)
+    for step in range(tree.path_length - 2, -1, -1):
+        suffix[..., step] = suffix[..., step + 1] * steps[..., step + 1]
+    
+    contributions = leaf_values[..., None] * suffix
+    profile_index = np.broadcast_to(np.arange(num_profiles)[:, None, None, None], steps.shape)
+    values = np.zeros((num_profiles, tree.num_infosets + 1, tree.num_actions))
+    np.add.at(values, (profile_index, np.broadcast_to(path_infosets, steps.shape),
+                       np.broadcast_to(path_actions, steps.shape)), contributions)
+    return values[:, :-1, :]
@@ -4,76 +4,187 @@ Algorithme d'apprentissage pour les jeux à information imparfaite
 """
 
 import numpy as np
-from typing import Dict, List
-from collections import defaultdict
+from typing import Callable, Dict, List, Optional
 import random
+import sys
+import time
 from kuhn_poker import KuhnPoker
-from cfr_academic import compute_best_response_value, compute_exploitability, verify_nash_value
+from cfr_academic import compute_best_response_value, compute_exploitability_batch, verify_nash_value
+from game_tree import GameTree
 
 
-class InformationSet:
+def log_spaced_checkpoints(max_iterations: int, num_checkpoints: int,
+                           min_iterations: int = 100) -> List[int]:
     """
-    Représente un information set dans le jeu
-    Contient les regrets cumulés et la stratégie pour chaque action possible
+    Checkpoints espacés logarithmiquement entre min_iterations et max_iterations
+    
+    Returns:
+        Liste croissante d'itérations (sans doublons), terminée par max_iterations
+    """
+    min_iterations = max(1, min(min_iterations, max_iterations))
+    points = np.geomspace(min_iterations, max_iterations, num_checkpoints)
+    schedule = sorted(set(int(round(p)) for p in points))
+    if schedule[-1] != max_iterations:
+        schedule.append(max_iterations)
+    return schedule
+
+
+# Modes de stockage disponibles pour les regrets
+PRECISIONS = ('float64', 'float32', 'quantized')
+
+# Arrondi unitaire du float64, type dans lequel chaque mise à jour est calculée
+_UNIT_ROUNDOFF = float(np.finfo(np.float64).eps) / 2
+
+
+class RegretTable:
     """
+    Regrets et stratégies cumulés de tous les information sets
+    
+    Stockage en colonnes: deux tableaux contigus (I, A) indexés par l'identifiant
+    entier de l'information set (ordre de première visite), de type choisi une
+    fois pour toutes selon la précision:
+    - 'float64': regrets et stratégies cumulés en float64
+    - 'float32': regrets et stratégies cumulés en float32
+    - 'quantized': regrets en virgule fixe int32 (regret = compteur x step,
+      saturé hors de la plage int32), stratégies cumulées en float32
     
-    def __init__(self, num_actions: int = 2):
+    Chaque mise à jour est calculée en float64 puis arrondie une seule fois au
+    type de stockage. Le plus grand |regret cumulé| rencontré pendant
+    l'entraînement est conservé pour borner l'erreur d'accumulation.
+    """
+    
+    def __init__(self, num_actions: int = 2, precision: str = 'float64',
+                 capacity: int = 16, step: float = 2.0 ** -12):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Précision inconnue: {precision} (choix: {', '.join(PRECISIONS)})")
         self.num_actions = num_actions
-        # Regret cumulé pour chaque action
-        self.regret_sum = np.zeros(num_actions, dtype=np.float64)
-        # Somme des stratégies sur toutes les itérations (pour calculer la stratégie moyenne)
-        self.strategy_sum = np.zeros(num_actions, dtype=np.float64)
-        # Stratégie actuelle
-        self.strategy = np.zeros(num_actions, dtype=np.float64)
+        self.precision = precision
+        self.step = step
+        regret_dtype = {'float64': np.float64, 'float32': np.float32, 'quantized': np.int32}[precision]
+        strategy_dtype = np.float64 if precision == 'float64' else np.float32
+        # Identifiant de chaque clé d'information set, et clés par identifiant
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.regret_sum = np.zeros((capacity, num_actions), dtype=regret_dtype)
+        self.strategy_sum = np.zeros((capacity, num_actions), dtype=strategy_dtype)
+        # Plus grand |regret cumulé| observé (avant arrondi au type de stockage)
+        self.regret_peak = 0.0
+        if precision == 'quantized':
+            self.add_regret = self._add_quantized_regret
+            # Au-delà, les compteurs int32 saturent
+            self._regret_limit = step * np.iinfo(np.int32).max
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.ids
     
-    def get_strategy(self, realization_weight: float = 1.0) -> np.ndarray:
+    def index(self, key: str) -> int:
+        """Identifiant de l'information set (ligne ajoutée à la première visite)"""
+        try:
+            return self.ids[key]
+        except KeyError:
+            infoset = len(self.keys)
+            if infoset == len(self.regret_sum):
+                # Capacité doublée: coût amorti constant par information set
+                self.regret_sum = np.concatenate([self.regret_sum, np.zeros_like(self.regret_sum)])
+                self.strategy_sum = np.concatenate([self.strategy_sum, np.zeros_like(self.strategy_sum)])
+            self.ids[key] = infoset
+            self.keys.append(key)
+            return infoset
+    
+    def get_strategy(self, infoset: int, realization_weight: float = 1.0) -> List[float]:
         """
-        Calcule la stratégie actuelle basée sur les regrets
-        Utilise Regret Matching: actions avec regret positif obtiennent plus de probabilité
+        Stratégie actuelle par Regret Matching (probabilités proportionnelles aux
+        regrets positifs, uniforme sinon), accumulée dans strategy_sum
+        
+        Les lignes ne font que quelques actions: elles sont traitées en flottants
+        Python, plus rapides ici que des appels numpy sur de très petits tableaux.
         
-        Args:
-            realization_weight: Poids de réalisation pour mettre à jour strategy_sum
-            
         Returns:
             Distribution de probabilité sur les actions
         """
-        normalizing_sum = 0
-        
-        for a in range(self.num_actions):
-            # Regret Matching: prendre max(0, regret)
-            self.strategy[a] = max(0, self.regret_sum[a])
-            normalizing_sum += self.strategy[a]
-        
-        # Normaliser pour obtenir une distribution de probabilité
+        # Les compteurs quantifiés ont le signe et les proportions des regrets
+        positive = [r if r > 0 else 0.0 for r in self.regret_sum[infoset].tolist()]
+        normalizing_sum = sum(positive)
         if normalizing_sum > 0:
-            self.strategy = self.strategy / normalizing_sum
+            strategy = [r / normalizing_sum for r in positive]
         else:
-            # Stratégie uniforme si tous les regrets sont négatifs
-            self.strategy = np.ones(self.num_actions) / self.num_actions
-        
-        # Accumuler la stratégie pour calculer la stratégie moyenne finale
-        self.strategy_sum += realization_weight * self.strategy
-        
-        return self.strategy
+            strategy = [1.0 / self.num_actions] * self.num_actions
+        self.strategy_sum[infoset] = [total + realization_weight * p for total, p in
+                                      zip(self.strategy_sum[infoset].tolist(), strategy)]
+        return strategy
+    
+    def add_regret(self, infoset: int, regrets: np.ndarray):
+        """Ajoute des regrets au regret cumulé de l'information set"""
+        updated = [total + r for total, r in zip(self.regret_sum[infoset].tolist(), regrets.tolist())]
+        peak = max(map(abs, updated))
+        if peak > self.regret_peak:
+            self.regret_peak = peak
+        self.regret_sum[infoset] = updated
+    
+    def _add_quantized_regret(self, infoset: int, regrets: np.ndarray):
+        step = self.step
+        updated = [count * step + r for count, r in zip(self.regret_sum[infoset].tolist(), regrets.tolist())]
+        peak = max(map(abs, updated))
+        if peak > self.regret_peak:
+            self.regret_peak = peak
+        counts = [round(u / step) for u in updated]
+        if peak > self._regret_limit:
+            low, high = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+            counts = [min(max(c, low), high) for c in counts]
+        self.regret_sum[infoset] = counts
+    
+    def regrets(self) -> np.ndarray:
+        """Regrets cumulés (I, A) en float64"""
+        regrets = self.regret_sum[:len(self)].astype(np.float64)
+        return regrets * self.step if self.precision == 'quantized' else regrets
     
-    def get_average_strategy(self) -> np.ndarray:
+    def average_strategies(self) -> np.ndarray:
+        """Stratégies moyennes (I, A); uniforme pour un information set jamais atteint"""
+        sums = self.strategy_sum[:len(self)].astype(np.float64)
+        totals = sums.sum(axis=1, keepdims=True)
+        return np.where(totals > 0, sums / np.where(totals > 0, totals, 1.0), 1.0 / self.num_actions)
+    
+    def nbytes(self) -> int:
+        """Mémoire occupée: tableaux alloués, index des clés et clés (octets)"""
+        return (self.regret_sum.nbytes + self.strategy_sum.nbytes + sys.getsizeof(self.ids)
+                + sys.getsizeof(self.keys) + sum(sys.getsizeof(key) for key in self.keys))
+    
+    def error_bounds(self, num_updates: int) -> Dict[str, float]:
         """
-        Retourne la stratégie moyenne sur toutes les itérations
-        C'est cette stratégie qui converge vers l'équilibre de Nash
+        Bornes de l'erreur absolue due au stockage, par rapport à une accumulation
+        exacte des mêmes incréments, après au plus num_updates mises à jour par
+        information set
+        
+        Une mise à jour arrondit la somme exacte x une fois en float64 (erreur
+        <= u64 |x|) puis une fois au type de stockage (<= u |x| en virgule
+        flottante, <= step/2 en virgule fixe). Avec M le plus grand |x| rencontré:
+        - regrets: M = regret_peak, plus grand |regret cumulé| de l'entraînement
+        - stratégies cumulées: les incréments sont positifs, M = max(strategy_sum)
         
         Returns:
-            Distribution de probabilité moyenne sur les actions
+            Dictionnaire avec 'regret' et 'strategy_sum' (inf si un regret a saturé)
         """
-        avg_strategy = np.zeros(self.num_actions, dtype=np.float64)
-        normalizing_sum = np.sum(self.strategy_sum)
-        
-        if normalizing_sum > 0:
-            avg_strategy = self.strategy_sum / normalizing_sum
+        peak_strategy = float(self.strategy_sum.max(initial=0.0))
+        # u64 |x| / (1 - u64) <= 2 u64 |x|: |x| est majoré à partir de la somme arrondie
+        compute = 2 * _UNIT_ROUNDOFF
+        strategy_store = 0.0 if self.precision == 'float64' else float(np.finfo(np.float32).eps) / 2
+        
+        if self.precision == 'quantized':
+            if self.regret_peak > self._regret_limit:
+                regret_bound = float('inf')
+            else:
+                regret_bound = num_updates * (self.step / 2 + compute * self.regret_peak)
         else:
-            # Stratégie uniforme par défaut
-            avg_strategy = np.ones(self.num_actions) / self.num_actions
+            regret_store = 0.0 if self.precision == 'float64' else float(np.finfo(np.float32).eps) / 2
+            regret_bound = num_updates * (regret_store + compute) * self.regret_peak
         
-        return avg_strategy
+        return {
+            'regret': regret_bound,
+            'strategy_sum': num_updates * (strategy_store + compute) * peak_strategy,
+        }
 
 
 class CFRTrainer:
@@ -81,16 +192,56 @@ class CFRTrainer:
     Entraîneur utilisant l'algorithme CFR (Counterfactual Regret Minimization)
     """
     
-    def __init__(self):
-        self.game = KuhnPoker()
-        # Dictionnaire des information sets
-        self.infosets: Dict[str, InformationSet] = defaultdict(
-            lambda: InformationSet(num_actions=self.game.NUM_ACTIONS)
-        )
+    def __init__(self, game: KuhnPoker = None, precision: str = 'float64'):
+        """
+        Args:
+            game: Jeu à résoudre (KuhnPoker par défaut)
+            precision: Stockage des regrets: 'float64', 'float32' ou 'quantized'
+        """
+        self.game = game if game is not None else KuhnPoker()
+        self.precision = precision
+        # Regrets et stratégies cumulés de tous les information sets
+        self.infosets = RegretTable(self.game.NUM_ACTIONS, precision)
         self.iterations = 0
+        self._tree: Optional[GameTree] = None
+    
+    def exploitability(self) -> float:
+        """
+        Exploitabilité de la stratégie moyenne en mbb, calculée sur l'arbre compilé
+        (même métrique que batch.py, sweep.py et les autres moteurs)
+        """
+        if self._tree is None:
+            self._tree = GameTree(self.game)
+        tensor = self._tree.profile_to_tensor(self.get_strategy_profile())
+        return float(compute_exploitability_batch(self._tree, tensor[None])[0])
+    
+    def memory_report(self) -> Dict:
+        """
+        Empreinte mémoire du stockage des information sets
+        
+        Returns:
+            Dictionnaire avec 'num_infosets', 'bytes_per_infoset' (tableaux alloués,
+            index et clés), 'array_bytes_per_infoset' (regrets et stratégies
+            cumulés seuls), 'total_bytes', 'regret_error_bound' et
+            'strategy_sum_error_bound' (bornes des erreurs absolues d'accumulation)
+        """
+        table = self.infosets
+        num_infosets = len(table)
+        total = table.nbytes()
+        # Chaque information set est mis à jour au plus une fois par itération
+        bounds = table.error_bounds(self.iterations)
+        return {
+            'num_infosets': num_infosets,
+            'bytes_per_infoset': total / num_infosets if num_infosets else 0,
+            'array_bytes_per_infoset': (table.regret_sum.itemsize + table.strategy_sum.itemsize)
+                                       * table.num_actions,
+            'total_bytes': total,
+            'regret_error_bound': bounds['regret'],
+            'strategy_sum_error_bound': bounds['strategy_sum'],
+        }
     
     def train(self, iterations: int, track_convergence: bool = False, 
-              checkpoint_interval: int = 1000) -> Dict[str, InformationSet]:
+              checkpoint_interval: int = 1000, verbose: bool = True) -> RegretTable:
         """
         Entraîne l'agent en jouant contre lui-même pendant un nombre d'itérations
         
@@ -98,9 +249,10 @@ class CFRTrainer:
             iterations: Nombre d'itérations d'entraînement
             track_convergence: Si True, track l'exploitabilité pendant l'entraînement
             checkpoint_interval: Intervalle pour calculer l'exploitabilité
+            verbose: Si True, affiche l'utilité moyenne en fin d'entraînement
             
         Returns:
-            Dictionnaire des information sets avec leurs stratégies
+            Table des information sets (regrets et stratégies cumulés)
         """
         util = 0
         self.exploitability_history = [] if track_convergence else None
@@ -108,7 +260,7 @@ class CFRTrainer:
         
         for i in range(iterations):
             # Mélanger et distribuer les cartes
-            cards = [0, 1, 2]
+            cards = list(self.game.cards)
             random.shuffle(cards)
             
             # Cartes des joueurs (la 3ème carte reste cachée)
@@ -121,15 +273,90 @@ class CFRTrainer:
             
             # Tracking de convergence (comme Libratus/Pluribus)
             if track_convergence and (i + 1) % checkpoint_interval == 0:
-                strategy_profile = self.get_strategy_profile()
-                exploitability = compute_exploitability(self.game, strategy_profile)
+                exploitability = self.exploitability()
                 self.exploitability_history.append(exploitability)
                 self.iteration_checkpoints.append(i + 1)
         
-        print(f"Utilité moyenne du joueur 0: {util / iterations:.4f}")
+        if verbose:
+            print(f"Utilité moyenne du joueur 0: {util / iterations:.4f}")
         
         return self.infosets
     
+    def train_until(self, max_iterations: int, target_exploitability_mbb: Optional[float] = None,
+                    max_wall_seconds: Optional[float] = None, checkpoints: int = 20,
+                    spacing: str = 'log', min_iterations: int = 100,
+                    on_checkpoint: Optional[Callable] = None) -> Dict:
+        """
+        Entraîne jusqu'à atteindre une exploitabilité cible, un budget de temps
+        ou le nombre maximal d'itérations (premier critère atteint)
+        
+        L'exploitabilité décroît environ en 1/√T: des checkpoints équidistants
+        tombent presque tous dans la queue plate de la courbe. Les checkpoints
+        sont donc espacés logarithmiquement ('log'), ou placés en extrapolant
+        la loi en 1/√T vers la cible ('adaptive').
+        
+        Args:
+            max_iterations: Nombre maximal d'itérations
+            target_exploitability_mbb: Arrêt dès que l'exploitabilité passe sous ce seuil
+            max_wall_seconds: Arrêt dès que ce temps d'entraînement est dépassé
+            checkpoints: Nombre de checkpoints (spacing 'log' ou 'linear')
+            spacing: 'log', 'linear' ou 'adaptive'
+            min_iterations: Premier checkpoint
+            on_checkpoint: Callback appelé à chaque checkpoint avec
+                           (trainer, iterations, exploitabilité en mbb)
+            
+        Returns:
+            Dictionnaire avec 'iterations', 'exploitabilities', 'elapsed',
+            'stop_reason' ('target', 'time' ou 'max_iterations')
+        """
+        if spacing == 'log':
+            schedule = log_spaced_checkpoints(max_iterations, checkpoints, min_iterations)
+        elif spacing == 'linear':
+            step = max(1, max_iterations // checkpoints)
+            schedule = list(range(step, max_iterations + 1, step))
+            if schedule[-1] != max_iterations:
+                schedule.append(max_iterations)
+        elif spacing == 'adaptive':
+            schedule = [min(min_iterations, max_iterations)]
+        else:
+            raise ValueError(f"Espacement inconnu: {spacing}")
+        
+        history = {'iterations': [], 'exploitabilities': [], 'elapsed': [], 'stop_reason': 'max_iterations'}
+        start_time = time.time()
+        done = 0
+        
+        while schedule:
+            next_checkpoint = schedule.pop(0)
+            self.train(next_checkpoint - done, verbose=False)
+            done = next_checkpoint
+            
+            exploitability = self.exploitability()
+            elapsed = time.time() - start_time
+            history['iterations'].append(done)
+            history['exploitabilities'].append(exploitability)
+            history['elapsed'].append(elapsed)
+            
+            if on_checkpoint is not None:
+                on_checkpoint(self, done, exploitability)
+            
+            if target_exploitability_mbb is not None and exploitability <= target_exploitability_mbb:
+                history['stop_reason'] = 'target'
+                break
+            if max_wall_seconds is not None and elapsed >= max_wall_seconds:
+                history['stop_reason'] = 'time'
+                break
+            
+            if spacing == 'adaptive' and done < max_iterations:
+                # Extrapolation e(T) ~ c/√T: T_cible = T * (e / cible)², borné à [x1.2, x4]
+                if target_exploitability_mbb is not None and exploitability > 0:
+                    predicted = done * (exploitability / target_exploitability_mbb) ** 2
+                else:
+                    predicted = done * 2
+                predicted = int(min(max(predicted, done * 1.2, done + 1), done * 4))
+                schedule.append(min(predicted, max_iterations))
+        
+        return history
+    
     def cfr(self, cards: List[int], history: str, p0: float, p1: float) -> float:
         """
         Algorithme CFR récursif
@@ -147,19 +374,21 @@ class CFRTrainer:
         player = plays % 2
         opponent = 1 - player
         
-        # État terminal
+        # État terminal: get_payoff donne le gain du joueur 0, la récursion
+        # attend l'utilité du joueur dont c'est le tour
         if self.game.is_terminal(history):
-            return self.game.get_payoff(history, cards)
+            payoff = self.game.get_payoff(history, cards)
+            return payoff if player == 0 else -payoff
         
         # Obtenir l'information set
         infoset_key = self.game.get_information_set(cards[player], history)
-        infoset = self.infosets[infoset_key]
+        infoset = self.infosets.index(infoset_key)
         
         # Obtenir la stratégie actuelle
         if player == 0:
-            strategy = infoset.get_strategy(p0)
+            strategy = self.infosets.get_strategy(infoset, p0)
         else:
-            strategy = infoset.get_strategy(p1)
+            strategy = self.infosets.get_strategy(infoset, p1)
         
         # Calculer les utilités pour chaque action
         action_utils = np.zeros(self.game.NUM_ACTIONS)
@@ -183,9 +412,9 @@ class CFRTrainer:
         regrets = action_utils - node_util
         
         if player == 0:
-            infoset.regret_sum += p1 * regrets
+            self.infosets.add_regret(infoset, p1 * regrets)
         else:
-            infoset.regret_sum += p0 * regrets
+            self.infosets.add_regret(infoset, p0 * regrets)
         
         return node_util
     
@@ -196,12 +425,7 @@ class CFRTrainer:
         Returns:
             Dictionnaire {infoset_key: stratégie_moyenne}
         """
-        strategy_profile = {}
-        
-        for infoset_key, infoset in self.infosets.items():
-            strategy_profile[infoset_key] = infoset.get_average_strategy()
-        
-        return strategy_profile
+        return dict(zip(self.infosets.keys, self.infosets.average_strategies()))
     
     def evaluate_strategy(self, cards: List[int], history: str, strategy_profile: Dict[str, np.ndarray]) -> float:
         """
@@ -244,18 +468,18 @@ class CFRTrainer:
         strategy_profile = self.get_strategy_profile()
         
         # Organiser par carte
-        for card in range(3):
+        for card in self.game.cards:
             card_name = self.game.get_card_name(card)
             print(f"\n{card_name}:")
             print("-" * 40)
             
             # Trier les information sets par historique
             relevant_infosets = {k: v for k, v in strategy_profile.items() 
-                                if k.startswith(str(card))}
+                                if k.rstrip('pb') == str(card)}
             
             for infoset_key in sorted(relevant_infosets.keys(), key=lambda x: (len(x), x)):
                 strategy = relevant_infosets[infoset_key]
-                history = infoset_key[1:]  # Enlever la carte
+                history = infoset_key[len(str(card)):]  # Enlever la carte
                 
                 if history == "":
                     history = "début"
@@ -0,0 +1,348 @@
+"""
+Serveur de jeu local multi-tables (asyncio) pour jouer contre l'IA
+Chaque table applique les règles de KuhnPoker; le siège du bot est servi par la
+table de stratégies entraînée. Les décisions du bot sont regroupées par tick:
+toutes les tables en attente d'une action du bot sont traitées en un seul
+tirage vectorisé, ce qui permet d'héberger des milliers de tables par processus.
+
+Protocole: une ligne JSON par message sur une socket TCP locale
+    client -> serveur: {"type": "join"}
+                       {"type": "action", "table": 3, "action": "p" | "b"}
+                       {"type": "leave", "table": 3}
+    serveur -> client: {"type": "joined", "table": 3}
+                       {"type": "deal", "table": 3, "card": 1, "position": 0}
+                       {"type": "turn", "table": 3, "history": "pb"}
+                       {"type": "bot_action", "table": 3, "action": "b"}
+                       {"type": "result", "table": 3, "history": "pbb",
+                        "bot_card": 2, "payoff": -0.4}
+                       {"type": "error", "message": "..."}
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from cfr_algorithm import CFRTrainer
+from game_tree import ACTION_CHARS, GameTree
+from kuhn_poker import KuhnPoker
+from strategy_snapshots import SnapshotReader
+
+HUMAN_ACTIONS = tuple(ACTION_CHARS)  # ('p', 'b')
+
+
+class Table:
+    """Une table de Kuhn Poker: un humain (ou client scripté) contre le bot"""
+
+    def __init__(self, table_id: int, writer: asyncio.StreamWriter, game: KuhnPoker):
+        self.table_id = table_id
+        self.writer = writer
+        self.game = game
+        self.hands_played = 0
+        self.human_pos = 0
+        self.cards: List[int] = []
+        self.history = ""
+
+    def new_hand(self):
+        """Distribue une nouvelle main; les positions alternent d'une main à l'autre"""
+        cards = list(self.game.cards)
+        random.shuffle(cards)
+        self.cards = cards[:2]
+        self.human_pos = self.hands_played % 2
+        self.history = ""
+
+    @property
+    def human_card(self) -> int:
+        return self.cards[self.human_pos]
+
+    @property
+    def bot_card(self) -> int:
+        return self.cards[1 - self.human_pos]
+
+    def current_player(self) -> int:
+        return len(self.history) % 2
+
+    def is_bot_turn(self) -> bool:
+        return not self.game.is_terminal(self.history) and self.current_player() != self.human_pos
+
+    def human_payoff(self) -> float:
+        payoff = self.game.get_payoff(self.history, self.cards)
+        return payoff if self.human_pos == 0 else -payoff
+
+
+class GameServer:
+    """
+    Serveur asyncio hébergeant de nombreuses tables simultanées
+
+    Args:
+        strategy_profile: Profil {infoset_key: stratégie} utilisé par le bot
+        tick_seconds: Période du regroupement des décisions du bot (borne la latence)
+        game: Jeu (KuhnPoker par défaut)
+        snapshot_reader: Si fourni, chaque tick bascule sur le snapshot de stratégie
+                         le plus récent publié par un entraînement en cours
+    """
+
+    def __init__(self, strategy_profile: Dict[str, np.ndarray], tick_seconds: float = 0.002,
+                 game: KuhnPoker = None, snapshot_reader: Optional[SnapshotReader] = None):
+        self.game = game if game is not None else KuhnPoker()
+        self.tree = GameTree(self.game)
+        self.strategy_table = self.tree.profile_to_tensor(strategy_profile)
+        self.snapshot_reader = snapshot_reader
+        self.snapshot_version = None
+        self.deal_index = {deal: d for d, deal in enumerate(self.tree.deals)}
+        self.tick_seconds = tick_seconds
+        self.tables: Dict[int, Table] = {}
+        self.pending_bot: List[Table] = []
+        self.next_table_id = 0
+        self.rng = np.random.default_rng()
+        self.stats = {'bot_decisions': 0, 'ticks': 0, 'max_batch': 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tick_task: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        """Démarre l'écoute et la boucle de ticks du bot"""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        self._tick_task = asyncio.create_task(self._tick_loop())
+        return self._server
+
+    async def stop(self):
+        """Arrête le serveur et la boucle de ticks"""
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, message: dict):
+        if not writer.is_closing():
+            writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Lit les messages d'un client jusqu'à la déconnexion"""
+        owned_tables = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    self._send(writer, {'type': 'error', 'message': "JSON invalide"})
+                    continue
+                if not isinstance(message, dict):
+                    self._send(writer, {'type': 'error', 'message': "Message invalide (objet JSON attendu)"})
+                    continue
+
+                kind = message.get('type')
+                if kind == 'join':
+                    table = self._open_table(writer)
+                    owned_tables.add(table.table_id)
+                elif kind == 'action':
+                    self._handle_human_action(message, owned_tables, writer)
+                elif kind == 'leave':
+                    table_id = message.get('table')
+                    if isinstance(table_id, int) and table_id in owned_tables:
+                        owned_tables.discard(table_id)
+                        self.tables.pop(table_id, None)
+                else:
+                    self._send(writer, {'type': 'error', 'message': f"Type inconnu: {kind}"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for table_id in owned_tables:
+                self.tables.pop(table_id, None)
+            writer.close()
+
+    def _open_table(self, writer: asyncio.StreamWriter) -> Table:
+        table = Table(self.next_table_id, writer, self.game)
+        self.next_table_id += 1
+        self.tables[table.table_id] = table
+        self._send(writer, {'type': 'joined', 'table': table.table_id})
+        self._start_hand(table)
+        return table
+
+    def _start_hand(self, table: Table):
+        table.new_hand()
+        self._send(table.writer, {'type': 'deal', 'table': table.table_id,
+                                  'card': table.human_card, 'position': table.human_pos})
+        self._advance(table)
+
+    def _advance(self, table: Table):
+        """Passe la main au bon acteur après chaque action"""
+        if self.game.is_terminal(table.history):
+            self._send(table.writer, {'type': 'result', 'table': table.table_id,
+                                      'history': table.history, 'bot_card': table.bot_card,
+                                      'payoff': table.human_payoff()})
+            table.hands_played += 1
+            self._start_hand(table)
+        elif table.is_bot_turn():
+            self.pending_bot.append(table)
+        else:
+            self._send(table.writer, {'type': 'turn', 'table': table.table_id,
+                                      'history': table.history})
+
+    def _handle_human_action(self, message: dict, owned_tables: set, writer: asyncio.StreamWriter):
+        table_id = message.get('table')
+        table = self.tables.get(table_id) if isinstance(table_id, int) else None
+        action = message.get('action')
+        if table is None or table.table_id not in owned_tables:
+            self._send(writer, {'type': 'error', 'message': "Table inconnue"})
+        # Une seule action par message : comparaison à un tuple, pas sous-chaîne de 'pb'
+        elif (not isinstance(action, str) or action not in HUMAN_ACTIONS
+              or table.is_bot_turn() or self.game.is_terminal(table.history)):
+            self._send(writer, {'type': 'error', 'table': table.table_id,
+                                'message': "Action invalide"})
+        else:
+            table.history += action
+            self._advance(table)
+
+    def decide_batch(self, tables: List[Table]) -> np.ndarray:
+        """
+        Tire les actions du bot pour un lot de tables en une seule opération
+
+        Returns:
+            Tableau (N,) d'actions (0=Pass, 1=Bet)
+        """
+        histories = [self.tree.history_index[t.history] for t in tables]
+        deals = [self.deal_index[tuple(t.cards)] for t in tables]
+        infosets = self.tree.node_infoset[deals, histories]
+        strategies = self.strategy_table[infosets]
+        cumulative = np.cumsum(strategies, axis=1)
+        draws = self.rng.random(len(tables)) * cumulative[:, -1]
+        return (draws[:, None] >= cumulative).sum(axis=1)
+
+    def process_pending(self):
+        """Traite en un lot toutes les décisions du bot en attente"""
+        batch, self.pending_bot = self.pending_bot, []
+        batch = [t for t in batch if self.tables.get(t.table_id) is t and t.is_bot_turn()]
+        if not batch:
+            return
+
+        if self.snapshot_reader is None:
+            actions = self.decide_batch(batch)
+        else:
+            # Bascule sans copie sur le snapshot actif; on recommence s'il a été réécrit
+            while True:
+                self.snapshot_version, self.strategy_table = self.snapshot_reader.current()
+                actions = self.decide_batch(batch)
+                if self.snapshot_reader.is_valid(self.snapshot_version):
+                    break
+        self.stats['bot_decisions'] += len(batch)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+
+        for table, action in zip(batch, actions):
+            action_char = ACTION_CHARS[action]
+            table.history += action_char
+            self._send(table.writer, {'type': 'bot_action', 'table': table.table_id,
+                                      'action': action_char})
+            self._advance(table)
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            self.stats['ticks'] += 1
+            self.process_pending()
+
+
+async def run_scripted_clients(host: str, port: int, num_tables: int = 100,
+                               hands_per_table: int = 10, connections: int = 10) -> Dict:
+    """
+    Clients scriptés (actions aléatoires) pour tester la charge du serveur
+
+    Returns:
+        Dictionnaire avec le nombre de mains jouées, le gain moyen et la
+        latence (ms) entre une action humaine et la réponse suivante
+    """
+    latencies: List[float] = []
+    payoffs: List[float] = []
+
+    async def client(num_client_tables: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        hands_left = {}
+        sent_at = {}
+        for _ in range(num_client_tables):
+            writer.write(b'{"type": "join"}\n')
+        await writer.drain()
+
+        while len(hands_left) < num_client_tables or any(n > 0 for n in hands_left.values()):
+            message = json.loads(await reader.readline())
+            table_id = message.get('table')
+            if message['type'] == 'joined':
+                hands_left[table_id] = hands_per_table
+                continue
+            if table_id in sent_at:
+                latencies.append((time.perf_counter() - sent_at.pop(table_id)) * 1000)
+            if message['type'] == 'result' and hands_left.get(table_id, 0) > 0:
+                payoffs.append(message['payoff'])
+                hands_left[table_id] -= 1
+                if hands_left[table_id] == 0:
+                    writer.write((json.dumps({'type': 'leave', 'table': table_id}) + "\n").encode())
+            elif message['type'] == 'turn' and hands_left.get(table_id, 0) > 0:
+                action = random.choice(ACTION_CHARS)
+                sent_at[table_id] = time.perf_counter()
+                writer.write((json.dumps({'type': 'action', 'table': table_id,
+                                          'action': action}) + "\n").encode())
+            await writer.drain()
+        writer.close()
+
+    per_connection = [num_tables // connections + (1 if i < num_tables % connections else 0)
+                      for i in range(connections)]
+    await asyncio.gather(*(client(n) for n in per_connection if n > 0))
+
+    return {
+        'hands': len(payoffs),
+        'mean_payoff': float(np.mean(payoffs)) if payoffs else 0.0,
+        'latency_p50_ms': float(np.percentile(latencies, 50)) if latencies else 0.0,
+        'latency_p99_ms': float(np.percentile(latencies, 99)) if latencies else 0.0,
+    }
+
+
+async def serve(iterations: int, host: str, port: int, tick_ms: float, load_test_tables: int):
+    print(f"Entraînement de l'IA ({iterations:,} itérations)...")
+    trainer = CFRTrainer()
+    trainer.train(iterations)
+
+    server = GameServer(trainer.get_strategy_profile(), tick_seconds=tick_ms / 1000)
+    await server.start(host, port)
+    print(f"✓ Serveur prêt sur {host}:{port} (tick = {tick_ms} ms)")
+
+    if load_test_tables > 0:
+        start_time = time.time()
+        report = await run_scripted_clients(host, port, num_tables=load_test_tables)
+        elapsed = time.time() - start_time
+        print(f"\nTest de charge: {load_test_tables} tables, {report['hands']:,} mains "
+              f"en {elapsed:.2f}s")
+        print(f"  Latence p50: {report['latency_p50_ms']:.2f} ms  |  "
+              f"p99: {report['latency_p99_ms']:.2f} ms")
+        print(f"  Gain moyen des clients aléatoires: {report['mean_payoff']:+.4f}")
+        print(f"  Plus grand lot de décisions du bot: {server.stats['max_batch']}")
+        await server.stop()
+        return
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Serveur de jeu Kuhn Poker multi-tables")
+    parser.add_argument("--iterations", type=int, default=50000, help="Itérations d'entraînement du bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-ms", type=float, default=2.0, help="Période de regroupement des décisions")
+    parser.add_argument("--load-test", type=int, default=0, metavar="TABLES",
+                        help="Lance des clients scriptés sur ce nombre de tables puis quitte")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.iterations, args.host, args.port, args.tick_ms, args.load_test))
+
+
+if __name__ == "__main__":
+    main()
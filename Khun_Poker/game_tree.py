@@ -0,0 +1,155 @@
+"""
+Arbre de jeu compilé pour Kuhn Poker
+Énumère une seule fois les donnes, les historiques et les information sets,
+et les stocke sous forme de tableaux numpy pour les calculs vectorisés
+(évaluation de populations de stratégies, best response en lot, etc.)
+"""
+
+import numpy as np
+from typing import Dict, List
+from kuhn_poker import KuhnPoker
+
+
+# Caractère associé à chaque action (Pass=0, Bet=1)
+ACTION_CHARS = 'pb'
+
+
+class GameTree:
+    """
+    Représentation tabulaire de l'arbre de jeu
+
+    Notations des tableaux:
+    - D: nombre de donnes (paires ordonnées de cartes distinctes)
+    - H: nombre d'historiques (nœuds de décision + nœuds terminaux)
+    - I: nombre d'information sets
+    - A: nombre d'actions
+    - L: nombre maximal de décisions d'un même joueur sur un chemin
+
+    Un profil de stratégie se représente par un tenseur (I, A), une population
+    de K profils par un tenseur (K, I, A).
+    """
+
+    def __init__(self, game: KuhnPoker = None):
+        self.game = game if game is not None else KuhnPoker()
+        self.num_actions = self.game.NUM_ACTIONS
+
+        # Donnes: toutes les paires ordonnées (carte_j0, carte_j1), équiprobables
+        cards = self.game.cards
+        self.deals = [(c0, c1) for c0 in cards for c1 in cards if c0 != c1]
+        self.deal_cards = np.array(self.deals, dtype=np.int64)
+        self.num_deals = len(self.deals)
+        self.deal_prob = 1.0 / self.num_deals
+
+        # Historiques en largeur d'abord: un parent précède toujours ses enfants
+        self.histories: List[str] = [""]
+        position = 0
+        while position < len(self.histories):
+            history = self.histories[position]
+            position += 1
+            if not self.game.is_terminal(history):
+                for action_char in ACTION_CHARS[:self.num_actions]:
+                    self.histories.append(history + action_char)
+        self.history_index = {h: i for i, h in enumerate(self.histories)}
+        self.num_histories = len(self.histories)
+        self.is_terminal = np.array([self.game.is_terminal(h) for h in self.histories])
+        self.player = np.array([len(h) % 2 for h in self.histories], dtype=np.int64)
+        self.decision_histories = [h for h in self.histories if not self.game.is_terminal(h)]
+        self.terminal_histories = [h for h in self.histories if self.game.is_terminal(h)]
+
+        # Information sets: ordonnés par historique puis par carte
+        self.infoset_keys: List[str] = []
+        self.infoset_player: List[int] = []
+        self.infoset_card: List[int] = []
+        self.infoset_history: List[str] = []
+        for history in self.decision_histories:
+            for card in cards:
+                self.infoset_keys.append(self.game.get_information_set(card, history))
+                self.infoset_player.append(len(history) % 2)
+                self.infoset_card.append(card)
+                self.infoset_history.append(history)
+        self.infoset_index = {key: i for i, key in enumerate(self.infoset_keys)}
+        self.num_infosets = len(self.infoset_keys)
+        self.infoset_player = np.array(self.infoset_player, dtype=np.int64)
+        # Nœud représentatif de chaque infoset (première donne compatible)
+        self.infoset_node_history = np.array([self.history_index[h] for h in self.infoset_history],
+                                             dtype=np.int64)
+        self.infoset_node_deal = np.array(
+            [next(d for d, deal in enumerate(self.deals) if deal[player] == card)
+             for player, card in zip(self.infoset_player, self.infoset_card)], dtype=np.int64)
+
+        # Information set de chaque nœud de décision (-1 pour les nœuds terminaux)
+        self.node_infoset = np.full((self.num_deals, self.num_histories), -1, dtype=np.int64)
+        # Gains du joueur 0 aux nœuds terminaux (0 ailleurs)
+        self.payoffs = np.zeros((self.num_deals, self.num_histories), dtype=np.float64)
+        for d, deal in enumerate(self.deals):
+            for h, history in enumerate(self.histories):
+                if self.is_terminal[h]:
+                    self.payoffs[d, h] = self.game.get_payoff(history, list(deal))
+                else:
+                    key = self.game.get_information_set(deal[len(history) % 2], history)
+                    self.node_infoset[d, h] = self.infoset_index[key]
+
+        # Chemins: décisions (information set, action) de chaque joueur menant à chaque nœud.
+        # Les positions inutilisées pointent vers l'information set fictif d'indice I,
+        # dont la "stratégie" vaut 1 pour toutes les actions.
+        max_length = max(len(h) for h in self.histories)
+        self.path_length = (max_length + 1) // 2
+        self.path_infosets = np.full((2, self.num_deals, self.num_histories, self.path_length),
+                                     self.num_infosets, dtype=np.int64)
+        self.path_actions = np.zeros((2, self.num_histories, self.path_length), dtype=np.int64)
+        for h, history in enumerate(self.histories):
+            for depth, action_char in enumerate(history):
+                player = depth % 2
+                step = depth // 2
+                prefix = self.history_index[history[:depth]]
+                self.path_actions[player, h, step] = ACTION_CHARS.index(action_char)
+                self.path_infosets[player, :, h, step] = self.node_infoset[:, prefix]
+
+    def profile_to_tensor(self, strategy_profile: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Convertit un profil {infoset_key: stratégie} en tenseur (I, A)
+        Les information sets absents du profil reçoivent la stratégie uniforme
+        """
+        tensor = np.full((self.num_infosets, self.num_actions), 1.0 / self.num_actions)
+        for key, strategy in strategy_profile.items():
+            index = self.infoset_index.get(key)
+            if index is not None:
+                tensor[index] = strategy
+        return tensor
+
+    def profiles_to_tensor(self, profiles: List[Dict[str, np.ndarray]]) -> np.ndarray:
+        """Empile K profils en un tenseur (K, I, A)"""
+        return np.stack([self.profile_to_tensor(profile) for profile in profiles])
+
+    def tensor_to_profile(self, tensor: np.ndarray) -> Dict[str, np.ndarray]:
+        """Convertit un tenseur (I, A) en profil {infoset_key: stratégie}"""
+        return {key: np.array(tensor[i]) for i, key in enumerate(self.infoset_keys)}
+
+    def reach(self, tensors: np.ndarray, player: int) -> np.ndarray:
+        """
+        Probabilités de reach propres à un joueur pour chaque nœud
+
+        Args:
+            tensors: Profils de stratégie (K, I, A)
+            player: Joueur dont on multiplie les probabilités d'action
+
+        Returns:
+            Tableau (K, D, H): produit des probabilités d'action du joueur
+            le long du chemin menant à chaque nœud (hors hasard)
+        """
+        num_profiles = tensors.shape[0]
+        padded = np.concatenate([tensors, np.ones((num_profiles, 1, self.num_actions))], axis=1)
+        steps = padded[:, self.path_infosets[player], self.path_actions[player][None, :, :]]
+        return steps.prod(axis=-1)
+
+    def infoset_reach(self, tensors: np.ndarray) -> np.ndarray:
+        """
+        Probabilité de reach propre du joueur qui agit à chaque information set
+        (poids de réalisation utilisé pour moyenner les stratégies)
+
+        Returns:
+            Tableau (K, I)
+        """
+        reach_p0 = self.reach(tensors, 0)[:, self.infoset_node_deal, self.infoset_node_history]
+        reach_p1 = self.reach(tensors, 1)[:, self.infoset_node_deal, self.infoset_node_history]
+        return np.where(self.infoset_player == 0, reach_p0, reach_p1)
@@ -6,7 +6,7 @@ Actions possibles : Pass (0) ou Bet (1)
 """
 
 from enum import IntEnum
-from typing import List, Tuple
+from typing import Dict, List
 
 
 class Action(IntEnum):
@@ -35,54 +35,165 @@ class KuhnPoker:
     
     NUM_ACTIONS = 2
     
-    def __init__(self):
-        self.cards = [0, 1, 2]  # Jack, Queen, King
+    # Tables précalculées (voir cache_info)
+    CACHES = ('is_terminal', 'payoff', 'information_set')
+    
+    def __init__(self, num_cards: int = 3, ante: float = 1.0, bet_size: float = 1.0,
+                 payoff_scale: float = 5.0, precompute: bool = True, count_calls: bool = False):
+        """
+        Args:
+            num_cards: Taille du paquet (3 = Jack, Queen, King)
+            ante: Mise initiale de chaque joueur
+            bet_size: Montant d'un bet
+            payoff_scale: Diviseur des gains (5 = convention académique normalisée)
+            precompute: Si True, terminaux, gains et clés d'information sets de
+                        toutes les histoires sont calculés une fois à la construction
+                        (False = calcul à chaque appel)
+            count_calls: Si True, compte les appels pour cache_info (débogage:
+                         ajoute un surcoût à chaque appel)
+        """
+        self.cards = list(range(num_cards))  # Jack, Queen, King pour 3 cartes
         self.num_players = 2
+        self.ante = ante
+        self.bet_size = bet_size
+        self.payoff_scale = payoff_scale
+        self.precompute = precompute
+        self.histories = self._enumerate_histories()
+        
+        self._misses: Dict[str, int] = {name: 0 for name in self.CACHES}
+        self._calls: Dict[str, int] = {name: 0 for name in self.CACHES}
+        if precompute:
+            self._terminal_table = {h: self.compute_is_terminal(h) for h in self.histories}
+            # Indexées par historique puis carte(s): pas de clé tuple à construire
+            self._payoff_table = {h: [[self.compute_payoff(h, [c0, c1]) for c1 in self.cards]
+                                      for c0 in self.cards]
+                                  for h in self.histories if self._terminal_table[h]}
+            self._infoset_table = {h: [self.compute_information_set(c, h) for c in self.cards]
+                                   for h in self.histories}
+        else:
+            self.is_terminal = self.compute_is_terminal
+            self.get_payoff = self.compute_payoff
+            self.get_information_set = self.compute_information_set
+        if count_calls:
+            for name, method in (('is_terminal', 'is_terminal'), ('payoff', 'get_payoff'),
+                                 ('information_set', 'get_information_set')):
+                setattr(self, method, self._counted(name, getattr(self, method)))
+    
+    def _enumerate_histories(self) -> List[str]:
+        """Toutes les histoires du jeu (nœuds de décision et terminaux)"""
+        histories, frontier = [], [""]
+        while frontier:
+            history = frontier.pop(0)
+            histories.append(history)
+            if not self.compute_is_terminal(history):
+                frontier.extend(history + action for action in "pb")
+        return histories
+    
+    def _counted(self, name: str, function):
+        calls = self._calls
+        
+        def counted(*args):
+            calls[name] += 1
+            return function(*args)
+        return counted
+    
+    def reset_counters(self):
+        """Remet à zéro les compteurs d'appels et de calculs hors table"""
+        for name in self.CACHES:
+            self._calls[name] = self._misses[name] = 0
+    
+    def cache_info(self) -> Dict[str, Dict]:
+        """
+        Statistiques des tables précalculées
+        
+        'hits' et 'hit_rate' ne sont comptés qu'avec count_calls=True; 'misses'
+        compte les appels calculés directement (histoire hors table, ou tous les
+        appels avec precompute=False).
+        
+        Returns:
+            {nom: {'hits', 'misses', 'hit_rate', 'size'}} pour chaque table
+        """
+        sizes = {'is_terminal': len(self._terminal_table),
+                 'payoff': len(self.cards) ** 2 * len(self._payoff_table),
+                 'information_set': len(self.cards) * len(self._infoset_table)} if self.precompute \
+            else dict.fromkeys(self.CACHES, 0)
+        info = {}
+        for name in self.CACHES:
+            calls = self._calls[name]
+            misses = self._misses[name] if self.precompute else calls
+            info[name] = {'hits': calls - misses if calls else 0, 'misses': misses,
+                          'hit_rate': (calls - misses) / calls if calls else 0.0,
+                          'size': sizes[name]}
+        return info
     
     def get_payoff(self, history: str, cards: List[int]) -> float:
+        """
+        Gain du joueur 0 pour une histoire donnée (table précalculée, voir compute_payoff)
+        
+        Args:
+            history: Chaîne représentant l'historique des actions ('pb' = pass puis bet)
+            cards: Liste des cartes des joueurs [carte_j0, carte_j1]
+        """
+        try:
+            return self._payoff_table[history][cards[0]][cards[1]]
+        except (KeyError, IndexError):
+            self._misses['payoff'] += 1
+            return self.compute_payoff(history, cards)
+    
+    def compute_payoff(self, history: str, cards: List[int]) -> float:
         """
         Calcule le gain du joueur 0 pour une histoire donnée
-        Convention académique normalisée pour obtenir game value = -1/18
+        Gains divisés par payoff_scale (game value naturelle de -1/18 → -1/90 par défaut)
         
-        Cette normalisation divise les payoffs par 5 pour correspondre à la convention
-        académique standard de la littérature (Kuhn 1950, et études modernes).
+        Cette normalisation divise les payoffs par 5 (payoff_scale); la valeur de
+        l'équilibre, -1/18 en gains naturels (Kuhn 1950), est divisée d'autant.
         
         Args:
             history: Chaîne représentant l'historique des actions ('pb' = pass puis bet)
             cards: Liste des cartes des joueurs [carte_j0, carte_j1]
             
         Returns:
-            Gain du joueur 0 normalisé (convention académique)
-            Payoffs = payoffs naturels / 5 → game value = -1/18
+            Gain du joueur 0 normalisé
+            Payoffs = payoffs naturels / 5 → game value = -1/90
         """
         plays = len(history)
+        small_pot = self.ante / self.payoff_scale
+        big_pot = (self.ante + self.bet_size) / self.payoff_scale
         
         # Terminal nodes
         if plays > 1:
             # Deux passes consécutives (pp)
             if history[-1] == 'p' and history[-2] == 'p':
                 if cards[0] > cards[1]:
-                    return 1.0 / 5.0  # Au lieu de 1
+                    return small_pot  # 1/5 avec les paramètres par défaut
                 else:
-                    return -1.0 / 5.0  # Au lieu de -1
+                    return -small_pot
             
             # Bet puis Pass (bp ou pbp) - fold
             if history[-1] == 'p' and history[-2] == 'b':
                 if history[0] == 'b':
-                    return 1.0 / 5.0  # Au lieu de 1
+                    return small_pot
                 else:
-                    return -1.0 / 5.0  # Au lieu de -1
+                    return -small_pot
             
             # Bet-Bet (bb ou pbb) - showdown
             if history[-1] == 'b' and history[-2] == 'b':
                 if cards[0] > cards[1]:
-                    return 2.0 / 5.0  # Au lieu de 2
+                    return big_pot  # 2/5 avec les paramètres par défaut
                 else:
-                    return -2.0 / 5.0  # Au lieu de -2
+                    return -big_pot
         
         return 0
     
     def is_terminal(self, history: str) -> bool:
+        """Vérifie si l'histoire correspond à un état terminal (table précalculée)"""
+        try:
+            return self._terminal_table[history]
+        except KeyError:
+            self._misses['is_terminal'] += 1
+            return self.compute_is_terminal(history)
+    
+    def compute_is_terminal(self, history: str) -> bool:
         """Vérifie si l'histoire correspond à un état terminal"""
         plays = len(history)
         
@@ -114,9 +225,19 @@ class KuhnPoker:
         Returns:
             String représentant l'information set (ex: "0pb" = Jack avec Pass puis Bet)
         """
+        try:
+            return self._infoset_table[history][card]
+        except (KeyError, IndexError):
+            self._misses['information_set'] += 1
+            return self.compute_information_set(card, history)
+    
+    def compute_information_set(self, card: int, history: str) -> str:
+        """Formate la clé d'information set (voir get_information_set)"""
         return f"{card}{history}"
     
     def get_card_name(self, card: int) -> str:
         """Retourne le nom d'une carte"""
-        names = ['Jack', 'Queen', 'King']
-        return names[card]
+        if len(self.cards) == 3:
+            names = ['Jack', 'Queen', 'King']
+            return names[card]
+        return f"Carte {card}"
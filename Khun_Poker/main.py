@@ -6,8 +6,11 @@ Démontre l'apprentissage et l'analyse de la stratégie Nash Equilibrium
 import numpy as np
 import matplotlib.pyplot as plt
 from cfr_algorithm import CFRTrainer
-from cfr_academic import compute_exploitability, verify_nash_value, compute_game_value
+from cfr_academic import compute_exploitability, verify_nash_value, compute_game_value, nash_game_value
+from game_tree import GameTree
 from kuhn_poker import KuhnPoker
+from nash_family import equilibrium_profile, key_strategy_accuracy
+import random
 import time
 
 
@@ -45,14 +48,9 @@ def analyze_exploitability(trainer: CFRTrainer, use_best_response: bool = True)
         # Méthode alternative: distance euclidienne pondérée
         strategy_profile = trainer.get_strategy_profile()
         
-        nash_strategies = {
-            '0': np.array([2/3, 1/3]),      '0pb': np.array([1.0, 0.0]),
-            '1': np.array([1.0, 0.0]),      '1pb': np.array([1.0, 0.0]),
-            '2': np.array([0.0, 1.0]),      '2pb': np.array([0.0, 1.0]),
-            '0p': np.array([0.0, 1.0]),     '0b': np.array([1.0, 0.0]),
-            '1p': np.array([1.0, 0.0]),     '1b': np.array([2/3, 1/3]),
-            '2p': np.array([1.0, 0.0]),     '2b': np.array([0.0, 1.0]),
-        }
+        # Distance à l'équilibre le plus proche de la famille α ∈ [0, 1/3]
+        alpha = key_strategy_accuracy(strategy_profile)['alpha']
+        nash_strategies = equilibrium_profile(alpha)
         
         visit_frequencies = {
             '0': 1/3,  '0p': 1/6,  '0b': 1/6,  '0pb': 1/18,
@@ -75,31 +73,64 @@ def analyze_exploitability(trainer: CFRTrainer, use_best_response: bool = True)
         return avg_distance * 1000
 
 
-def run_training_experiment(iterations: int = 10000):
+# Exploitabilité visée par le menu interactif (seuil quasi-optimal des graphiques)
+TARGET_EXPLOITABILITY_MBB = 1.0
+
+
+def stop_message(stop_reason: str, target_exploitability_mbb: float = None,
+                 max_wall_seconds: float = None) -> str:
+    """Décrit le critère d'arrêt renvoyé par CFRTrainer.train_until"""
+    return {
+        'target': f"cible de {target_exploitability_mbb} mbb atteinte",
+        'time': f"budget de {max_wall_seconds} s écoulé",
+        'max_iterations': "nombre maximal d'itérations atteint",
+    }[stop_reason]
+
+
+def run_training_experiment(iterations: int = 10000, seed: int = None,
+                            target_exploitability_mbb: float = None, checkpoints: int = 20):
     """
     Exécute une expérience d'entraînement complète avec analyse
     
+    L'entraînement passe par CFRTrainer.train_until (checkpoints espacés
+    logarithmiquement): il s'arrête dès que l'exploitabilité passe sous la cible.
+    
     Args:
-        iterations: Nombre d'itérations d'entraînement
+        iterations: Nombre maximal d'itérations d'entraînement
+        seed: Graine aléatoire (None = non déterministe)
+        target_exploitability_mbb: Arrêt anticipé sous ce seuil (None = toutes les itérations)
+        checkpoints: Nombre d'évaluations de l'exploitabilité
     """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    
     print("\n" + "="*70)
     print("POKER AI - COUNTERFACTUAL REGRET MINIMIZATION (CFR)")
     print("="*70)
     print(f"\nJeu: Kuhn Poker")
     print(f"Algorithme: CFR (Counterfactual Regret Minimization)")
-    print(f"Itérations: {iterations:,}")
+    print(f"Itérations: {iterations:,} maximum")
+    if target_exploitability_mbb is not None:
+        print(f"Cible: {target_exploitability_mbb} mbb (Best Response Exploitability)")
     print("\nDébut de l'entraînement...")
     
+    def report_checkpoint(trainer, done, exploit):
+        print(f"  [{done:>9,} iter] Exploit={exploit:>8.3f} mbb")
+    
     start_time = time.time()
     
     # Créer et entraîner l'agent
     trainer = CFRTrainer()
-    trainer.train(iterations)
+    history = trainer.train_until(iterations, target_exploitability_mbb=target_exploitability_mbb,
+                                  checkpoints=checkpoints, spacing='log',
+                                  on_checkpoint=report_checkpoint)
     
     training_time = time.time() - start_time
     
-    print(f"\nEntraînement terminé en {training_time:.2f} secondes")
-    print(f"Vitesse: {iterations/training_time:.0f} itérations/seconde")
+    print(f"\nEntraînement terminé en {training_time:.2f} secondes: {trainer.iterations:,} itérations "
+          f"({stop_message(history['stop_reason'], target_exploitability_mbb)})")
+    print(f"Vitesse: {trainer.iterations/training_time:.0f} itérations/seconde (évaluations comprises)")
     
     # Afficher la stratégie apprise
     trainer.display_strategy()
@@ -107,21 +138,13 @@ def run_training_experiment(iterations: int = 10000):
     # Analyser les stratégies par comparaison directe avec Nash théorique
     strategy_profile = trainer.get_strategy_profile()
     
-    # Extraire les stratégies clés
-    jack_bet = strategy_profile.get('0', np.array([0.5, 0.5]))[1] * 100
-    queen_call = strategy_profile.get('1b', np.array([0.5, 0.5]))[1] * 100
-    king_bet = strategy_profile.get('2', np.array([0.5, 0.5]))[1] * 100
-    
-    # Calculer la précision (erreur relative)
-    jack_error = abs(jack_bet - 33.3) / 33.3 * 100
-    queen_error = abs(queen_call - 33.3) / 33.3 * 100
-    king_error = abs(king_bet - 100.0) / 100.0 * 100
-    avg_error = (jack_error + queen_error + king_error) / 3
-    overall_accuracy = max(0, 100 - avg_error)
+    # Précision des stratégies clés vs l'équilibre le plus proche de la famille α ∈ [0, 1/3]
+    accuracy = key_strategy_accuracy(strategy_profile)
+    overall_accuracy = accuracy['accuracy']
     
     # Calculer la game value
     game_value = compute_game_value(trainer.game, strategy_profile)
-    nash_value = -1/18  # Valeur théorique de Nash pour Kuhn Poker (convention académique)
+    nash_value = nash_game_value(trainer.game)  # -1/18 en gains naturels
     
     print(f"\n" + "="*70)
     print("ANALYSE DE LA STRATÉGIE")
@@ -129,13 +152,16 @@ def run_training_experiment(iterations: int = 10000):
     
     print(f"\n📊 Game Value:")
     print(f"   Valeur apprise:    {game_value:.6f}")
-    print(f"   Valeur Nash:       {nash_value:.6f} (-1/18)")
+    print(f"   Valeur Nash:       {nash_value:.6f} (-1/18 / {trainer.game.payoff_scale:g})")
     print(f"   Différence:        {abs(game_value - nash_value):.6f}")
     
-    print(f"\n📊 Précision des stratégies vs Nash théorique:")
-    print(f"   Jack bluff:      {jack_bet:5.1f}% (théorie: 33.3%) → erreur {jack_error:.1f}%")
-    print(f"   Queen call:      {queen_call:5.1f}% (théorie: 33.3%) → erreur {queen_error:.1f}%")  
-    print(f"   King value bet:  {king_bet:5.1f}% (théorie: 100%)  → erreur {king_error:.1f}%")
+    print(f"\n📊 Précision des stratégies vs équilibre le plus proche (α = {accuracy['alpha']:.3f}):")
+    print(f"   Jack bluff:      {accuracy['jack_bet']:5.1f}% (théorie: {accuracy['jack_target']:5.1f}%) "
+          f"→ erreur {accuracy['jack_error']:.1f}%")
+    print(f"   Queen call:      {accuracy['queen_call']:5.1f}% (théorie: {accuracy['queen_target']:5.1f}%) "
+          f"→ erreur {accuracy['queen_error']:.1f}%")
+    print(f"   King value bet:  {accuracy['king_bet']:5.1f}% (théorie: {accuracy['king_target']:5.1f}%) "
+          f"→ erreur {accuracy['king_error']:.1f}%")
     print(f"\n   📈 Précision globale: {overall_accuracy:.1f}%")
     
     if overall_accuracy >= 99.5:
@@ -178,7 +204,7 @@ def compare_strategies(trainer: CFRTrainer):
     print("\nDécisions initiales (premier coup):")
     print("-" * 40)
     
-    for card in range(3):
+    for card in game.cards:
         infoset_key = f"{card}"
         if infoset_key in strategy_profile:
             strategy = strategy_profile[infoset_key]
@@ -189,7 +215,7 @@ def compare_strategies(trainer: CFRTrainer):
     print("\nRéponses après un BET adverse:")
     print("-" * 40)
     
-    for card in range(3):
+    for card in game.cards:
         infoset_key = f"{card}b"
         if infoset_key in strategy_profile:
             strategy = strategy_profile[infoset_key]
@@ -221,7 +247,8 @@ JOUEUR avec KING (carte la plus forte):
   - Après pass/bet: Toujours CALL/BET
 
 PROPRIÉTÉS:
-  - Valeur du jeu: -1/18 ≈ -0.0556 pour le joueur 0
+  - Valeur du jeu: -1/18 ≈ -0.0556 pour le joueur 0 (gains naturels,
+    soit -1/90 avec les gains divisés par 5)
   - Aucun joueur ne peut améliorer son gain en changeant unilatéralement
   - La stratégie est équilibrée entre bluffs et value bets
   
@@ -233,7 +260,10 @@ POURQUOI C'EST OPTIMAL:
     """)
 
 
-def visualize_convergence(max_iterations: int = 100000, checkpoints: int = 20):
+def visualize_convergence(max_iterations: int = 100000, checkpoints: int = 20,
+                          spacing: str = 'log', target_exploitability_mbb: float = None,
+                          max_wall_seconds: float = None, output_path: str = 'cfr_convergence.png',
+                          seed: int = None, return_history: bool = False):
     """
     Visualise la convergence de l'algorithme CFR avec tracking temps réel
     Similaire à l'approche de Libratus/Pluribus
@@ -241,49 +271,51 @@ def visualize_convergence(max_iterations: int = 100000, checkpoints: int = 20):
     Args:
         max_iterations: Nombre total d'itérations
         checkpoints: Nombre de points de vérification
+        spacing: Espacement des checkpoints ('log', 'linear' ou 'adaptive')
+        target_exploitability_mbb: Arrêt anticipé sous ce seuil d'exploitabilité
+        max_wall_seconds: Arrêt anticipé après ce temps d'entraînement
+        output_path: Fichier PNG des graphiques
+        seed: Graine aléatoire (None = non déterministe)
+        return_history: Si True, retourne (trainer, historique de train_until)
     """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    
     print("\n" + "="*70)
     print("ANALYSE DE CONVERGENCE (Tracking style Libratus)")
     print("="*70)
-    print(f"Entraînement avec {max_iterations:,} itérations...")
+    print(f"Entraînement avec {max_iterations:,} itérations maximum...")
     print(f"Métrique: Best Response Exploitability (standard académique)\n")
     
-    checkpoint_interval = max_iterations // checkpoints
     exploitabilities = []
     strategy_accuracies = []
     iteration_counts = []
+    tree = GameTree()
     
-    trainer = CFRTrainer()
-    
-    for i in range(1, checkpoints + 1):
-        # Entraîner
-        trainer.train(checkpoint_interval, track_convergence=False)
+    def record_checkpoint(trainer, iterations, exploit):
+        # Précision des stratégies clés vs l'équilibre le plus proche (erreur relative)
+        overall_acc = key_strategy_accuracy(trainer.get_strategy_profile(), tree)['accuracy']
         
-        # Calculer exploitabilité (best response)
-        exploit = analyze_exploitability(trainer, use_best_response=True)
         exploitabilities.append(exploit)
-        
-        # Calculer précision des stratégies clés vs Nash (erreur relative)
-        strategy_profile = trainer.get_strategy_profile()
-        jack_bet = strategy_profile.get('0', np.array([0.5, 0.5]))[1] * 100
-        queen_call = strategy_profile.get('1b', np.array([0.5, 0.5]))[1] * 100
-        king_bet = strategy_profile.get('2', np.array([0.5, 0.5]))[1] * 100
-        
-        # Précision vs théorie (33.3%, 33.3%, 100%)
-        jack_error = abs(jack_bet - 33.3) / 33.3 * 100
-        queen_error = abs(queen_call - 33.3) / 33.3 * 100
-        king_error = abs(king_bet - 100.0) / 100.0 * 100
-        avg_error = (jack_error + queen_error + king_error) / 3
-        overall_acc = max(0, 100 - avg_error)
         strategy_accuracies.append(overall_acc)
+        iteration_counts.append(iterations)
         
-        iteration_counts.append(i * checkpoint_interval)
-        
-        if i % 5 == 0:
-            print(f"  [{i * checkpoint_interval:>7,} iter] "
+        if len(iteration_counts) % 5 == 0:
+            print(f"  [{iterations:>7,} iter] "
                   f"Exploit={exploit:>6.3f} mbb  |  "
                   f"Précision={overall_acc:>5.1f}%")
     
+    trainer = CFRTrainer()
+    history = trainer.train_until(max_iterations,
+                                  target_exploitability_mbb=target_exploitability_mbb,
+                                  max_wall_seconds=max_wall_seconds,
+                                  checkpoints=checkpoints, spacing=spacing,
+                                  on_checkpoint=record_checkpoint)
+    
+    print(f"\n  Arrêt après {iteration_counts[-1]:,} itérations "
+          f"({stop_message(history['stop_reason'], target_exploitability_mbb, max_wall_seconds)})")
+    
     # Créer deux subplots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
     
@@ -298,6 +330,8 @@ def visualize_convergence(max_iterations: int = 100000, checkpoints: int = 20):
     ax1.grid(True, alpha=0.3)
     ax1.legend(loc='upper right')
     ax1.set_ylim(bottom=0)
+    if spacing != 'linear':
+        ax1.set_xscale('log')
     
     # Graphique 2: Précision des stratégies clés
     ax2.plot(iteration_counts, strategy_accuracies, 'g-', linewidth=2, marker='s', label='Précision stratégies clés')
@@ -310,36 +344,40 @@ def visualize_convergence(max_iterations: int = 100000, checkpoints: int = 20):
     ax2.grid(True, alpha=0.3)
     ax2.legend(loc='lower right')
     ax2.set_ylim(90, 100.5)
+    if spacing != 'linear':
+        ax2.set_xscale('log')
     
     plt.tight_layout()
     
     # Sauvegarder le graphique
-    plt.savefig('d:\\Documents\\Ecole\\EPF\\5A EPF\\IA 2\\Poker\\cfr_convergence.png', 
-                dpi=150, bbox_inches='tight')
-    print(f"\n📊 Graphiques sauvegardés: cfr_convergence.png")
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    print(f"\n📊 Graphiques sauvegardés: {output_path}")
     print(f"   • Exploitabilité (Best Response Value)")
     print(f"   • Précision des stratégies clés vs Nash")
     plt.close()
     
+    if return_history:
+        return trainer, history
     return trainer
 
 
 def choose_iterations() -> int:
     """
-    Menu pour choisir le nombre d'itérations d'entraînement
+    Menu pour choisir le nombre maximal d'itérations d'entraînement
+    (l'entraînement s'arrête avant si TARGET_EXPLOITABILITY_MBB est atteinte)
     
     Returns:
-        Nombre d'itérations choisi
+        Nombre maximal d'itérations choisi
     """
     print("\n" + "="*70)
     print("CHOIX DU NOMBRE D'ITÉRATIONS")
     print("="*70)
-    print("\nOptions disponibles:")
-    print("  1. Rapide       - 10,000 itérations   (~0.5 sec)")
-    print("  2. Normal       - 50,000 itérations   (~2.5 sec)")
-    print("  3. Élevé        - 100,000 itérations  (~5 sec)")
-    print("  4. Très élevé   - 500,000 itérations  (~25 sec)")
-    print("  5. Maximum      - 1,000,000 itérations (~50 sec)")
+    print(f"\nOptions disponibles (arrêt anticipé sous {TARGET_EXPLOITABILITY_MBB} mbb):")
+    print("  1. Rapide       - 10,000 itérations max   (~0.5 sec)")
+    print("  2. Normal       - 50,000 itérations max   (~2.5 sec)")
+    print("  3. Élevé        - 100,000 itérations max  (~5 sec)")
+    print("  4. Très élevé   - 500,000 itérations max  (~25 sec)")
+    print("  5. Maximum      - 1,000,000 itérations max (~50 sec)")
     print("  6. Personnalisé - Entrer un nombre")
     
     while True:
@@ -382,7 +420,8 @@ def main():
     print("\n" + "="*70)
     print("PHASE 1: ENTRAÎNEMENT")
     print("="*70)
-    trainer = run_training_experiment(iterations=iterations)
+    trainer = run_training_experiment(iterations=iterations,
+                                      target_exploitability_mbb=TARGET_EXPLOITABILITY_MBB)
     
     # Comparer les stratégies
     compare_strategies(trainer)
@@ -0,0 +1,196 @@
+"""
+Famille des équilibres de Nash de Kuhn Poker
+Le joueur 1 a une stratégie d'équilibre unique; le joueur 0 dispose d'une
+famille à un paramètre α ∈ [0, 1/3]:
+- Jack: bluffe (bet) avec probabilité α, fold face à un bet
+- Queen: check, puis call face à un bet avec probabilité α + 1/3
+- King: bet avec probabilité 3α, call face à un bet
+Toutes ces stratégies ont la même game value (-1/18 en gains naturels).
+
+Chaque profil de la famille est affine en α: T(α) = T(0) + α D. La projection
+d'un profil appris sur la famille (équilibre le plus proche en distance
+euclidienne sur le tenseur (I, A)) a donc une forme fermée, vectorisée sur
+un lot de K profils.
+"""
+
+import numpy as np
+from typing import Dict
+from cfr_academic import compute_exploitability_batch, compute_payoff_matrix
+from game_tree import GameTree
+
+
+ALPHA_MAX = 1.0 / 3.0
+
+
+def equilibrium_profile(alpha: float) -> Dict[str, np.ndarray]:
+    """Profil d'équilibre {infoset_key: stratégie} pour un α ∈ [0, 1/3]"""
+    if not 0.0 <= alpha <= ALPHA_MAX + 1e-12:
+        raise ValueError(f"α doit être dans [0, 1/3] (reçu {alpha})")
+    return {
+        # Joueur 0 (famille paramétrée par α)
+        '0': np.array([1 - alpha, alpha]),           '0pb': np.array([1.0, 0.0]),
+        '1': np.array([1.0, 0.0]),                   '1pb': np.array([2/3 - alpha, 1/3 + alpha]),
+        '2': np.array([1 - 3 * alpha, 3 * alpha]),   '2pb': np.array([0.0, 1.0]),
+        # Joueur 1 (unique)
+        '0p': np.array([2/3, 1/3]),                  '0b': np.array([1.0, 0.0]),
+        '1p': np.array([1.0, 0.0]),                  '1b': np.array([2/3, 1/3]),
+        '2p': np.array([0.0, 1.0]),                  '2b': np.array([0.0, 1.0]),
+    }
+
+
+def _check_game(tree: GameTree):
+    game = tree.game
+    if len(game.cards) != 3 or game.ante != game.bet_size:
+        raise ValueError("La famille d'équilibres n'est connue que pour Kuhn Poker standard "
+                         "(3 cartes, bet = ante)")
+
+
+def family_basis(tree: GameTree):
+    """
+    Décomposition affine de la famille: T(α) = base + α x direction
+
+    Returns:
+        (base, direction), deux tenseurs (I, A)
+    """
+    _check_game(tree)
+    base = tree.profile_to_tensor(equilibrium_profile(0.0))
+    direction = (tree.profile_to_tensor(equilibrium_profile(ALPHA_MAX)) - base) / ALPHA_MAX
+    return base, direction
+
+
+def family_tensors(tree: GameTree, alphas: np.ndarray) -> np.ndarray:
+    """Profils d'équilibre pour K valeurs de α, tenseur (K, I, A)"""
+    base, direction = family_basis(tree)
+    alphas = np.asarray(alphas, dtype=np.float64)
+    if np.any(alphas < 0) or np.any(alphas > ALPHA_MAX + 1e-12):
+        raise ValueError("α doit être dans [0, 1/3]")
+    return base[None] + alphas[:, None, None] * direction[None]
+
+
+def closest_equilibrium(tree: GameTree, tensors: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Équilibre de la famille le plus proche de chaque profil (distance euclidienne)
+
+    Args:
+        tree: Arbre de jeu compilé
+        tensors: Profils appris (K, I, A)
+
+    Returns:
+        Dictionnaire avec 'alpha' (K,), 'distance' (K,), 'max_deviation' (K,)
+        (plus grand écart de probabilité) et 'equilibria' (K, I, A)
+    """
+    base, direction = family_basis(tree)
+    offsets = tensors - base[None]
+    # Minimum de ||offset - α D||² sur α, puis projection sur [0, 1/3]
+    alphas = np.einsum('kia,ia->k', offsets, direction) / np.sum(direction ** 2)
+    alphas = np.clip(alphas, 0.0, ALPHA_MAX)
+    equilibria = base[None] + alphas[:, None, None] * direction[None]
+    deviations = tensors - equilibria
+    return {
+        'alpha': alphas,
+        'distance': np.sqrt(np.sum(deviations ** 2, axis=(1, 2))),
+        'max_deviation': np.abs(deviations).max(axis=(1, 2)),
+        'equilibria': equilibria,
+    }
+
+
+def sweep_alpha(tree: GameTree, alphas: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    Game value et exploitabilité le long de la famille, en un seul lot
+
+    Returns:
+        Dictionnaire avec 'alpha', 'game_value' (gains du joueur 0, unités du jeu)
+        et 'exploitability_mbb', chacun de forme (K,)
+    """
+    alphas = np.linspace(0.0, ALPHA_MAX, 101) if alphas is None else np.asarray(alphas)
+    tensors = family_tensors(tree, alphas)
+    # Chaque profil contre lui-même: diagonale de la matrice des gains
+    game_values = np.einsum('kk->k', compute_payoff_matrix(tree, tensors, tensors))
+    return {
+        'alpha': alphas,
+        'game_value': game_values,
+        'exploitability_mbb': compute_exploitability_batch(tree, tensors),
+    }
+
+
+def score_profiles(tree: GameTree, tensors: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Évalue un lot de profils appris par rapport à la famille d'équilibres
+
+    Returns:
+        Résultat de closest_equilibrium, complété par 'exploitability_mbb' (K,)
+    """
+    scores = closest_equilibrium(tree, tensors)
+    scores['exploitability_mbb'] = compute_exploitability_batch(tree, tensors)
+    return scores
+
+
+def key_strategy_accuracy(strategy_profile: Dict[str, np.ndarray],
+                          tree: GameTree = None) -> Dict[str, float]:
+    """
+    Précision des stratégies clés (Jack bluff, Queen call, King bet) par rapport
+    à l'équilibre le plus proche, et non au seul point α = 1/3
+
+    Les erreurs sont relatives aux échelles 1/3 (Jack, Queen) et 1 (King), ce qui
+    redonne l'ancienne métrique lorsque l'équilibre le plus proche est α = 1/3.
+
+    Returns:
+        Dictionnaire avec 'alpha', les probabilités apprises et cibles (en %),
+        les erreurs (en %) et 'accuracy' (100 - erreur moyenne, borné à 0)
+    """
+    tree = tree if tree is not None else GameTree()
+    alpha = float(closest_equilibrium(tree, tree.profile_to_tensor(strategy_profile)[None])['alpha'][0])
+
+    uniform = np.array([0.5, 0.5])
+    jack_bet = strategy_profile.get('0', uniform)[1] * 100
+    queen_call = strategy_profile.get('1b', uniform)[1] * 100
+    king_bet = strategy_profile.get('2', uniform)[1] * 100
+    jack_target, queen_target, king_target = alpha * 100, 100 / 3, 3 * alpha * 100
+
+    jack_error = abs(jack_bet - jack_target) / (100 / 3) * 100
+    queen_error = abs(queen_call - queen_target) / (100 / 3) * 100
+    king_error = abs(king_bet - king_target) / 100 * 100
+    return {
+        'alpha': alpha,
+        'jack_bet': jack_bet, 'queen_call': queen_call, 'king_bet': king_bet,
+        'jack_target': jack_target, 'queen_target': queen_target, 'king_target': king_target,
+        'jack_error': jack_error, 'queen_error': queen_error, 'king_error': king_error,
+        'accuracy': max(0.0, 100 - (jack_error + queen_error + king_error) / 3),
+    }
+
+
+if __name__ == "__main__":
+    import random
+    from cfr_algorithm import CFRTrainer
+    from solvers import make_solver
+
+    tree = GameTree()
+    sweep = sweep_alpha(tree, np.linspace(0.0, ALPHA_MAX, 7))
+    print("\n" + "="*60)
+    print("FAMILLE D'ÉQUILIBRES (joueur 0)")
+    print("="*60)
+    print(f"{'α':>8s}{'Game value':>14s}{'Exploit (mbb)':>16s}")
+    for alpha, value, exploit in zip(sweep['alpha'], sweep['game_value'], sweep['exploitability_mbb']):
+        print(f"{alpha:>8.4f}{value:>14.6f}{exploit:>16.6f}")
+
+    # Plusieurs moteurs et graines convergent vers des points différents de la famille
+    profiles, labels = [], []
+    for name in ('cfr', 'cfr+', 'fictitious-play'):
+        solver = make_solver(name)
+        for _ in range(500):
+            solver.iterate()
+        profiles.append(solver.average_tensor())
+        labels.append(name)
+    for seed in (0, 1):
+        random.seed(seed)
+        trainer = CFRTrainer()
+        trainer.train(20000, verbose=False)
+        profiles.append(tree.profile_to_tensor(trainer.get_strategy_profile()))
+        labels.append(f"cfr-sampled (seed {seed})")
+
+    scores = score_profiles(tree, np.stack(profiles))
+    print(f"\n{'Profil':<24s}{'α le plus proche':>18s}{'Distance':>10s}{'Exploit (mbb)':>15s}")
+    print("-" * 67)
+    for i, label in enumerate(labels):
+        print(f"{label:<24s}{scores['alpha'][i]:>18.4f}{scores['distance'][i]:>10.4f}"
+              f"{scores['exploitability_mbb'][i]:>15.3f}")
@@ -3,23 +3,56 @@ Script interactif pour jouer contre l'IA entraînée
 """
 
 import random
+import numpy as np
 from cfr_algorithm import CFRTrainer
+from game_tree import GameTree
 from kuhn_poker import KuhnPoker
+from strategy_snapshots import SnapshotReader
+from subgame_solver import SubgameSolver
 
 
 class InteractivePlayer:
     """Permet à un humain de jouer contre l'IA"""
     
-    def __init__(self, trainer: CFRTrainer):
+    def __init__(self, trainer: CFRTrainer, snapshot_reader: SnapshotReader = None,
+                 resolve_budget_ms: float = None):
+        """
+        Args:
+            trainer: L'entraîneur CFR avec la stratégie apprise
+            snapshot_reader: Si fourni, l'IA joue le snapshot le plus récent publié
+                             en mémoire partagée (entraînement en cours ailleurs)
+            resolve_budget_ms: Si fourni, l'IA re-résout le sous-jeu courant à chaque
+                               décision dans ce budget (blueprint = stratégie apprise)
+        """
         self.trainer = trainer
         self.game = KuhnPoker()
-        self.strategy_profile = trainer.get_strategy_profile()
+        self.snapshot_reader = snapshot_reader
+        self.subgame_solver = None
+        if snapshot_reader is not None:
+            self.tree = GameTree(self.game)
+            self.strategy_profile = {}
+        else:
+            self.strategy_profile = trainer.get_strategy_profile()
+        if resolve_budget_ms is not None:
+            self.tree = GameTree(self.game)
+            self.subgame_solver = SubgameSolver(self.tree, self.tree.profile_to_tensor(self.strategy_profile),
+                                                budget_ms=resolve_budget_ms)
     
     def get_ai_action(self, card: int, history: str) -> int:
         """Obtient l'action de l'IA basée sur la stratégie apprise"""
         infoset_key = self.game.get_information_set(card, history)
         
-        if infoset_key in self.strategy_profile:
+        if self.subgame_solver is not None:
+            if self.snapshot_reader is not None:
+                # Re-résoudre à partir du snapshot le plus récent
+                self.subgame_solver.blueprint = np.array(
+                    [self.snapshot_reader.lookup(i) for i in range(self.tree.num_infosets)])
+            strategy = self.subgame_solver.get_strategy(card, history)
+            return random.choices([0, 1], weights=strategy)[0]
+        elif self.snapshot_reader is not None:
+            strategy = self.snapshot_reader.lookup(self.tree.infoset_index[infoset_key])
+            return random.choices([0, 1], weights=strategy)[0]
+        elif infoset_key in self.strategy_profile:
             strategy = self.strategy_profile[infoset_key]
             # Choisir une action selon la distribution de probabilité
             return random.choices([0, 1], weights=strategy)[0]
@@ -52,7 +85,7 @@ class InteractivePlayer:
             Gain du joueur humain
         """
         # Distribuer les cartes
-        cards = [0, 1, 2]
+        cards = list(self.game.cards)
         random.shuffle(cards)
         
         if human_first:
@@ -0,0 +1,113 @@
+"""
+Évaluation d'une population de stratégies les unes contre les autres
+Empile K profils en un tenseur (K, infosets, actions) et calcule en une passe
+vectorisée la matrice des gains K×K et l'exploitabilité de chaque profil.
+Utile pour l'analyse méta-jeu et les tests de régression sur des checkpoints.
+"""
+
+import numpy as np
+from typing import Dict, List
+from cfr_algorithm import CFRTrainer
+from cfr_academic import compute_payoff_matrix, compute_exploitability_batch
+from game_tree import GameTree
+from kuhn_poker import KuhnPoker
+
+
+def evaluate_population(profiles: List[Dict[str, np.ndarray]], game: KuhnPoker = None) -> Dict:
+    """
+    Évalue K profils de stratégie les uns contre les autres
+
+    Args:
+        profiles: Liste de K profils {infoset_key: stratégie}
+        game: Jeu (KuhnPoker par défaut)
+
+    Returns:
+        Dictionnaire avec:
+        - 'payoff_matrix' (K, K): gain de P0 quand P0 joue la ligne et P1 la colonne
+        - 'symmetric_matrix' (K, K): gain moyen de la ligne contre la colonne,
+          les deux positions étant jouées à tour de rôle
+        - 'game_values' (K,): valeur du jeu de chaque profil contre lui-même
+        - 'exploitability' (K,): exploitabilité de chaque profil (mbb)
+    """
+    tree = GameTree(game)
+    tensors = tree.profiles_to_tensor(profiles)
+    return evaluate_population_tensor(tree, tensors)
+
+
+def evaluate_population_tensor(tree: GameTree, tensors: np.ndarray) -> Dict:
+    """Comme evaluate_population, pour une population déjà empilée (K, I, A)"""
+    payoff_matrix = compute_payoff_matrix(tree, tensors, tensors)
+
+    return {
+        'payoff_matrix': payoff_matrix,
+        'symmetric_matrix': (payoff_matrix - payoff_matrix.T) / 2,
+        'game_values': np.diag(payoff_matrix).copy(),
+        'exploitability': compute_exploitability_batch(tree, tensors),
+    }
+
+
+def collect_checkpoints(max_iterations: int = 100000, checkpoints: int = 20,
+                        spacing: str = 'log') -> Dict:
+    """
+    Entraîne un CFRTrainer et conserve la stratégie moyenne à chaque checkpoint
+
+    Returns:
+        Dictionnaire avec 'iterations' (liste) et 'profiles' (liste de profils)
+    """
+    population = {'iterations': [], 'profiles': []}
+
+    def record_checkpoint(trainer, iterations, exploitability):
+        population['iterations'].append(iterations)
+        population['profiles'].append(trainer.get_strategy_profile())
+
+    trainer = CFRTrainer()
+    trainer.train_until(max_iterations, checkpoints=checkpoints, spacing=spacing,
+                        on_checkpoint=record_checkpoint)
+    return population
+
+
+def save_population(path: str, profiles: List[Dict[str, np.ndarray]], labels: List[str],
+                    game: KuhnPoker = None):
+    """Sauvegarde une population de profils (tenseur + clés d'infosets) au format .npz"""
+    tree = GameTree(game)
+    np.savez_compressed(path, tensors=tree.profiles_to_tensor(profiles),
+                        infoset_keys=np.array(tree.infoset_keys), labels=np.array(labels))
+
+
+def load_population(path: str, game: KuhnPoker = None) -> Dict:
+    """
+    Recharge une population sauvegardée par save_population
+
+    Returns:
+        Dictionnaire avec 'tensors' (K, I, A) dans l'ordre de GameTree et 'labels'
+    """
+    tree = GameTree(game)
+    with np.load(path) as data:
+        stored_keys = list(data['infoset_keys'])
+        order = [stored_keys.index(key) for key in tree.infoset_keys]
+        return {'tensors': data['tensors'][:, order, :], 'labels': [str(label) for label in data['labels']]}
+
+
+def display_population(results: Dict, labels: List[str]):
+    """Affiche la matrice symétrique des gains et l'exploitabilité de chaque profil"""
+    print("\n" + "="*70)
+    print("ÉVALUATION DE LA POPULATION")
+    print("="*70)
+
+    print(f"\n{'Profil':>12s}  {'Exploit (mbb)':>14s}  {'Game Value':>11s}")
+    print("-" * 42)
+    for label, exploit, value in zip(labels, results['exploitability'], results['game_values']):
+        print(f"{label:>12s}  {exploit:14.3f}  {value:11.6f}")
+
+    print("\nGain moyen ligne vs colonne (milli-big-blinds):")
+    header = " " * 12 + "".join(f"{label:>10s}" for label in labels)
+    print(header)
+    for label, row in zip(labels, results['symmetric_matrix']):
+        print(f"{label:>12s}" + "".join(f"{value * 1000:10.2f}" for value in row))
+
+
+if __name__ == "__main__":
+    population = collect_checkpoints(max_iterations=50000, checkpoints=8)
+    labels = [f"{it:,}" for it in population['iterations']]
+    results = evaluate_population(population['profiles'])
+    display_population(results, labels)
@@ -0,0 +1,279 @@
+"""
+Moteurs de résolution alternatifs et banc d'essai comparatif
+Tous les moteurs partagent la même interface (iterate / average_tensor) et la
+même machinerie vectorisée de l'arbre compilé (best response en lot, valeurs
+contrefactuelles), ce qui permet de mesurer lequel atteint le plus vite une
+exploitabilité cible:
+- CFR / CFR+ plein-largeur (toutes les donnes à chaque itération)
+- CFR échantillonné (CFRTrainer existant)
+- Fictitious Play plein-largeur (moyenne en forme séquentielle des best responses)
+- Exploitability Descent (montée de gradient contre la best response adverse)
+"""
+
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Dict, List, Optional
+from cfr_algorithm import CFRTrainer
+from cfr_academic import (compute_best_response_batch, compute_counterfactual_values,
+                          compute_exploitability_batch)
+from game_tree import GameTree
+from kuhn_poker import KuhnPoker
+
+
+def normalize_strategies(weights: np.ndarray) -> np.ndarray:
+    """Normalise des poids (..., A) en distributions; uniforme si la somme est nulle"""
+    totals = weights.sum(axis=-1, keepdims=True)
+    uniform = np.full_like(weights, 1.0 / weights.shape[-1])
+    return np.where(totals > 0, weights / np.where(totals > 0, totals, 1.0), uniform)
+
+
+class Solver(ABC):
+    """
+    Interface commune des moteurs de résolution
+
+    Chaque moteur expose:
+    - iterate(): effectue une itération
+    - average_tensor(): profil évalué (I, A) (stratégie moyenne ou courante)
+    - get_strategy_profile(): même profil sous forme {infoset_key: stratégie}
+    """
+
+    name = "solver"
+
+    def __init__(self, game: KuhnPoker = None):
+        self.tree = GameTree(game)
+        self.game = self.tree.game
+        self.iterations = 0
+
+    @abstractmethod
+    def iterate(self):
+        """Effectue une itération du moteur"""
+
+    @abstractmethod
+    def average_tensor(self) -> np.ndarray:
+        """Profil évalué (I, A): stratégie moyenne ou courante selon le moteur"""
+
+    def get_strategy_profile(self) -> Dict[str, np.ndarray]:
+        return self.tree.tensor_to_profile(self.average_tensor())
+
+    def _player_mask(self, player: int) -> np.ndarray:
+        return (self.tree.infoset_player == player)[:, None]
+
+
+class FullWidthCFRSolver(Solver):
+    """
+    CFR plein-largeur vectorisé (mises à jour alternées)
+
+    Args:
+        plus: Si True, CFR+ (regrets tronqués à 0 et moyenne pondérée par l'itération)
+    """
+
+    def __init__(self, game: KuhnPoker = None, plus: bool = False):
+        super().__init__(game)
+        self.plus = plus
+        self.name = "cfr+" if plus else "cfr"
+        shape = (self.tree.num_infosets, self.tree.num_actions)
+        self.regret_sum = np.zeros(shape)
+        self.strategy_sum = np.zeros(shape)
+
+    def current_tensor(self) -> np.ndarray:
+        return normalize_strategies(np.maximum(self.regret_sum, 0))
+
+    def iterate(self):
+        weight = self.iterations + 1 if self.plus else 1
+        for player in (0, 1):
+            strategy = self.current_tensor()
+            mask = self._player_mask(player)
+
+            reach = self.tree.infoset_reach(strategy[None])[0]
+            self.strategy_sum += np.where(mask, weight * reach[:, None] * strategy, 0.0)
+
+            values = compute_counterfactual_values(self.tree, strategy[None], player)[0]
+            node_values = (strategy * values).sum(axis=1, keepdims=True)
+            self.regret_sum += np.where(mask, values - node_values, 0.0)
+            if self.plus:
+                self.regret_sum = np.maximum(self.regret_sum, 0)
+        self.iterations += 1
+
+    def average_tensor(self) -> np.ndarray:
+        return normalize_strategies(self.strategy_sum)
+
+
+class SampledCFRSolver(Solver):
+    """
+    Adaptateur du CFRTrainer existant (échantillonnage des donnes)
+
+    Args:
+        deals_per_iteration: Nombre de donnes échantillonnées par appel à iterate()
+    """
+
+    name = "cfr-sampled"
+
+    def __init__(self, game: KuhnPoker = None, deals_per_iteration: int = 100):
+        super().__init__(game)
+        self.trainer = CFRTrainer(self.game)
+        self.deals_per_iteration = deals_per_iteration
+
+    def iterate(self):
+        self.trainer.train(self.deals_per_iteration, verbose=False)
+        self.iterations += 1
+
+    def average_tensor(self) -> np.ndarray:
+        return self.tree.profile_to_tensor(self.trainer.get_strategy_profile())
+
+
+class FictitiousPlaySolver(Solver):
+    """
+    Fictitious Play plein-largeur (XFP)
+
+    À chaque itération, chaque joueur calcule sa best response contre la stratégie
+    moyenne adverse; la stratégie moyenne est la moyenne en forme séquentielle
+    des best responses (pondération par la reach propre).
+    """
+
+    name = "fictitious-play"
+
+    def __init__(self, game: KuhnPoker = None):
+        super().__init__(game)
+        uniform = np.full((self.tree.num_infosets, self.tree.num_actions), 1.0 / self.tree.num_actions)
+        self.strategy_sum = self.tree.infoset_reach(uniform[None])[0][:, None] * uniform
+
+    def iterate(self):
+        average = self.average_tensor()[None]
+        _, br_p0 = compute_best_response_batch(self.tree, average, 0)
+        _, br_p1 = compute_best_response_batch(self.tree, average, 1)
+        best_responses = np.where(self._player_mask(0), br_p0[0], br_p1[0])
+
+        reach = self.tree.infoset_reach(best_responses[None])[0]
+        self.strategy_sum += reach[:, None] * best_responses
+        self.iterations += 1
+
+    def average_tensor(self) -> np.ndarray:
+        return normalize_strategies(self.strategy_sum)
+
+
+class ExploitabilityDescentSolver(Solver):
+    """
+    Exploitability Descent tabulaire (paramétrisation softmax)
+
+    Chaque joueur fait une montée de gradient sur sa valeur contre la best
+    response de l'adversaire. C'est la stratégie COURANTE qui converge,
+    pas la moyenne.
+
+    Args:
+        learning_rate: Pas de gradient, exprimé pour des gains normalisés à 1
+    """
+
+    name = "exploitability-descent"
+
+    def __init__(self, game: KuhnPoker = None, learning_rate: float = 1.0):
+        super().__init__(game)
+        self.logits = np.zeros((self.tree.num_infosets, self.tree.num_actions))
+        # Mise à l'échelle: valeurs contrefactuelles ~ gain max x probabilité d'une donne
+        self.step_size = learning_rate / (np.abs(self.tree.payoffs).max() * self.tree.deal_prob)
+
+    def current_tensor(self) -> np.ndarray:
+        shifted = np.exp(self.logits - self.logits.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+    def iterate(self):
+        policy = self.current_tensor()
+        gradient = np.zeros_like(self.logits)
+        for player in (0, 1):
+            _, against_br = compute_best_response_batch(self.tree, policy[None], 1 - player)
+            values = compute_counterfactual_values(self.tree, against_br, player)[0]
+            node_values = (policy * values).sum(axis=1, keepdims=True)
+            gradient += np.where(self._player_mask(player), policy * (values - node_values), 0.0)
+        self.logits += self.step_size * gradient
+        self.iterations += 1
+
+    def average_tensor(self) -> np.ndarray:
+        return self.current_tensor()
+
+
+SOLVERS = {
+    'cfr': lambda game: FullWidthCFRSolver(game),
+    'cfr+': lambda game: FullWidthCFRSolver(game, plus=True),
+    'cfr-sampled': lambda game: SampledCFRSolver(game),
+    'fictitious-play': lambda game: FictitiousPlaySolver(game),
+    'exploitability-descent': lambda game: ExploitabilityDescentSolver(game),
+}
+
+
+def make_solver(name: str, game: KuhnPoker = None) -> Solver:
+    """Instancie un moteur par son nom (voir SOLVERS)"""
+    if name not in SOLVERS:
+        raise ValueError(f"Moteur inconnu: {name} (choix: {', '.join(SOLVERS)})")
+    return SOLVERS[name](game)
+
+
+def run_solver(solver: Solver, target_exploitability_mbb: Optional[float] = None,
+               max_iterations: int = 10000, max_seconds: Optional[float] = None,
+               eval_every: int = 10) -> Dict:
+    """
+    Fait tourner un moteur jusqu'à la cible d'exploitabilité ou l'épuisement du budget
+    Le temps d'évaluation de l'exploitabilité n'est pas compté dans le temps de résolution.
+
+    Returns:
+        Dictionnaire avec 'iterations', 'solve_seconds', 'exploitability',
+        'reached_target' et l'historique ('history_iterations',
+        'history_seconds', 'history_exploitability')
+    """
+    solve_seconds = 0.0
+    result = {'name': solver.name, 'reached_target': False, 'history_iterations': [],
+              'history_seconds': [], 'history_exploitability': []}
+
+    while solver.iterations < max_iterations:
+        start = time.perf_counter()
+        for _ in range(min(eval_every, max_iterations - solver.iterations)):
+            solver.iterate()
+        solve_seconds += time.perf_counter() - start
+
+        exploitability = float(compute_exploitability_batch(solver.tree, solver.average_tensor()[None])[0])
+        result['history_iterations'].append(solver.iterations)
+        result['history_seconds'].append(solve_seconds)
+        result['history_exploitability'].append(exploitability)
+
+        if target_exploitability_mbb is not None and exploitability <= target_exploitability_mbb:
+            result['reached_target'] = True
+            break
+        if max_seconds is not None and solve_seconds >= max_seconds:
+            break
+
+    result['iterations'] = solver.iterations
+    result['solve_seconds'] = solve_seconds
+    result['exploitability'] = result['history_exploitability'][-1]
+    return result
+
+
+def benchmark(solver_names: List[str] = None, target_exploitability_mbb: float = 1.0,
+              max_iterations: int = 10000, max_seconds: float = 30.0, eval_every: int = 10,
+              game: KuhnPoker = None) -> List[Dict]:
+    """
+    Compare plusieurs moteurs sur le temps nécessaire pour atteindre une exploitabilité cible
+
+    Returns:
+        Liste des résultats de run_solver, un par moteur
+    """
+    solver_names = solver_names or list(SOLVERS)
+    results = []
+
+    print("\n" + "="*70)
+    print(f"BANC D'ESSAI DES MOTEURS (cible: {target_exploitability_mbb} mbb)")
+    print("="*70)
+    print(f"\n{'Moteur':<24s} {'Itérations':>10s} {'Temps (s)':>10s} {'Exploit (mbb)':>14s}  Cible")
+    print("-" * 70)
+
+    for name in solver_names:
+        result = run_solver(make_solver(name, game), target_exploitability_mbb,
+                            max_iterations, max_seconds, eval_every)
+        results.append(result)
+        status = "✓" if result['reached_target'] else "✗"
+        print(f"{name:<24s} {result['iterations']:>10,} {result['solve_seconds']:>10.3f} "
+              f"{result['exploitability']:>14.3f}  {status}")
+
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(target_exploitability_mbb=1.0, max_iterations=5000, max_seconds=20.0)
@@ -0,0 +1,221 @@
+"""
+Snapshots de stratégie versionnés en mémoire partagée
+Permet de servir un bot pendant que l'entraînement continue: le processus
+d'entraînement publie périodiquement la stratégie moyenne dans une région de
+mémoire partagée, et les processus de service basculent sur le snapshot le
+plus récent sans copie ni redémarrage.
+
+Disposition de la mémoire partagée:
+- en-tête int64: [version publiée, slot actif, nombre de slots, I, A]
+- séquence int64 par slot (impair = écriture en cours, pair = 2 x version)
+- données float64 (slots, I, A), écrites en anneau
+
+Un slot n'est réécrit qu'après num_slots - 1 publications supplémentaires;
+les lecteurs vérifient la séquence du slot (seqlock) pour détecter une
+lecture concurrente d'une écriture.
+"""
+
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+from cfr_algorithm import CFRTrainer
+from game_tree import GameTree
+
+
+HEADER_FIELDS = 5
+VERSION, ACTIVE_SLOT, NUM_SLOTS, NUM_INFOSETS, NUM_ACTIONS = range(HEADER_FIELDS)
+
+
+def _layout(buffer, num_slots: int, num_infosets: int, num_actions: int):
+    """Vues numpy (en-tête, séquences, données) sur le buffer partagé"""
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buffer)
+    sequences = np.ndarray((num_slots,), dtype=np.int64, buffer=buffer, offset=HEADER_FIELDS * 8)
+    data = np.ndarray((num_slots, num_infosets, num_actions), dtype=np.float64, buffer=buffer,
+                      offset=(HEADER_FIELDS + num_slots) * 8)
+    return header, sequences, data
+
+
+class SnapshotPublisher:
+    """
+    Côté entraînement: crée la région partagée et y publie les snapshots
+
+    Args:
+        num_infosets: Nombre d'information sets (ordre de GameTree)
+        num_actions: Nombre d'actions
+        name: Nom de la région partagée (None = nom généré)
+        num_slots: Taille de l'anneau de snapshots (au moins 2)
+    """
+
+    def __init__(self, num_infosets: int, num_actions: int, name: str = None, num_slots: int = 3):
+        if num_slots < 2:
+            raise ValueError("Il faut au moins 2 slots pour publier sans bloquer les lecteurs")
+        size = (HEADER_FIELDS + num_slots + num_slots * num_infosets * num_actions) * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.header, self.sequences, self.data = _layout(self.shm.buf, num_slots, num_infosets, num_actions)
+        self.header[:] = [0, 0, num_slots, num_infosets, num_actions]
+        self.sequences[:] = 0
+        # Version 0: stratégie uniforme, pour que les lecteurs aient toujours un snapshot valide
+        self.data[:] = 1.0 / num_actions
+
+    @classmethod
+    def attach(cls, name: str, untrack: bool = False) -> 'SnapshotPublisher':
+        """
+        Rouvre une région existante pour y publier depuis un autre processus
+        (untrack: voir SnapshotReader)
+        """
+        publisher = cls.__new__(cls)
+        publisher.shm = shared_memory.SharedMemory(name=name)
+        if untrack:
+            _untrack(publisher.shm)
+        publisher.name = name
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=publisher.shm.buf)
+        dims = int(header[NUM_SLOTS]), int(header[NUM_INFOSETS]), int(header[NUM_ACTIONS])
+        del header
+        publisher.header, publisher.sequences, publisher.data = _layout(publisher.shm.buf, *dims)
+        return publisher
+
+    def publish(self, tensor: np.ndarray) -> int:
+        """
+        Publie un nouveau snapshot (I, A) et le rend actif
+
+        Returns:
+            Numéro de version publié
+        """
+        version = int(self.header[VERSION]) + 1
+        slot = version % int(self.header[NUM_SLOTS])
+
+        self.sequences[slot] = 2 * version - 1  # impair: écriture en cours
+        self.data[slot] = tensor
+        self.sequences[slot] = 2 * version
+        self.header[ACTIVE_SLOT] = slot
+        self.header[VERSION] = version
+        return version
+
+    def close(self, unlink: bool = True):
+        """Libère la région partagée (et la supprime si unlink)"""
+        del self.header, self.sequences, self.data
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SnapshotReader:
+    """
+    Côté service: lit le snapshot actif sans copie
+
+    Args:
+        name: Nom de la région partagée créée par SnapshotPublisher
+        untrack: Si True, le resource_tracker de ce processus ne supprimera pas la
+                 région à sa sortie. À laisser à True pour un processus de service
+                 lancé indépendamment; False pour un processus enfant (multiprocessing)
+                 ou le processus propriétaire, qui partagent le même tracker.
+    """
+
+    def __init__(self, name: str, untrack: bool = True):
+        self.shm = shared_memory.SharedMemory(name=name)
+        if untrack:
+            _untrack(self.shm)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        dims = int(header[NUM_SLOTS]), int(header[NUM_INFOSETS]), int(header[NUM_ACTIONS])
+        del header
+        self.header, self.sequences, self.data = _layout(self.shm.buf, *dims)
+
+    @property
+    def version(self) -> int:
+        """Version du snapshot actuellement actif"""
+        return int(self.header[VERSION])
+
+    def current(self) -> Tuple[int, np.ndarray]:
+        """
+        Snapshot actif, sans copie
+
+        Returns:
+            (version, vue (I, A) sur la mémoire partagée). La vue reste valide
+            tant que is_valid(version) est vrai (num_slots - 1 publications).
+        """
+        while True:
+            slot = int(self.header[ACTIVE_SLOT])
+            sequence = int(self.sequences[slot])
+            if sequence % 2 == 0:
+                return sequence // 2, self.data[slot]
+
+    def is_valid(self, version: int) -> bool:
+        """Vérifie que le slot de cette version n'a pas été réécrit depuis"""
+        slot = version % len(self.sequences)
+        return int(self.sequences[slot]) == 2 * version
+
+    def lookup(self, infoset_index: int) -> np.ndarray:
+        """
+        Stratégie d'un information set dans le snapshot le plus récent
+        Lecture cohérente: recommence si le slot est réécrit pendant la lecture
+        """
+        while True:
+            version, view = self.current()
+            strategy = view[infoset_index].copy()
+            if self.is_valid(version):
+                return strategy
+
+    def close(self):
+        del self.header, self.sequences, self.data
+        self.shm.close()
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """
+    Évite que le resource_tracker du lecteur supprime la région à sa sortie
+    (seul le processus d'entraînement en est propriétaire)
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except (ImportError, AttributeError, KeyError):
+        pass
+
+
+def train_with_snapshots(trainer: CFRTrainer, iterations: int, publisher: SnapshotPublisher,
+                         publish_every: int = 1000, tree: Optional[GameTree] = None) -> int:
+    """
+    Entraîne en publiant la stratégie moyenne toutes les publish_every itérations
+
+    Returns:
+        Dernière version publiée
+    """
+    tree = tree if tree is not None else GameTree(trainer.game)
+    version = 0
+    done = 0
+    while done < iterations:
+        chunk = min(publish_every, iterations - done)
+        trainer.train(chunk, verbose=False)
+        done += chunk
+        version = publisher.publish(tree.profile_to_tensor(trainer.get_strategy_profile()))
+    return version
+
+
+def _training_process(name: str, iterations: int, publish_every: int):
+    publisher = SnapshotPublisher.attach(name)
+    train_with_snapshots(CFRTrainer(), iterations, publisher, publish_every)
+    publisher.close(unlink=False)
+
+
+if __name__ == "__main__":
+    from multiprocessing import Process
+
+    tree = GameTree()
+    publisher = SnapshotPublisher(tree.num_infosets, tree.num_actions)
+    trainer_process = Process(target=_training_process, args=(publisher.name, 200000, 5000))
+    trainer_process.start()
+
+    # Processus de service: lit la stratégie la plus récente pendant l'entraînement
+    reader = SnapshotReader(publisher.name, untrack=False)
+    jack = tree.infoset_index['0']
+    while trainer_process.is_alive():
+        strategy = reader.lookup(jack)
+        print(f"  version {reader.version:>3d}: Jack bluff = {strategy[1] * 100:5.1f}%")
+        time.sleep(0.5)
+    trainer_process.join()
+
+    print(f"✓ Entraînement terminé, dernière version servie: {reader.version}")
+    reader.close()
+    publisher.close()
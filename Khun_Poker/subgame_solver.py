@@ -0,0 +1,153 @@
+"""
+Re-résolution de sous-jeux en temps réel (depth-limited subgame solving)
+Au moment de décider, le sous-jeu enraciné à l'historique public courant est
+extrait de l'arbre compilé et re-résolu par CFR+ dans un budget de latence:
+- les stratégies hors du sous-jeu restent figées sur le blueprint, ce qui
+  fixe les ranges (distributions des cartes privées) des deux joueurs à la
+  racine du sous-jeu (re-résolution « unsafe »)
+- seuls les information sets du sous-jeu sont mis à jour
+- si le budget est dépassé avant le nombre minimal d'itérations, ou si le
+  blueprint n'atteint jamais cet historique, on rejoue le blueprint
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional
+from beliefs import joint_reach
+from cfr_academic import compute_counterfactual_values
+from game_tree import GameTree
+from solvers import normalize_strategies
+
+
+class Subgame:
+    """
+    Vue d'un sous-jeu de l'arbre compilé, enraciné à un historique public
+
+    Attributs:
+        history: Historique public de la racine
+        infosets: Indices des information sets du sous-jeu
+        terminals: Indices des feuilles du sous-jeu
+        player_masks: Masques (I, 1) des information sets du sous-jeu de chaque joueur
+    """
+
+    def __init__(self, tree: GameTree, history: str):
+        if history not in tree.history_index or tree.is_terminal[tree.history_index[history]]:
+            raise ValueError(f"Historique de décision inconnu: '{history}'")
+        self.history = history
+        in_subgame = np.array([h.startswith(history) for h in tree.infoset_history])
+        self.infosets = np.nonzero(in_subgame)[0]
+        self.terminals = np.array([i for i in np.nonzero(tree.is_terminal)[0]
+                                   if tree.histories[i].startswith(history)], dtype=np.int64)
+        self.player_masks = [(in_subgame & (tree.infoset_player == player))[:, None]
+                             for player in (0, 1)]
+
+
+class SubgameSolver:
+    """
+    Re-résout le sous-jeu courant par CFR+ dans un budget de latence
+
+    Args:
+        tree: Arbre de jeu compilé
+        blueprint: Stratégie de référence (I, A), utilisée hors du sous-jeu et en repli
+        budget_ms: Budget de temps par décision (millisecondes)
+        max_iterations: Nombre maximal d'itérations CFR+ par décision
+        min_iterations: En dessous de ce nombre d'itérations, on rejoue le blueprint
+    """
+
+    def __init__(self, tree: GameTree, blueprint: np.ndarray, budget_ms: float = 50.0,
+                 max_iterations: int = 1000, min_iterations: int = 10):
+        self.tree = tree
+        self.blueprint = np.asarray(blueprint, dtype=np.float64)
+        self.budget_ms = budget_ms
+        self.max_iterations = max_iterations
+        self.min_iterations = min_iterations
+        # Les sous-jeux ne dépendent que de l'historique: construits une seule fois
+        self._subgames: Dict[str, Subgame] = {}
+        self.last_result: Optional[Dict] = None
+
+    def subgame(self, history: str) -> Subgame:
+        if history not in self._subgames:
+            self._subgames[history] = Subgame(self.tree, history)
+        return self._subgames[history]
+
+    def root_reach(self, history: str) -> np.ndarray:
+        """
+        Probabilité d'atteindre l'historique sous le blueprint, pour chaque donne (D,)
+        (hasard x reach des deux joueurs): la range jointe à la racine du sous-jeu
+        """
+        return joint_reach(self.tree, self.blueprint[None])[0, :, self.tree.history_index[history]]
+
+    def solve(self, history: str) -> Dict:
+        """
+        Re-résout le sous-jeu enraciné à history
+
+        Returns:
+            Dictionnaire avec 'strategy' (I, A; blueprint hors du sous-jeu),
+            'iterations', 'elapsed_ms' et 'source' ('subgame' ou 'blueprint')
+        """
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000.0
+        subgame = self.subgame(history)
+        result = {'strategy': self.blueprint, 'iterations': 0, 'source': 'blueprint'}
+
+        if self.root_reach(history).sum() <= 0:
+            # Historique hors du support du blueprint: pas de range pour re-résoudre
+            result['elapsed_ms'] = (time.perf_counter() - start) * 1000.0
+            self.last_result = result
+            return result
+
+        regret_sum = np.zeros_like(self.blueprint)
+        strategy_sum = np.zeros_like(self.blueprint)
+        iterations = 0
+        while iterations < self.max_iterations and time.perf_counter() < deadline:
+            for player in (0, 1):
+                mask = subgame.player_masks[player]
+                strategy = np.where(mask | subgame.player_masks[1 - player],
+                                    normalize_strategies(regret_sum), self.blueprint)
+
+                # Moyenne pondérée par l'itération (CFR+) et la reach propre
+                reach = self.tree.infoset_reach(strategy[None])[0]
+                strategy_sum += np.where(mask, (iterations + 1) * reach[:, None] * strategy, 0.0)
+
+                values = compute_counterfactual_values(self.tree, strategy[None], player,
+                                                       subgame.terminals)[0]
+                node_values = (strategy * values).sum(axis=1, keepdims=True)
+                regret_sum = np.maximum(regret_sum + np.where(mask, values - node_values, 0.0), 0)
+            iterations += 1
+
+        result['iterations'] = iterations
+        if iterations >= self.min_iterations:
+            in_subgame = subgame.player_masks[0] | subgame.player_masks[1]
+            result['strategy'] = np.where(in_subgame & (strategy_sum.sum(axis=1, keepdims=True) > 0),
+                                          normalize_strategies(strategy_sum), self.blueprint)
+            result['source'] = 'subgame'
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000.0
+        self.last_result = result
+        return result
+
+    def get_strategy(self, card: int, history: str) -> np.ndarray:
+        """Stratégie re-résolue (ou blueprint en repli) de l'information set (card, history)"""
+        key = self.tree.game.get_information_set(card, history)
+        return self.solve(history)['strategy'][self.tree.infoset_index[key]]
+
+
+if __name__ == "__main__":
+    import random
+    from cfr_academic import compute_exploitability_batch
+    from cfr_algorithm import CFRTrainer
+
+    random.seed(0)
+    tree = GameTree()
+    trainer = CFRTrainer()
+    trainer.train(2000, verbose=False)
+    blueprint = tree.profile_to_tensor(trainer.get_strategy_profile())
+    solver = SubgameSolver(tree, blueprint, budget_ms=50.0)
+
+    print(f"\n{'Historique':<12s}{'Source':>10s}{'Itérations':>12s}{'Temps (ms)':>12s}"
+          f"{'Blueprint (mbb)':>17s}{'Re-résolu (mbb)':>17s}")
+    print("-" * 80)
+    for history in tree.decision_histories:
+        result = solver.solve(history)
+        exploitabilities = compute_exploitability_batch(tree, np.stack([blueprint, result['strategy']]))
+        print(f"{history or '(racine)':<12s}{result['source']:>10s}{result['iterations']:>12d}"
+              f"{result['elapsed_ms']:>12.1f}{exploitabilities[0]:>17.3f}{exploitabilities[1]:>17.3f}")
@@ -0,0 +1,182 @@
+"""
+Balayage non interactif d'hyperparamètres et de paramètres du jeu
+Une grille (moteur, graine, itérations, taille du paquet, ante, bet) est
+développée en cellules indépendantes, réparties sur un pool de processus.
+Chaque cellule terminée est mise en cache (clé = hash de sa configuration):
+une relance ne recalcule que les cellules manquantes.
+
+Exemple de grille (JSON):
+    {
+        "algorithm": ["cfr", "cfr+", "fictitious-play"],
+        "iterations": [1000],
+        "seed": [0, 1, 2],
+        "num_cards": [3, 4, 5],
+        "ante": [1],
+        "bet_size": [1, 2]
+    }
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+from cfr_academic import compute_exploitability_batch, compute_payoff_matrix
+from kuhn_poker import KuhnPoker
+from solvers import make_solver
+
+
+# Valeurs par défaut d'une cellule (les clés absentes de la grille les reprennent)
+DEFAULT_CELL = {
+    'algorithm': 'cfr',
+    'iterations': 1000,
+    'seed': 0,
+    'num_cards': 3,
+    'ante': 1.0,
+    'bet_size': 1.0,
+    'payoff_scale': 5.0,
+}
+
+RESULT_COLUMNS = ['exploitability_mbb', 'game_value', 'runtime_seconds']
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """Développe une grille {paramètre: [valeurs]} en liste de cellules"""
+    unknown = set(grid) - set(DEFAULT_CELL)
+    if unknown:
+        raise ValueError(f"Paramètres inconnus dans la grille: {', '.join(sorted(unknown))}")
+
+    keys = list(DEFAULT_CELL)
+    values = [grid.get(key, [DEFAULT_CELL[key]]) for key in keys]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+
+def config_hash(cell: Dict) -> str:
+    """Clé de cache d'une cellule (indépendante de l'ordre des paramètres)"""
+    canonical = json.dumps(cell, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def run_cell(cell: Dict) -> Dict:
+    """
+    Entraîne un moteur pour une cellule de la grille et mesure le résultat
+
+    Returns:
+        La cellule complétée par exploitability_mbb, game_value et runtime_seconds
+    """
+    random.seed(cell['seed'])
+    np.random.seed(cell['seed'])
+
+    game = KuhnPoker(num_cards=cell['num_cards'], ante=cell['ante'],
+                     bet_size=cell['bet_size'], payoff_scale=cell['payoff_scale'])
+    solver = make_solver(cell['algorithm'], game)
+
+    start_time = time.perf_counter()
+    for _ in range(cell['iterations']):
+        solver.iterate()
+    runtime = time.perf_counter() - start_time
+
+    tensor = solver.average_tensor()[None]
+    return dict(cell,
+                exploitability_mbb=float(compute_exploitability_batch(solver.tree, tensor)[0]),
+                game_value=float(compute_payoff_matrix(solver.tree, tensor, tensor)[0, 0]),
+                runtime_seconds=runtime)
+
+
+def run_sweep(grid: Dict[str, List], cache_dir: str = "sweep_cache", workers: int = None) -> List[Dict]:
+    """
+    Exécute toutes les cellules de la grille, en réutilisant les résultats en cache
+
+    Args:
+        grid: Grille {paramètre: [valeurs]}
+        cache_dir: Dossier des résultats par cellule (un fichier JSON par hash)
+        workers: Nombre de processus (None = nombre de CPU)
+
+    Returns:
+        Liste des résultats, dans l'ordre de la grille
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cells = expand_grid(grid)
+    results: Dict[str, Dict] = {}
+    missing = []
+
+    for cell in cells:
+        path = os.path.join(cache_dir, f"{config_hash(cell)}.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                results[config_hash(cell)] = json.load(f)
+        else:
+            missing.append(cell)
+
+    print(f"Cellules: {len(cells)} | en cache: {len(cells) - len(missing)} | à calculer: {len(missing)}")
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_cell, cell): cell for cell in missing}
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                key = config_hash(futures[future])
+                with open(os.path.join(cache_dir, f"{key}.json"), 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2)
+                results[key] = result
+                print(f"  [{done}/{len(missing)}] {result['algorithm']:<22s} "
+                      f"cartes={result['num_cards']} seed={result['seed']} "
+                      f"-> {result['exploitability_mbb']:.3f} mbb")
+
+    return [results[config_hash(cell)] for cell in cells]
+
+
+def write_results(results: List[Dict], path: str):
+    """Écrit le tableau consolidé au format CSV"""
+    columns = list(DEFAULT_CELL) + RESULT_COLUMNS
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({column: result[column] for column in columns})
+
+
+def display_results(results: List[Dict]):
+    """Affiche le tableau consolidé"""
+    print("\n" + "="*86)
+    print("RÉSULTATS DU BALAYAGE")
+    print("="*86)
+    print(f"{'Moteur':<24s}{'Iter':>7s}{'Seed':>6s}{'Cartes':>8s}{'Ante':>6s}{'Bet':>6s}"
+          f"{'Exploit (mbb)':>15s}{'Game Value':>12s}{'Temps (s)':>10s}")
+    print("-" * 86)
+    for r in results:
+        print(f"{r['algorithm']:<24s}{r['iterations']:>7d}{r['seed']:>6d}{r['num_cards']:>8d}"
+              f"{r['ante']:>6g}{r['bet_size']:>6g}{r['exploitability_mbb']:>15.3f}"
+              f"{r['game_value']:>12.6f}{r['runtime_seconds']:>10.3f}")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Balayage de paramètres pour Kuhn Poker")
+    parser.add_argument("grid", nargs="?", help="Fichier JSON de la grille (défaut: petite grille de démonstration)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--cache-dir", default="sweep_cache", help="Dossier du cache par cellule")
+    parser.add_argument("--output", default="sweep_results.csv", help="Tableau consolidé (CSV)")
+    args = parser.parse_args()
+
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+    else:
+        grid = {'algorithm': ['cfr', 'cfr+', 'fictitious-play'], 'iterations': [500],
+                'seed': [0], 'num_cards': [3, 4, 5], 'bet_size': [1, 2]}
+
+    results = run_sweep(grid, cache_dir=args.cache_dir, workers=args.workers)
+    write_results(results, args.output)
+    display_results(results)
+    print(f"\nTableau consolidé: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,19 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.gridspec import GridSpec
-from cfr_algorithm import CFRTrainer
-from cfr_academic import compute_game_value
+from concurrent.futures import ProcessPoolExecutor
+from cfr_algorithm import CFRTrainer, log_spaced_checkpoints
+from cfr_academic import compute_game_value, nash_game_value
+from game_tree import GameTree
+from kuhn_poker import KuhnPoker
+import nash_family
+from nash_family import equilibrium_profile, key_strategy_accuracy
+import hashlib
+import inspect
+import json
 import os
+import pickle
+import random
 import time
 
 # Configuration du style
@@ -22,6 +32,18 @@ plt.rcParams['axes.labelsize'] = 12
 # Dossier de sortie
 OUTPUT_DIR = "d:\\Documents\\Ecole\\EPF\\5A EPF\\IA 2\\Poker\\figures"
 
+# Cache des résultats d'entraînement et des empreintes des figures
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+FIGURE_HASHES_FILE = os.path.join(CACHE_DIR, "figure_hashes.json")
+# Version du format des résultats mis en cache (2: cibles Nash de l'équilibre le plus proche,
+# 3: gains terminaux du joueur 1 corrigés dans CFRTrainer.cfr)
+TRAINING_CACHE_VERSION = 3
+# Version du rendu commun à toutes les figures (style, couleurs, dossier...):
+# à incrémenter quand un changement hors des fonctions generate_* modifie les images
+FIGURE_VERSION = 1
+# Modules utilisés par les fonctions de rendu: leur code source entre dans l'empreinte
+FIGURE_DEPENDENCIES = (nash_family,)
+
 # Variable globale pour stocker les résultats de l'entraînement
 TRAINING_RESULTS = None
 
@@ -32,13 +54,21 @@ def ensure_output_dir():
         os.makedirs(OUTPUT_DIR)
 
 
-def run_main_training(iterations: int = 10000):
+def run_main_training(iterations: int = 10000, seed: int = None):
     """
     Lance l'entraînement principal et retourne les résultats
     Similaire à main.py mais retourne les données pour les visualisations
+    
+    Args:
+        iterations: Nombre d'itérations d'entraînement
+        seed: Graine aléatoire (None = non déterministe)
     """
     global TRAINING_RESULTS
     
+    if seed is not None:
+        np.random.seed(seed)
+        random.seed(seed)
+    
     print("\n" + "="*70)
     print("   POKER AI - COUNTERFACTUAL REGRET MINIMIZATION (CFR)")
     print("="*70)
@@ -51,10 +81,12 @@ def run_main_training(iterations: int = 10000):
     
     # === Phase 1: Entraînement avec tracking de convergence ===
     trainer = CFRTrainer()
+    tree = GameTree(trainer.game)
     
     # Collecter les données de convergence pendant l'entraînement
+    # Checkpoints espacés logarithmiquement (l'exploitabilité décroît en 1/√T)
     checkpoints = 50
-    checkpoint_interval = iterations // checkpoints
+    schedule = log_spaced_checkpoints(iterations, checkpoints)
     
     convergence_data = {
         'iterations': [],
@@ -65,16 +97,18 @@ def run_main_training(iterations: int = 10000):
         'game_values': []
     }
     
-    print(f"\n   Entrainement avec {checkpoints} checkpoints...")
+    print(f"\n   Entrainement avec {len(schedule)} checkpoints...")
     
-    for i in range(1, checkpoints + 1):
+    done = 0
+    for i, checkpoint in enumerate(schedule, start=1):
         # Entraînement
-        for _ in range(checkpoint_interval):
-            cards = [0, 1, 2]
+        for _ in range(checkpoint - done):
+            cards = list(trainer.game.cards)
             np.random.shuffle(cards)
             player_cards = cards[:2]
             trainer.cfr(player_cards, "", 1.0, 1.0)
             trainer.iterations += 1
+        done = checkpoint
         
         # Extraire les stratégies clés
         strategy = trainer.get_strategy_profile()
@@ -82,17 +116,13 @@ def run_main_training(iterations: int = 10000):
         queen = strategy.get('1b', np.array([0.5, 0.5]))[1] * 100
         king = strategy.get('2', np.array([0.5, 0.5]))[1] * 100
         
-        # Calcul précision (erreur relative par rapport à Nash)
-        jack_error = abs(jack - 33.3) / 33.3 * 100  # Erreur en %
-        queen_error = abs(queen - 33.3) / 33.3 * 100
-        king_error = abs(king - 100.0) / 100.0 * 100
-        avg_error = (jack_error + queen_error + king_error) / 3
-        precision = max(0, 100 - avg_error)  # Précision = 100% - erreur moyenne
+        # Précision vs l'équilibre le plus proche de la famille α ∈ [0, 1/3]
+        precision = key_strategy_accuracy(strategy, tree)['accuracy']
         
         # Calculer la game value
         game_value = compute_game_value(trainer.game, strategy)
         
-        convergence_data['iterations'].append(i * checkpoint_interval)
+        convergence_data['iterations'].append(checkpoint)
         convergence_data['jack_bluffs'].append(jack)
         convergence_data['queen_calls'].append(queen)
         convergence_data['king_bets'].append(king)
@@ -101,23 +131,17 @@ def run_main_training(iterations: int = 10000):
         
         # Afficher progression
         if i % 10 == 0:
-            print(f"      [{i}/{checkpoints}] Precision: {precision:.1f}%, Game Value: {game_value:.6f}")
+            print(f"      [{i}/{len(schedule)}] Precision: {precision:.1f}%, Game Value: {game_value:.6f}")
     
     training_time = time.time() - start_time
     
     # === Phase 2: Analyse finale ===
     strategy_profile = trainer.get_strategy_profile()
     
-    jack_bet = strategy_profile.get('0', np.array([0.5, 0.5]))[1] * 100
-    queen_call = strategy_profile.get('1b', np.array([0.5, 0.5]))[1] * 100
-    king_bet = strategy_profile.get('2', np.array([0.5, 0.5]))[1] * 100
-    
-    # Calcul précision (erreur relative)
-    jack_error = abs(jack_bet - 33.3) / 33.3 * 100
-    queen_error = abs(queen_call - 33.3) / 33.3 * 100
-    king_error = abs(king_bet - 100.0) / 100.0 * 100
-    avg_error = (jack_error + queen_error + king_error) / 3
-    overall_accuracy = max(0, 100 - avg_error)
+    accuracy = key_strategy_accuracy(strategy_profile, tree)
+    jack_bet, queen_call, king_bet = accuracy['jack_bet'], accuracy['queen_call'], accuracy['king_bet']
+    jack_error, queen_error, king_error = accuracy['jack_error'], accuracy['queen_error'], accuracy['king_error']
+    overall_accuracy = accuracy['accuracy']
     
     # Stocker tous les résultats
     TRAINING_RESULTS = {
@@ -132,9 +156,14 @@ def run_main_training(iterations: int = 10000):
             'queen_error': queen_error,
             'king_error': king_error,
             'overall_accuracy': overall_accuracy,
+            'alpha': accuracy['alpha'],
+            'jack_target': accuracy['jack_target'],
+            'queen_target': accuracy['queen_target'],
+            'king_target': accuracy['king_target'],
         },
         'training_time': training_time,
         'iterations': iterations,
+        'seed': seed,
         'speed': iterations / training_time
     }
     
@@ -149,16 +178,17 @@ def run_main_training(iterations: int = 10000):
     print(f"\n   Precision des strategies vs Nash theorique:")
     # Calculer la game value finale
     final_game_value = compute_game_value(trainer.game, strategy_profile)
-    nash_value = -1/18  # Valeur théorique Nash (convention académique)
+    nash_value = nash_game_value(trainer.game)  # -1/18 en gains naturels
     game_value_error = abs(final_game_value - nash_value)
     
-    print(f"      Jack bluff:      {jack_bet:5.1f}% (theorie: 33.3%) -> erreur {jack_error:.1f}%")
-    print(f"      Queen call:      {queen_call:5.1f}% (theorie: 33.3%) -> erreur {queen_error:.1f}%")  
-    print(f"      King value bet:  {king_bet:5.1f}% (theorie: 100%)  -> erreur {king_error:.1f}%")
+    print(f"      Equilibre le plus proche: alpha = {accuracy['alpha']:.3f}")
+    print(f"      Jack bluff:      {jack_bet:5.1f}% (theorie: {accuracy['jack_target']:5.1f}%) -> erreur {jack_error:.1f}%")
+    print(f"      Queen call:      {queen_call:5.1f}% (theorie: {accuracy['queen_target']:5.1f}%) -> erreur {queen_error:.1f}%")
+    print(f"      King value bet:  {king_bet:5.1f}% (theorie: {accuracy['king_target']:5.1f}%) -> erreur {king_error:.1f}%")
     print(f"\n      Precision globale: {overall_accuracy:.1f}%")
     print(f"\n   Game Value:")
     print(f"      Valeur apprise:  {final_game_value:.6f}")
-    print(f"      Valeur Nash:     {nash_value:.6f} (-1/18)")
+    print(f"      Valeur Nash:     {nash_value:.6f} (-1/18 / {trainer.game.payoff_scale:g})")
     print(f"      Difference:      {game_value_error:.6f}")
     
     if overall_accuracy >= 99.5:
@@ -188,8 +218,9 @@ def generate_convergence_plot():
     queen_calls = data['queen_calls']
     king_bets = data['king_bets']
     precisions = data['precisions']
-    max_iterations = TRAINING_RESULTS['iterations']
-    checkpoint_interval = iterations[1] - iterations[0] if len(iterations) > 1 else 200
+    metrics = TRAINING_RESULTS['final_metrics']
+    # Largeur des barres proportionnelle à l'écart entre checkpoints (espacement log)
+    bar_widths = np.diff([0] + list(iterations)) * 0.8
     
     # Créer la figure avec 2 graphiques
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 9))
@@ -199,23 +230,29 @@ def generate_convergence_plot():
     ax1.plot(iterations, queen_calls, 'b-', linewidth=2.5, label='Queen call %', marker='s', markersize=4)
     ax1.plot(iterations, king_bets, 'g-', linewidth=2.5, label='King bet %', marker='^', markersize=4)
     
-    # Lignes de référence Nash
-    ax1.axhline(y=33.3, color='purple', linestyle='--', alpha=0.7, linewidth=2, label='Nash optimal (33.3%)')
-    ax1.axhline(y=100, color='darkgreen', linestyle='--', alpha=0.7, linewidth=2, label='Nash optimal (100%)')
+    # Lignes de référence: équilibre le plus proche (α de key_strategy_accuracy)
+    ax1.axhline(y=metrics['jack_target'], color='darkred', linestyle='--', alpha=0.7, linewidth=2,
+                label=f"Nash α={metrics['alpha']:.3f}: Jack ({metrics['jack_target']:.1f}%)")
+    ax1.axhline(y=metrics['queen_target'], color='purple', linestyle='--', alpha=0.7, linewidth=2,
+                label=f"Nash: Queen ({metrics['queen_target']:.1f}%)")
+    ax1.axhline(y=metrics['king_target'], color='darkgreen', linestyle='--', alpha=0.7, linewidth=2,
+                label=f"Nash α={metrics['alpha']:.3f}: King ({metrics['king_target']:.1f}%)")
     
     ax1.set_xlabel('Nombre d\'iterations', fontweight='bold')
     ax1.set_ylabel('Probabilite d\'action (%)', fontweight='bold')
     ax1.set_title('CONVERGENCE DES STRATEGIES VERS L\'EQUILIBRE DE NASH', fontsize=14, fontweight='bold', pad=10)
     ax1.legend(loc='center right', fontsize=10)
     ax1.set_ylim(-5, 110)
+    ax1.set_xscale('log')
     ax1.grid(True, alpha=0.3)
     
     # Ajouter zone de convergence
-    ax1.fill_between(iterations, 30, 36.6, alpha=0.1, color='purple')
+    ax1.fill_between(iterations, metrics['queen_target'] - 3.3, metrics['queen_target'] + 3.3,
+                     alpha=0.1, color='purple')
     
     # === Graphique 2: Précision globale ===
     colors = ['#ff6b6b' if p < 95 else '#ffd93d' if p < 99 else '#6bcb77' for p in precisions]
-    ax2.bar(iterations, precisions, width=checkpoint_interval*0.8, color=colors, edgecolor='black', linewidth=0.5)
+    ax2.bar(iterations, precisions, width=bar_widths, color=colors, edgecolor='black', linewidth=0.5)
     ax2.axhline(y=100, color='green', linestyle='-', linewidth=3, alpha=0.8, label='Nash parfait (100%)')
     ax2.axhline(y=99, color='orange', linestyle='--', linewidth=2, alpha=0.7, label='Excellent (99%)')
     ax2.axhline(y=95, color='red', linestyle='--', linewidth=2, alpha=0.5, label='Bon (95%)')
@@ -225,13 +262,14 @@ def generate_convergence_plot():
     ax2.set_title('PRECISION GLOBALE DE LA STRATEGIE APPRISE', fontsize=14, fontweight='bold', pad=10)
     ax2.legend(loc='lower right', fontsize=10)
     ax2.set_ylim(85, 101)
+    ax2.set_xscale('log')
     ax2.grid(True, alpha=0.3, axis='y')
     
     # Ajouter la valeur finale
     final_precision = precisions[-1]
     ax2.annotate(f'{final_precision:.1f}%', 
                 xy=(iterations[-1], final_precision), 
-                xytext=(iterations[-1] - max_iterations*0.15, final_precision - 3),
+                xytext=(iterations[-1] * 0.3, final_precision - 3),
                 fontsize=14, fontweight='bold', color='darkgreen',
                 arrowprops=dict(arrowstyle='->', color='darkgreen', lw=2))
     
@@ -253,7 +291,7 @@ def generate_strategy_comparison():
     
     # Données
     categories = ['Jack\n(Bluff)', 'Queen\n(Call)', 'King\n(Value Bet)']
-    nash_values = [33.3, 33.3, 100.0]
+    nash_values = [metrics['jack_target'], metrics['queen_target'], metrics['king_target']]
     learned_values = [metrics['jack_bet'], metrics['queen_call'], metrics['king_bet']]
     
     x = np.arange(len(categories))
@@ -262,7 +300,7 @@ def generate_strategy_comparison():
     fig, ax = plt.subplots(figsize=(12, 7))
     
     # 2 séries de barres
-    bars1 = ax.bar(x - width/2, nash_values, width, label='Nash Theorique', 
+    bars1 = ax.bar(x - width/2, nash_values, width, label=f"Nash Theorique (α={metrics['alpha']:.3f})", 
                    color='#3498db', edgecolor='black', linewidth=1.5)
     bars2 = ax.bar(x + width/2, learned_values, width, label='CFR Appris', 
                    color='#27ae60', edgecolor='black', linewidth=1.5)
@@ -312,7 +350,7 @@ def generate_game_value_plot():
     data = TRAINING_RESULTS['convergence_data']
     iterations = data['iterations']
     game_values = data['game_values']
-    nash_value = -1/18  # Valeur théorique Nash pour Kuhn Poker (-0.0556)
+    nash_value = nash_game_value(KuhnPoker())  # -1/18 en gains naturels, -1/90 ici
     
     fig, ax = plt.subplots(figsize=(14, 8))
     
@@ -321,7 +359,7 @@ def generate_game_value_plot():
     
     # Ligne de référence Nash
     ax.axhline(y=nash_value, color='red', linestyle='--', linewidth=2.5, alpha=0.8, 
-              label=f'Nash Equilibrium = {nash_value:.6f} (-1/18)')
+              label=f'Nash Equilibrium = {nash_value:.6f} (-1/90)')
     
     # Zone de convergence acceptable (±0.0002 pour être plus réaliste)
     convergence_tolerance = 0.0002
@@ -335,9 +373,10 @@ def generate_game_value_plot():
     
     ax.set_xlabel('Nombre d\'itérations', fontweight='bold', fontsize=13)
     ax.set_ylabel('Game Value (joueur 0)', fontweight='bold', fontsize=13)
-    ax.set_title('CONVERGENCE DE LA GAME VALUE VERS L\'ÉQUILIBRE DE NASH\n(Convention académique: -1/18)', 
+    ax.set_title('CONVERGENCE DE LA GAME VALUE VERS L\'ÉQUILIBRE DE NASH\n(-1/18 en gains naturels, gains divisés par 5: -1/90)', 
                 fontsize=15, fontweight='bold', pad=20)
     ax.legend(fontsize=11, loc='upper right')
+    ax.set_xscale('log')
     ax.grid(True, alpha=0.3, linestyle='--')
     
     # Ajouter la valeur finale avec positionnement amélioré
@@ -345,7 +384,7 @@ def generate_game_value_plot():
     final_error = abs(final_value - nash_value)
     ax.annotate(f'Valeur finale: {final_value:.6f}\nErreur: {final_error:.6f}', 
                 xy=(iterations[-1], final_value), 
-                xytext=(iterations[-1] * 0.6, max_val - 0.0005),
+                xytext=(iterations[-1] * 0.1, max_val - 0.0005),
                 fontsize=11, fontweight='bold', color='darkblue',
                 bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', edgecolor='blue', lw=2),
                 arrowprops=dict(arrowstyle='->', color='darkblue', lw=2, connectionstyle='arc3,rad=0.2'))
@@ -371,12 +410,15 @@ def generate_behavior_analysis():
     ensure_output_dir()
     
     strategy = TRAINING_RESULTS['strategy_profile']
+    metrics = TRAINING_RESULTS['final_metrics']
+    nash_profile = equilibrium_profile(metrics['alpha'])
     
     # Données des comportements
     behaviors = ['BLUFF\nJack bet', 'VALUE BET\nKing bet', 'CALL DEFENSIF\nQueen call', 
                 'FOLD OPTIMAL\nJack fold pb']
     
-    nash_pct = [33.3, 100, 33.3, 100]
+    nash_pct = [metrics['jack_target'], metrics['king_target'], metrics['queen_target'],
+                nash_profile['0pb'][0] * 100]
     
     learned_pct = [
         strategy.get('0', np.array([0.5, 0.5]))[1] * 100,
@@ -390,7 +432,7 @@ def generate_behavior_analysis():
     x = np.arange(len(behaviors))
     width = 0.35
     
-    bars1 = ax.bar(x - width/2, nash_pct, width, label='Nash Optimal', 
+    bars1 = ax.bar(x - width/2, nash_pct, width, label=f"Nash Optimal (α={metrics['alpha']:.3f})", 
                   color='#3498db', alpha=0.8, edgecolor='black', linewidth=1.5)
     bars2 = ax.bar(x + width/2, learned_pct, width, label='CFR Appris', 
                   color='#27ae60', alpha=0.8, edgecolor='black', linewidth=1.5)
@@ -483,15 +525,15 @@ def generate_summary_dashboard():
     ax2.axis('off')
     
     metrics_data = [
-        ('Jack Bluff', f'{jack_bet:.1f}%', '33.3%', f'{jack_acc:.1f}%'),
-        ('Queen Call', f'{queen_call:.1f}%', '33.3%', f'{queen_acc:.1f}%'),
-        ('King Bet', f'{king_bet:.1f}%', '100%', f'{king_acc:.1f}%'),
+        ('Jack Bluff', f'{jack_bet:.1f}%', f"{metrics['jack_target']:.1f}%", f'{jack_acc:.1f}%'),
+        ('Queen Call', f'{queen_call:.1f}%', f"{metrics['queen_target']:.1f}%", f'{queen_acc:.1f}%'),
+        ('King Bet', f'{king_bet:.1f}%', f"{metrics['king_target']:.1f}%", f'{king_acc:.1f}%'),
     ]
     
     ax2.text(0.5, 0.95, 'DETAIL DES STRATEGIES CLES', fontsize=14, fontweight='bold', 
             ha='center', transform=ax2.transAxes)
     
-    headers = ['Strategie', 'Appris', 'Nash', 'Precision']
+    headers = ['Strategie', 'Appris', f"Nash (α={metrics['alpha']:.3f})", 'Precision']
     col_positions = [0.1, 0.35, 0.55, 0.75]
     
     for i, header in enumerate(headers):
@@ -517,7 +559,7 @@ def generate_summary_dashboard():
     # === 3. Barres de comparaison ===
     ax3 = fig.add_subplot(gs[1, :2])
     strategies = ['Jack Bluff', 'Queen Call', 'King Bet']
-    nash = [33.3, 33.3, 100]
+    nash = [metrics['jack_target'], metrics['queen_target'], metrics['king_target']]
     learned = [jack_bet, queen_call, king_bet]
     
     x = np.arange(len(strategies))
@@ -692,20 +734,10 @@ def generate_probability_matrix():
     
     print("   Generation de la matrice de probabilites...")
     
-    trainer = TRAINING_RESULTS['trainer']
-    strategy_profile = trainer.get_strategy_profile()
-    
-    # Stratégies Nash théoriques
-    nash_strategies = {
-        'Jack initial': [2/3, 1/3],
-        'Jack après bet': [1.0, 0.0],
-        'Queen initial': [1.0, 0.0],
-        'Queen après bet': [2/3, 1/3],
-        'King initial': [0.0, 1.0],
-        'King après bet': [0.0, 1.0],
-    }
+    strategy_profile = TRAINING_RESULTS['strategy_profile']
+    alpha = TRAINING_RESULTS['final_metrics']['alpha']
     
-    # Stratégies apprises correspondantes
+    # Information sets affichés
     infoset_mapping = {
         'Jack initial': '0',
         'Jack après bet': '0b',
@@ -715,6 +747,10 @@ def generate_probability_matrix():
         'King après bet': '2b',
     }
     
+    # Stratégies Nash théoriques: équilibre le plus proche (α de key_strategy_accuracy)
+    nash_profile = equilibrium_profile(alpha)
+    nash_strategies = {name: nash_profile[infoset] for name, infoset in infoset_mapping.items()}
+    
     learned_strategies = {}
     for name, infoset in infoset_mapping.items():
         if infoset in strategy_profile:
@@ -764,7 +800,7 @@ def generate_probability_matrix():
         return im
     
     # Tracer les deux matrices
-    plot_matrix(ax1, nash_data, 'Stratégie Nash Théorique')
+    plot_matrix(ax1, nash_data, f'Stratégie Nash Théorique (α = {alpha:.3f})')
     im = plot_matrix(ax2, learned_data, f'Stratégie Apprise (CFR)')
     
     # Ajouter une barre de couleur
@@ -796,30 +832,165 @@ def generate_probability_matrix():
     print(f"      → {output_path}")
 
 
-def generate_all_visualizations(iterations: int = 10000):
+# Figures générées, dans l'ordre de présentation
+FIGURES = [
+    ('1_convergence.png', generate_convergence_plot),
+    ('2_strategy_comparison.png', generate_strategy_comparison),
+    ('3_game_value.png', generate_game_value_plot),
+    ('4_emergent_behaviors.png', generate_behavior_analysis),
+    ('5_dashboard.png', generate_summary_dashboard),
+    ('6_decision_tree.png', generate_decision_tree),
+    ('7_probability_matrix.png', generate_probability_matrix),
+]
+
+
+def training_cache_path(iterations: int, seed: int) -> str:
+    """Chemin de l'artefact d'entraînement pour (itérations, graine)"""
+    return os.path.join(CACHE_DIR, f"training_{iterations}_seed{seed}_v{TRAINING_CACHE_VERSION}.pkl")
+
+
+def load_or_train(iterations: int = 10000, seed: int = 0, force: bool = False) -> dict:
+    """
+    Étape 1 du pipeline: charge les résultats d'entraînement depuis le cache disque
+    ou relance l'entraînement si l'artefact n'existe pas encore
+    
+    Args:
+        iterations: Nombre d'itérations d'entraînement
+        seed: Graine aléatoire (fait partie de la clé du cache)
+        force: Si True, ignore le cache et réentraîne
+        
+    Returns:
+        Résultats d'entraînement (sans l'objet trainer, non sérialisable)
+    """
+    global TRAINING_RESULTS
+    
+    path = training_cache_path(iterations, seed)
+    if not force and os.path.exists(path):
+        with open(path, 'rb') as f:
+            TRAINING_RESULTS = pickle.load(f)
+        print(f"\n   Resultats d'entrainement charges depuis le cache: {path}")
+        return TRAINING_RESULTS
+    
+    run_main_training(iterations=iterations, seed=seed)
+    
+    # Le trainer (jeu, table des regrets) n'est pas utile aux figures: on ne garde que les données
+    TRAINING_RESULTS = {k: v for k, v in TRAINING_RESULTS.items() if k != 'trainer'}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(TRAINING_RESULTS, f)
+    
+    return TRAINING_RESULTS
+
+
+def figure_hash(func, results: dict) -> str:
+    """
+    Empreinte d'une figure: code source de la fonction de rendu et des modules
+    dont elle dépend (FIGURE_DEPENDENCIES), FIGURE_VERSION et données d'entrée
+    Si rien de tout cela ne change, l'image existante est réutilisée
+    """
+    h = hashlib.sha256()
+    h.update(str(FIGURE_VERSION).encode('utf-8'))
+    h.update(inspect.getsource(func).encode('utf-8'))
+    for module in FIGURE_DEPENDENCIES:
+        h.update(inspect.getsource(module).encode('utf-8'))
+    h.update(pickle.dumps(results))
+    return h.hexdigest()
+
+
+def _init_render_worker(results: dict):
+    """Initialise un processus de rendu: backend headless + résultats partagés"""
+    global TRAINING_RESULTS
+    plt.switch_backend('Agg')
+    TRAINING_RESULTS = results
+
+
+def _render_figure(index: int) -> str:
+    """Rend la figure FIGURES[index] dans le processus courant"""
+    filename, func = FIGURES[index]
+    func()
+    return filename
+
+
+def render_figures(results: dict, workers: int = None, force: bool = False) -> list:
+    """
+    Étape 2 du pipeline: rend les figures en parallèle (backend Agg)
+    Les figures dont l'empreinte n'a pas changé sont ignorées
+    
+    Args:
+        results: Résultats d'entraînement (voir load_or_train)
+        workers: Nombre de processus de rendu (None = nombre de CPU)
+        force: Si True, rend toutes les figures même inchangées
+        
+    Returns:
+        Liste des fichiers effectivement regénérés
+    """
+    ensure_output_dir()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    
+    previous_hashes = {}
+    if os.path.exists(FIGURE_HASHES_FILE):
+        with open(FIGURE_HASHES_FILE, 'r', encoding='utf-8') as f:
+            previous_hashes = json.load(f)
+    
+    current_hashes = {}
+    to_render = []
+    for index, (filename, func) in enumerate(FIGURES):
+        current_hashes[filename] = figure_hash(func, results)
+        up_to_date = (previous_hashes.get(filename) == current_hashes[filename]
+                      and os.path.exists(os.path.join(OUTPUT_DIR, filename)))
+        if force or not up_to_date:
+            to_render.append(index)
+        else:
+            print(f"   [inchange] {filename}")
+    
+    rendered = []
+    if to_render:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(results,)) as executor:
+            for filename in executor.map(_render_figure, to_render):
+                rendered.append(filename)
+    
+    # Ne mémoriser que les empreintes des figures présentes sur disque
+    saved_hashes = {name: digest for name, digest in current_hashes.items()
+                    if os.path.exists(os.path.join(OUTPUT_DIR, name))}
+    with open(FIGURE_HASHES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(saved_hashes, f, indent=2)
+    
+    return rendered
+
+
+def generate_all_visualizations(iterations: int = 10000, seed: int = 0,
+                                workers: int = None, force: bool = False):
     """
     Lance l'entraînement puis génère toutes les visualisations basées sur les résultats
+    
+    Pipeline en deux étapes:
+    1. Entraînement (résultat mis en cache sur disque, clé = itérations + graine)
+    2. Rendu des figures en parallèle, en ignorant celles qui n'ont pas changé
+    
+    Args:
+        iterations: Nombre d'itérations d'entraînement
+        seed: Graine aléatoire de l'entraînement
+        workers: Nombre de processus de rendu (None = nombre de CPU)
+        force: Si True, réentraîne et regénère toutes les figures
     """
-    # === PHASE 1: Entraînement ===
-    run_main_training(iterations=iterations)
+    # === PHASE 1: Entraînement (ou chargement du cache) ===
+    results = load_or_train(iterations=iterations, seed=seed, force=force)
     
     # === PHASE 2: Visualisations ===
     print("\n" + "="*70)
     print("   GENERATION DES VISUALISATIONS")
     print("="*70)
     
-    generate_convergence_plot()
-    generate_strategy_comparison()
-    generate_game_value_plot()
-    generate_behavior_analysis()
-    generate_summary_dashboard()
-    generate_decision_tree()
-    generate_probability_matrix()
+    start_time = time.time()
+    rendered = render_figures(results, workers=workers, force=force)
+    render_time = time.time() - start_time
     
     print("\n" + "="*70)
     print("   TOUTES LES VISUALISATIONS GENEREES!")
     print("="*70)
-    print(f"\n   Dossier: {OUTPUT_DIR}\n")
+    print(f"\n   Dossier: {OUTPUT_DIR}")
+    print(f"   Figures regenerees: {len(rendered)}/{len(FIGURES)} en {render_time:.1f}s\n")
     print("   Fichiers generes:")
     print("      1_convergence.png          - Convergence des strategies")
     print("      2_strategy_comparison.png  - Nash vs CFR")